@@ -5,19 +5,25 @@ router = APIRouter()
 # Import and include all API routers
 from app.api.auth import router as auth_router
 from app.api.clients import router as clients_router
+from app.api.salons import router as salons_router
 from app.api.categories import router as categories_router
 from app.api.services import router as services_router
 from app.api.appointments import router as appointments_router
 from app.api.barbers import router as barbers_router
 from app.api.banners import router as banners_router
+from app.api.events import router as events_router
+from app.api.analytics import router as analytics_router
 
 # Include routers
 router.include_router(auth_router, prefix="/auth", tags=["auth"])
 router.include_router(clients_router, prefix="/clients", tags=["clients"])
+router.include_router(salons_router, prefix="/salons", tags=["salons"])
 router.include_router(categories_router, prefix="/categories", tags=["categories"])
 router.include_router(services_router, prefix="/services", tags=["services"])
 router.include_router(appointments_router, prefix="/appointments", tags=["appointments"])
 router.include_router(barbers_router, prefix="/barbers", tags=["barbers"])
 router.include_router(banners_router, prefix="/banners", tags=["banners"])
+router.include_router(events_router, prefix="/events", tags=["events"])
+router.include_router(analytics_router, prefix="/analytics", tags=["analytics"])
 
 # Uncomment the above imports and includes as you implement each router 
\ No newline at end of file
@@ -0,0 +1,171 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+from typing import List, Optional
+from datetime import date
+
+from app.core.config import settings
+from app.models.models import AppointmentRollupDaily, AppointmentRollupHourly, Barber, Category
+from app.db.database import get_tenant_read_db
+from app.core.tenancy import get_tenant_id
+from app.core.permissions import Principal, ANALYTICS_READ
+from app.api.auth import require_permission
+from app.schemas import DailyMetricsResponse, HourlyMetricsResponse
+from app.utils.timerange import in_range, local_day_range, salon_zone
+
+router = APIRouter()
+
+# Analitika endpointlari faqat rollup jadvallarini o'qiydi (app/workers/rollups.py),
+# shuning uchun javob vaqti buyurtmalar tarixi hajmiga bog'liq emas
+
+def _no_show_rate(total: int, cancelled: int, no_show: int) -> Optional[float]:
+    """Kelmaganlar ulushi: bekor qilinganlar hisobga olinmaydi"""
+    expected = total - cancelled
+    return round(no_show / expected, 4) if expected else None
+
+def _tenant_categories(tenant_id: int):
+    """Salon kategoriyalari: rollup kalitidagi category_id orqali salon bo'yicha ajratiladi"""
+    return select(Category.id).where(Category.tenant_id == tenant_id)
+
+def _check_range(start: date, end: date):
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end start dan oldin bo'lishi mumkin emas"
+        )
+    if (end - start).days > 366:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Oraliq 366 kundan oshmasligi kerak"
+        )
+
+# Kunlik daromad, bandlik va kelmaganlar ulushi
+@router.get("/daily", response_model=List[DailyMetricsResponse])
+async def get_daily_metrics(
+    start: date,
+    end: date,
+    group_by: str = "barber",  # barber | category
+    barber_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_tenant_read_db),
+    tenant_id: int = Depends(get_tenant_id),
+    principal: Principal = Depends(require_permission(ANALYTICS_READ))
+):
+    _check_range(start, end)
+    if group_by not in ("barber", "category"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="group_by barber yoki category bo'lishi kerak"
+        )
+
+    rollup = AppointmentRollupDaily
+    group_column = rollup.barber_id if group_by == "barber" else rollup.category_id
+
+    query = (
+        select(
+            rollup.bucket_date,
+            group_column.label("group_id"),
+            func.sum(rollup.total_count).label("total_count"),
+            func.sum(rollup.completed_count).label("completed_count"),
+            func.sum(rollup.cancelled_count).label("cancelled_count"),
+            func.sum(rollup.no_show_count).label("no_show_count"),
+            func.sum(rollup.revenue).label("revenue"),
+            func.sum(rollup.booked_minutes).label("booked_minutes"),
+        )
+        .where(
+            rollup.bucket_date >= start,
+            rollup.bucket_date <= end,
+            rollup.category_id.in_(_tenant_categories(tenant_id)),
+        )
+        .group_by(rollup.bucket_date, group_column)
+        .order_by(rollup.bucket_date, group_column)
+    )
+    if barber_id is not None:
+        query = query.where(rollup.barber_id == barber_id)
+    if category_id is not None:
+        query = query.where(rollup.category_id == category_id)
+
+    result = await db.execute(query)
+    rows = result.all()
+
+    # Ish vaqti: barber uchun bir kun, kategoriya uchun undagi barberlar soni bo'yicha
+    capacity = {}
+    if group_by == "category":
+        capacity_query = (
+            select(Barber.category_id, func.count(Barber.id))
+            .where(Barber.category_id.in_({row.group_id for row in rows}), Barber.deleted_at.is_(None))
+            .group_by(Barber.category_id)
+        )
+        capacity = dict((await db.execute(capacity_query)).all())
+
+    metrics = []
+    for row in rows:
+        barbers = 1 if group_by == "barber" else capacity.get(row.group_id, 0)
+        available = barbers * settings.WORKING_DAY_MINUTES
+        has_barber = group_by == "category" or row.group_id != 0
+        metrics.append({
+            "date": row.bucket_date,
+            "barber_id": row.group_id if group_by == "barber" else None,
+            "category_id": row.group_id if group_by == "category" else None,
+            "total_count": row.total_count,
+            "completed_count": row.completed_count,
+            "cancelled_count": row.cancelled_count,
+            "no_show_count": row.no_show_count,
+            "no_show_rate": _no_show_rate(row.total_count, row.cancelled_count, row.no_show_count),
+            "revenue": row.revenue,
+            "booked_minutes": row.booked_minutes,
+            "utilization": round(row.booked_minutes / available, 4) if available and has_barber else None,
+        })
+
+    return metrics
+
+# Bir kunning soatlik ko'rsatkichlari
+@router.get("/hourly", response_model=List[HourlyMetricsResponse])
+async def get_hourly_metrics(
+    date: date,
+    barber_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_tenant_read_db),
+    tenant_id: int = Depends(get_tenant_id),
+    principal: Principal = Depends(require_permission(ANALYTICS_READ))
+):
+    # Soatlik bucket'lar UTC soatlari: salondagi kun ularning oralig'i sifatida olinadi
+    zone = salon_zone(tenant_id)
+    day_start, day_end = local_day_range(date, zone)
+    rollup = AppointmentRollupHourly
+
+    query = (
+        select(
+            rollup.bucket_start,
+            func.sum(rollup.total_count).label("total_count"),
+            func.sum(rollup.completed_count).label("completed_count"),
+            func.sum(rollup.no_show_count).label("no_show_count"),
+            func.sum(rollup.revenue).label("revenue"),
+            func.sum(rollup.booked_minutes).label("booked_minutes"),
+        )
+        .where(
+            in_range(rollup.bucket_start, day_start, day_end),
+            rollup.category_id.in_(_tenant_categories(tenant_id)),
+        )
+        .group_by(rollup.bucket_start)
+        .order_by(rollup.bucket_start)
+    )
+    if barber_id is not None:
+        query = query.where(rollup.barber_id == barber_id)
+    if category_id is not None:
+        query = query.where(rollup.category_id == category_id)
+
+    result = await db.execute(query)
+
+    return [
+        {
+            "hour": row.bucket_start.astimezone(zone),
+            "total_count": row.total_count,
+            "completed_count": row.completed_count,
+            "no_show_count": row.no_show_count,
+            "revenue": row.revenue,
+            "booked_minutes": row.booked_minutes,
+        }
+        for row in result.all()
+    ]
@@ -2,64 +2,226 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import List, Optional
-from pydantic import BaseModel
-from datetime import datetime
 
-from app.models.models import User, Category, Service, Appointment, AppointmentStatus
-from app.db.database import get_db
-from app.api.auth import get_current_client
+from app.core.config import settings
+from app.models.models import User, Category, Service, Barber, Appointment, AppointmentService, AppointmentStatus
+from app.db.database import get_tenant_db, get_tenant_read_db
+from app.core.events import barber_day_channel, client_channel, event_broker
+from app.core.tenancy import get_tenant_id
+from app.core.audit import audit_logger
+from app.core.permissions import APPOINTMENTS_MANAGE, Principal
+from app.api.auth import get_current_client, get_principal, require_permission
+from app.schemas import AppointmentCreate, AppointmentResponse, appointment_list_adapter, json_response
+from app.utils.schedule import check_barber_slot
+from app.utils.timerange import appointment_window, localize, salon_zone, utc_now
 
 router = APIRouter()
 
-# Buyurtma yaratish uchun schema
-class AppointmentCreate(BaseModel):
-    service_id: int
-    appointment_time: datetime
+# Buyurtma o'zgarishi hodisalari: mijoz va barber-kun kanallari uchun
+def _change_events(appointment: Appointment, event_type: str, slot_event: Optional[str] = None):
+    events = [(client_channel(appointment.user_id), {
+        "type": event_type,
+        "salon_id": appointment.tenant_id,
+        "appointment_id": appointment.id,
+        "status": appointment.status.value,
+        "appointment_time": appointment.appointment_time,
+    })]
 
-# Buyurtma ma'lumotlarini qaytarish uchun schema
-class AppointmentResponse(BaseModel):
-    id: int
-    user_id: int
-    service_id: int
-    appointment_time: datetime
-    status: str
-    created_at: datetime
-    
-    class Config:
-        from_attributes = True
+    if slot_event and appointment.barber_id is not None:
+        events.append((
+            barber_day_channel(
+                appointment.tenant_id,
+                appointment.barber_id,
+                appointment.appointment_time.astimezone(salon_zone(appointment.tenant_id)).date(),
+            ),
+            {
+                "type": slot_event,
+                "appointment_id": appointment.id,
+                "barber_id": appointment.barber_id,
+                "start": appointment.appointment_time,
+            },
+        ))
+
+    return events
+
+def _check_owner(appointment: Appointment, principal: Principal):
+    """Boshqa mijozning buyurtmasi faqat shu salondagi appointments:manage ruxsati bilan"""
+    if appointment.user_id == principal.id:
+        return
+    if appointment.tenant_id != principal.tenant_id or not principal.has(APPOINTMENTS_MANAGE):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Bu amal uchun ruxsat yo'q"
+        )
+
+def _check_manager(appointment: Appointment, principal: Principal):
+    """Buyurtma holatini boshqarish (tasdiqlash, yakunlash, kelmadi) - faqat shu salon xodimi
+
+    Bu holatlar daromad va no-show hisobotlariga kiradi: mijoz o'z buyurtmasini
+    faqat bekor qila oladi.
+    """
+    if appointment.tenant_id != principal.tenant_id or not principal.has(APPOINTMENTS_MANAGE):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Bu amal uchun ruxsat yo'q"
+        )
+
+async def _retake_slot(db: AsyncSession, appointment: Appointment) -> None:
+    """Bekor qilingan buyurtma qayta tiklanganda vaqt hali bo'shligini tekshirish
+
+    create_appointment bilan bir xil: barber qatori qulflanadi va tekshiruv
+    yozuv bilan bitta tranzaksiyada - bekor qilingandan keyin shu vaqtga
+    boshqa mijoz bron qilgan bo'lishi mumkin.
+    """
+    if appointment.barber_id is None:
+        return
+
+    query = select(Barber.id).where(Barber.id == appointment.barber_id).with_for_update()
+    await db.execute(query)
+
+    duration = appointment.duration_minutes
+    if duration is None:
+        duration = (await db.get(Service, appointment.service_id)).duration
+    conflict = await check_barber_slot(
+        db,
+        appointment.tenant_id,
+        appointment.barber_id,
+        appointment.appointment_time.astimezone(salon_zone(appointment.tenant_id)),
+        duration,
+    )
+    if conflict == "off":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Barber bu vaqtda ishlamaydi"
+        )
+    if conflict == "busy":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Bu vaqt band"
+        )
+
+def _appointment_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Buyurtma topilmadi"
+    )
+
+# Hodisalar faqat commit muvaffaqiyatli bo'lgandan keyin yuboriladi
+async def _publish(events):
+    for channel, event in events:
+        await event_broker.publish(channel, event)
 
 # Yangi buyurtma yaratish
 @router.post("/", response_model=AppointmentResponse, status_code=status.HTTP_201_CREATED)
 async def create_appointment(
     appointment_data: AppointmentCreate, 
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_tenant_db),
+    tenant_id: int = Depends(get_tenant_id),
     current_client: User = Depends(get_current_client)
 ):
-    # Xizmat mavjudligini tekshirish
-    query = select(Service).where(Service.id == appointment_data.service_id)
+    # Tekshiruv va yozish bitta tranzaksiyada: xizmatlar bitta so'rov bilan olinadi,
+    # barber qatori qulflanadi, shuning uchun bir vaqtning o'zida kelgan ikki bron
+    # bir xil bo'sh vaqtni egallay olmaydi
+    service_ids = appointment_data.service_ids
+    query = select(Service).where(
+        Service.id.in_(service_ids),
+        Service.tenant_id == tenant_id,
+        Service.deleted_at.is_(None),
+    )
     result = await db.execute(query)
-    service = result.scalars().first()
+    services = {service.id: service for service in result.scalars().all()}
     
-    if not service:
+    if len(services) != len(service_ids):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Xizmat topilmadi"
         )
+
+    bundle = [services[service_id] for service_id in service_ids]
+    # Zonasiz vaqt salonning mahalliy vaqti; bazaga UTC da yoziladi
+    appointment_time = localize(appointment_data.appointment_time, salon_zone(tenant_id))
+    window_start, window_end = appointment_window()
+    if not window_start <= appointment_time < window_end:
+        # Bu vaqt uchun partitsiya yo'q: INSERT 500 xato bilan tugaydi
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Buyurtma vaqti ruxsat etilgan oraliqdan tashqarida"
+        )
+    duration = sum(service.duration for service in bundle)
+    if duration > settings.MAX_SERVICE_MINUTES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Xizmatlarning umumiy davomiyligi juda katta"
+        )
     
-    # Vaqt bo'sh ekanligini tekshirish
-    # Bu yerda vaqt bo'sh ekanligini tekshirish logikasi bo'lishi kerak
+    # Barber mavjudligini tekshirish (/barbers/available natijasidan tanlangan bo'lsa)
+    if appointment_data.barber_id is not None:
+        query = (
+            select(Barber.id)
+            .where(
+                Barber.id == appointment_data.barber_id,
+                Barber.tenant_id == tenant_id,
+                Barber.deleted_at.is_(None),
+            )
+            .with_for_update()
+        )
+        result = await db.execute(query)
+        if result.scalar() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Barber topilmadi"
+            )
+
+        # Vaqt bo'sh ekanligini tekshirish (to'plamning butun davomiyligi uchun)
+        conflict = await check_barber_slot(
+            db, tenant_id, appointment_data.barber_id, appointment_time, duration
+        )
+        if conflict == "off":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Barber bu vaqtda ishlamaydi"
+            )
+        if conflict == "busy":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Bu vaqt band"
+            )
     
-    # Yangi buyurtma yaratish
+    # Yangi buyurtma yaratish (xizmatlar qatorlari bilan birga bitta flush'da yoziladi)
     new_appointment = Appointment(
+        tenant_id=tenant_id,
         user_id=current_client.id,
-        service_id=appointment_data.service_id,
-        appointment_time=appointment_data.appointment_time,
-        status=AppointmentStatus.pending
+        service_id=service_ids[0],
+        barber_id=appointment_data.barber_id,
+        appointment_time=appointment_time,
+        status=AppointmentStatus.pending,
+        duration_minutes=duration,
+        total_price=sum(service.price for service in bundle),
+        services=[
+            AppointmentService(
+                service_id=service.id,
+                position=position,
+                price=service.price,
+                duration=service.duration,
+            )
+            for position, service in enumerate(bundle)
+        ],
     )
     
     db.add(new_appointment)
     await db.commit()
     await db.refresh(new_appointment)
+
+    await _publish(_change_events(new_appointment, "appointment.created", "slot.taken"))
+    audit_logger.record(
+        "create", "appointment", new_appointment.id,
+        actor=current_client, tenant_id=tenant_id,
+        changes={
+            "service_ids": service_ids,
+            "barber_id": appointment_data.barber_id,
+            "appointment_time": appointment_time,
+        },
+    )
     
     return new_appointment
 
@@ -69,48 +231,63 @@ async def get_my_appointments(
     skip: int = 0, 
     limit: int = 100, 
     status: Optional[AppointmentStatus] = None,
-    db: AsyncSession = Depends(get_db),
+    upcoming: bool = False,
+    db: AsyncSession = Depends(get_tenant_db),
+    tenant_id: int = Depends(get_tenant_id),
     current_client: User = Depends(get_current_client)
 ):
+    query = select(Appointment).where(
+        Appointment.user_id == current_client.id,
+        Appointment.tenant_id == tenant_id,
+    )
+
     if status:
-        query = select(Appointment).where(
-            Appointment.user_id == current_client.id,
-            Appointment.status == status
-        ).offset(skip).limit(limit)
-    else:
-        query = select(Appointment).where(
-            Appointment.user_id == current_client.id
-        ).offset(skip).limit(limit)
+        query = query.where(Appointment.status == status)
+
+    # Faqat kelgusi buyurtmalar: appointment_time bo'yicha shart eski oylik
+    # partitsiyalarni so'rovdan chiqarib tashlaydi (partition pruning)
+    if upcoming:
+        query = query.where(Appointment.appointment_time >= utc_now()).order_by(
+            Appointment.appointment_time
+        )
+
+    query = query.offset(skip).limit(limit)
     
     result = await db.execute(query)
     appointments = result.scalars().all()
     
-    return appointments
+    return json_response(appointment_list_adapter, appointments)
 
 # Barcha buyurtmalarni olish (faqat admin uchun)
 @router.get("/", response_model=List[AppointmentResponse])
 async def get_appointments(
     skip: int = 0, 
     limit: int = 100, 
-    db: AsyncSession = Depends(get_db),
-    current_client: User = Depends(get_current_client)
+    db: AsyncSession = Depends(get_tenant_db),
+    tenant_id: int = Depends(get_tenant_id),
+    principal: Principal = Depends(require_permission(APPOINTMENTS_MANAGE))
 ):
-    # Bu yerda admin tekshiruvi bo'lishi kerak
-    
-    query = select(Appointment).offset(skip).limit(limit)
+    query = (
+        select(Appointment)
+        .where(Appointment.tenant_id == tenant_id)
+        .order_by(Appointment.appointment_time.desc())
+        .offset(skip)
+        .limit(limit)
+    )
     result = await db.execute(query)
     appointments = result.scalars().all()
     
-    return appointments
+    return json_response(appointment_list_adapter, appointments)
 
 # Buyurtma ma'lumotlarini ID bo'yicha olish
 @router.get("/{appointment_id}", response_model=AppointmentResponse)
 async def get_appointment(
     appointment_id: int, 
-    db: AsyncSession = Depends(get_db),
-    current_client: User = Depends(get_current_client)
+    db: AsyncSession = Depends(get_tenant_read_db),
+    tenant_id: int = Depends(get_tenant_id),
+    principal: Principal = Depends(get_principal)
 ):
-    query = select(Appointment).where(Appointment.id == appointment_id)
+    query = select(Appointment).where(Appointment.id == appointment_id, Appointment.tenant_id == tenant_id)
     result = await db.execute(query)
     appointment = result.scalars().first()
     
@@ -121,9 +298,7 @@ async def get_appointment(
         )
     
     # Faqat o'z buyurtmasini yoki admin ko'ra oladi
-    if appointment.user_id != current_client.id:
-        # Admin tekshiruvi
-        pass
+    _check_owner(appointment, principal)
     
     return appointment
 
@@ -132,29 +307,44 @@ async def get_appointment(
 async def update_appointment_status(
     appointment_id: int,
     status: AppointmentStatus,
-    db: AsyncSession = Depends(get_db),
-    current_client: User = Depends(get_current_client)
+    db: AsyncSession = Depends(get_tenant_db),
+    tenant_id: int = Depends(get_tenant_id),
+    principal: Principal = Depends(get_principal)
 ):
-    query = select(Appointment).where(Appointment.id == appointment_id)
+    query = select(Appointment).where(Appointment.id == appointment_id, Appointment.tenant_id == tenant_id)
     result = await db.execute(query)
     appointment = result.scalars().first()
     
+    # status parametri fastapi.status modulini yashiradi - xatolar yordamchi funksiyalarda
     if not appointment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Buyurtma topilmadi"
-        )
+        raise _appointment_not_found()
     
-    # Faqat o'z buyurtmasini yoki admin o'zgartira oladi
-    if appointment.user_id != current_client.id:
-        # Admin tekshiruvi
-        pass
+    # Mijoz o'z buyurtmasini faqat bekor qila oladi, qolgan holatlar - salon xodimi
+    if status == AppointmentStatus.cancelled:
+        _check_owner(appointment, principal)
+    else:
+        _check_manager(appointment, principal)
     
-    # Statusni yangilash
+    # Statusni yangilash (bekor qilingan buyurtma tiklansa, vaqt qayta egallanadi)
+    previous_status = appointment.status
+    if previous_status == AppointmentStatus.cancelled and status != AppointmentStatus.cancelled:
+        await _retake_slot(db, appointment)
     appointment.status = status
     
     await db.commit()
     await db.refresh(appointment)
+
+    slot_event = None
+    if status == AppointmentStatus.cancelled and previous_status != AppointmentStatus.cancelled:
+        slot_event = "slot.released"
+    elif previous_status == AppointmentStatus.cancelled and status != AppointmentStatus.cancelled:
+        slot_event = "slot.taken"
+    await _publish(_change_events(appointment, "appointment.status", slot_event))
+    if status != previous_status:
+        audit_logger.record(
+            "status", "appointment", appointment_id,
+            actor=principal.id, tenant_id=tenant_id, changes={"status": [previous_status, status]},
+        )
     
     return appointment
 
@@ -162,10 +352,11 @@ async def update_appointment_status(
 @router.delete("/{appointment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def cancel_appointment(
     appointment_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_client: User = Depends(get_current_client)
+    db: AsyncSession = Depends(get_tenant_db),
+    tenant_id: int = Depends(get_tenant_id),
+    principal: Principal = Depends(get_principal)
 ):
-    query = select(Appointment).where(Appointment.id == appointment_id)
+    query = select(Appointment).where(Appointment.id == appointment_id, Appointment.tenant_id == tenant_id)
     result = await db.execute(query)
     appointment = result.scalars().first()
     
@@ -176,13 +367,23 @@ async def cancel_appointment(
         )
     
     # Faqat o'z buyurtmasini yoki admin o'zgartira oladi
-    if appointment.user_id != current_client.id:
-        # Admin tekshiruvi
-        pass
+    _check_owner(appointment, principal)
     
     # Buyurtmani bekor qilish
-    appointment.status = AppointmentStatus.cancelled
+    events = []
+    previous_status = appointment.status
+    if previous_status != AppointmentStatus.cancelled:
+        appointment.status = AppointmentStatus.cancelled
+        # commit dan keyin atributlar eskiradi - hodisa oldindan tayyorlanadi
+        events = _change_events(appointment, "appointment.status", "slot.released")
     
     await db.commit()
+    await _publish(events)
+    if events:
+        audit_logger.record(
+            "status", "appointment", appointment_id,
+            actor=principal.id, tenant_id=tenant_id,
+            changes={"status": [previous_status, AppointmentStatus.cancelled]},
+        )
     
     return None 
\ No newline at end of file
@@ -3,17 +3,24 @@ from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional
 
-from app.models.models import User
-from app.db.database import get_db
+from app.models.models import ClientRole, User
+from app.db.database import get_db, get_read_db
 from app.core.config import settings
+from app.core.ratelimit import RateLimiter, limit_per_ip, limit_per_route
+from app.core.revocation import revocation_store, family_key
+from app.core.permissions import Principal, permission_cache, role_key
+from app.core.tenancy import get_tenant_id
+from app.core.tokens import key_ring
 from app.utils.security import (
     get_password_hash,
     verify_password,
     create_token,
-    verify_token
+    verify_token,
+    new_token_family
 )
+from app.utils.timerange import UTC, utc_now
 
 # Router yaratish
 router = APIRouter()
@@ -21,12 +28,107 @@ router = APIRouter()
 # Token olish uchun schema
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
+# Har bir akkaunt uchun login urinishlari limiti
+login_account_limiter = RateLimiter("login:account", settings.RATE_LIMIT_LOGIN_PER_ACCOUNT)
+
 async def get_current_client(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db),
     is_refresh: bool = False
 ) -> User:
     """Token orqali mijozni tekshirish"""
+    return await _get_client_by_token(token, db, is_refresh)
+
+async def get_current_client_read(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_read_db)
+) -> User:
+    """Token orqali mijozni tekshirish (faqat o'qiydigan endpointlar uchun, replikadan)"""
+    return await _get_client_by_token(token, db)
+
+async def get_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_read_db),
+    tenant_id: int = Depends(get_tenant_id)
+) -> Principal:
+    """Token claim'laridan foydalanuvchi va uning shu salondagi ruxsatlari (mijoz bazadan o'qilmaydi)"""
+    payload, client_id = await _verify_claims(token, db)
+    return _principal(payload, client_id, tenant_id)
+
+def _principal(payload: dict, client_id: int, tenant_id: int) -> Principal:
+    # Claim'lar salon bo'yicha: boshqa salonning admini bu salonda oddiy mijoz
+    salon = str(tenant_id)
+    return Principal(
+        id=client_id,
+        tenant_id=tenant_id,
+        role=_tenant_claim(payload, "roles").get(salon),
+        permissions=permission_cache.from_claims(_tenant_claim(payload, "perms").get(salon)),
+    )
+
+def _tenant_claim(payload: dict, name: str) -> dict:
+    """Salon -> qiymat claim'i (eski, salonsiz tokenlarda bo'sh)"""
+    value = payload.get(name)
+    return value if isinstance(value, dict) else {}
+
+def require_permission(*permissions: str):
+    """Endpoint uchun ruxsat tekshiruvi: so'rov salonidagi token claim'lari bo'yicha, xotirada
+
+    Qaytarilgan dependency Principal beradi - admin endpointlari mijozni
+    bazadan yuklamasdan uning id sini (masalan audit uchun) ishlatadi.
+    """
+    required = frozenset(permissions)
+
+    async def check_permission(principal: Principal = Depends(get_principal)) -> Principal:
+        if not required <= principal.permissions:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Bu amal uchun ruxsat yo'q"
+            )
+        return principal
+
+    return check_permission
+
+def require_chain_permission(*permissions: str):
+    """Butun tarmoq uchun amallar (masalan salon yaratish) - ruxsat asosiy salonda
+
+    Ruxsat X-Salon-ID dan qat'i nazar DEFAULT_TENANT_ID dagi rol bo'yicha
+    tekshiriladi: filial admini o'z salon id'sini yuborib tarmoq darajasidagi
+    amalni bajara olmaydi.
+    """
+    required = frozenset(permissions)
+
+    async def check_chain_permission(
+        token: str = Depends(oauth2_scheme),
+        db: AsyncSession = Depends(get_read_db)
+    ) -> Principal:
+        payload, client_id = await _verify_claims(token, db)
+        principal = _principal(payload, client_id, settings.DEFAULT_TENANT_ID)
+        if not required <= principal.permissions:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Bu amal uchun ruxsat yo'q"
+            )
+        return principal
+
+    return check_chain_permission
+
+async def _get_client_by_token(token: str, db: AsyncSession, is_refresh: bool = False) -> User:
+    _, client_id = await _verify_claims(token, db, is_refresh)
+
+    query = select(User).where(User.id == client_id)
+    result = await db.execute(query)
+    client = result.scalars().first()
+
+    if client is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Mijoz topilmadi"
+        )
+
+    return client
+
+async def _verify_claims(token: str, db: AsyncSession, is_refresh: bool = False):
+    """Token imzosi, muddati va bekor qilinmaganini tekshirish -> (payload, client_id)"""
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -40,6 +142,14 @@ async def get_current_client(
             detail="Token yaroqsiz yoki muddati tugagan"
         )
 
+    # Token oilasi bekor qilinganmi (logout yoki qayta ishlatish) - xotirada O(1)
+    family_id = payload.get("fid")
+    if family_id and await revocation_store.is_revoked(db, family_key(family_id)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token bekor qilingan"
+        )
+
     client_id = payload.get("sub")
     if not client_id:
         raise HTTPException(
@@ -55,25 +165,31 @@ async def get_current_client(
             detail="Token noto'g'ri"
         )
 
-    query = select(User).where(User.id == client_id)
-    result = await db.execute(query)
-    client = result.scalars().first()
-
-    if client is None:
+    # Rol o'zgartirilgan bo'lsa, eski rol versiyasidagi tokenlar ishlamaydi
+    if await revocation_store.is_revoked(db, role_key(client_id, payload.get("rv", 0))):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Mijoz topilmadi"
+            detail="Rol o'zgartirilgan. Qaytadan kiring"
         )
 
-    return client
+    return payload, client_id
 
-@router.post("/token")
+@router.post(
+    "/token",
+    dependencies=[
+        Depends(limit_per_route("login", settings.RATE_LIMIT_LOGIN_PER_ROUTE)),
+        Depends(limit_per_ip("login", settings.RATE_LIMIT_LOGIN_PER_IP)),
+    ],
+)
 async def login_for_access_token(
     response: Response,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
     """Login qilish va tokenlar olish"""
+    # Limit bcrypt va bazaga murojaatdan oldin tekshiriladi
+    await login_account_limiter.hit(form_data.username.lower())
+
     # Mijozni email orqali qidirish
     query = select(User).where(User.email == form_data.username)
     result = await db.execute(query)
@@ -94,19 +210,12 @@ async def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Access va Refresh tokenlarni yaratish
-    access_token = create_token(data={"sub": str(client.id)})
-    refresh_token = create_token(data={"sub": str(client.id)}, is_refresh=True)
+    # Mijozning barcha salonlardagi rollari tokenga yoziladi
+    query = select(ClientRole.tenant_id, ClientRole.role).where(ClientRole.client_id == client.id)
+    roles = {str(tenant_id): role for tenant_id, role in (await db.execute(query)).all()}
 
-    # Refresh tokenni cookie sifatida saqlash
-    response.set_cookie(
-        key="refresh_token",
-        value=refresh_token,
-        httponly=True,
-        secure=True,
-        samesite="strict",
-        max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
-    )
+    # Access va Refresh tokenlarni yaratish (har bir login - yangi token oilasi)
+    access_token = _issue_tokens(response, str(client.id), new_token_family(), roles, client.role_version)
 
     return {
         "access_token": access_token,
@@ -124,27 +233,51 @@ async def refresh_access_token(
     refresh_token: Optional[str] = Cookie(None),
     db: AsyncSession = Depends(get_db)
 ):
-    """Refresh token orqali yangi access token olish"""
+    """Refresh token orqali yangi access token olish (rotation)"""
     if not refresh_token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Refresh token topilmadi"
         )
 
-    client = await get_current_client(refresh_token, db, is_refresh=True)
-    
-    # Yangi tokenlarni yaratish
-    new_access_token = create_token(data={"sub": str(client.id)})
-    new_refresh_token = create_token(data={"sub": str(client.id)}, is_refresh=True)
+    payload = verify_token(refresh_token, is_refresh=True)
+    if not payload or not payload.get("sub") or not payload.get("jti") or not payload.get("fid"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token yaroqsiz yoki muddati tugagan"
+        )
 
-    # Yangi refresh tokenni cookie sifatida saqlash
-    response.set_cookie(
-        key="refresh_token",
-        value=new_refresh_token,
-        httponly=True,
-        secure=True,
-        samesite="strict",
-        max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+    family_id = payload["fid"]
+    if await revocation_store.is_revoked(db, family_key(family_id)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token bekor qilingan"
+        )
+
+    # Rol o'zgargandan keyin eski rol bilan yangi access token berilmaydi
+    role_version = payload.get("rv", 0)
+    if await revocation_store.is_revoked(db, role_key(payload["sub"], role_version)):
+        response.delete_cookie(key="refresh_token")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Rol o'zgartirilgan. Qaytadan kiring"
+        )
+
+    # Eski refresh tokenni ishlatilgan deb belgilash. Agar u avval ishlatilgan bo'lsa -
+    # token o'g'irlangan bo'lishi mumkin, butun oila bekor qilinadi
+    expires_at = datetime.fromtimestamp(payload["exp"], UTC)
+    if not await revocation_store.revoke(db, payload["jti"], family_id, expires_at, "rotated"):
+        await _revoke_family(db, family_id, "reuse")
+        response.delete_cookie(key="refresh_token")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token qayta ishlatilgan. Qaytadan kiring"
+        )
+
+    # Yangi tokenlar o'sha oilada yaratiladi (mijozni bazadan qayta o'qish shart emas:
+    # rollar refresh tokenda, ruxsatlar esa rol bo'yicha keshdan olinadi)
+    new_access_token = _issue_tokens(
+        response, payload["sub"], family_id, _tenant_claim(payload, "roles"), role_version
     )
 
     return {
@@ -153,13 +286,56 @@ async def refresh_access_token(
     }
 
 @router.post("/logout")
-async def logout(response: Response):
+async def logout(
+    response: Response,
+    refresh_token: Optional[str] = Cookie(None),
+    db: AsyncSession = Depends(get_db)
+):
     """Tizimdan chiqish"""
+    # Refresh token oilasini bekor qilish (shu oiladagi access tokenlar ham ishlamay qoladi)
+    payload = verify_token(refresh_token, is_refresh=True) if refresh_token else None
+    if payload and payload.get("fid"):
+        await _revoke_family(db, payload["fid"], "logout")
+
     response.delete_cookie(key="refresh_token")
     return {"message": "Muvaffaqiyatli chiqish amalga oshirildi"}
 
+def _issue_tokens(
+    response: Response,
+    client_id: str,
+    family_id: str,
+    roles: Optional[Dict[str, str]] = None,
+    role_version: int = 0
+) -> str:
+    """Access va refresh tokenlarni yaratish, refresh tokenni cookie ga yozish
+
+    Rollar va ruxsatlar salon bo'yicha claim sifatida yoziladi ({"<salon id>": ...}) -
+    admin endpointlari ularni bazaga murojaat qilmasdan, so'rov saloni uchun tekshiradi.
+    """
+    roles = roles or {}
+    claims = {"sub": client_id, "fid": family_id, "roles": roles, "rv": role_version}
+    access_token = create_token(data={**claims, "perms": permission_cache.for_roles(roles)})
+    refresh_token = create_token(data=claims, is_refresh=True)
+
+    # Refresh tokenni cookie sifatida saqlash
+    response.set_cookie(
+        key="refresh_token",
+        value=refresh_token,
+        httponly=True,
+        secure=True,
+        samesite="strict",
+        max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+    )
+
+    return access_token
+
+async def _revoke_family(db: AsyncSession, family_id: str, reason: str) -> None:
+    """Token oilasini to'liq bekor qilish"""
+    expires_at = utc_now() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    await revocation_store.revoke(db, family_key(family_id), family_id, expires_at, reason)
+
 @router.get("/me")
-async def read_clients_me(current_client: User = Depends(get_current_client)):
+async def read_clients_me(current_client: User = Depends(get_current_client_read)):
     """Joriy mijoz ma'lumotlarini olish"""
     return {
         "status": "logged_in",
@@ -176,4 +352,9 @@ async def check_auth(current_client: User = Depends(get_current_client)):
     return {
         "status": "logged_in",
         "client_id": current_client.id
-    } 
\ No newline at end of file
+    } 
+
+@router.get("/.well-known/jwks.json")
+async def get_jwks():
+    """Tokenlarni boshqa servislarda tekshirish uchun ochiq kalitlar (faqat RS256/ES256)"""
+    return key_ring.jwks()
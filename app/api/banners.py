@@ -1,35 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List, Optional
-from pydantic import BaseModel
-from datetime import date, datetime
+from typing import List
 
-from app.models.models import Banner, User
-from app.db.database import get_db
-from app.api.auth import get_current_client
+from app.models.models import Banner
+from app.db.database import get_read_db
+from app.core.singleflight import shared_json
+from app.schemas import BannerResponse, banner_list_adapter, dump_json
+from app.utils.timerange import utc_now
 
 router = APIRouter()
 
-# Banner ma'lumotlarini qaytarish uchun schema
-class BannerResponse(BaseModel):
-    id: int
-    start_date: Optional[datetime] = None
-    end_date: Optional[datetime] = None
-    is_active: bool
-    image_url: Optional[str] = None
-    
-    class Config:
-        from_attributes = True
 # Barcha bannerlarni olish
 @router.get("/", response_model=List[BannerResponse])
 async def get_banners(
     active_only: bool = False,
     skip: int = 0, 
     limit: int = 100, 
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    today = datetime.now()
+    # Push-kampaniya paytidagi bir xil so'rovlar bitta so'rov natijasini bo'lishadi
+    key = ("banners", active_only, skip, limit)
+    return await shared_json(key, lambda: _load_banners(db, active_only, skip, limit))
+
+async def _load_banners(db: AsyncSession, active_only: bool, skip: int, limit: int) -> bytes:
+    # Banner vaqtlari timestamptz: solishtirish aware UTC bilan
+    today = utc_now()
 
     # Banner modelida faqat id, start_date, end_date, is_active, image_url ustunlari bor
     # To'liq Banner obyektini tanlaymiz
@@ -47,13 +43,13 @@ async def get_banners(
     result = await db.execute(query)
     banners = result.scalars().all()  # scalars() orqali Banner obyektlarini olamiz
 
-    return banners
+    return dump_json(banner_list_adapter, banners)
 
 # Banner ma'lumotlarini ID bo'yicha olish
 @router.get("/{banner_id}", response_model=BannerResponse)
 async def get_banner(
     banner_id: int, 
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     # Banner modelida faqat id, start_date, end_date, is_active, image_url ustunlari bor
     query = select(Banner).where(Banner.id == banner_id)
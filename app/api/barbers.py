@@ -1,52 +1,98 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete
 from sqlalchemy.future import select
 from typing import List, Optional
-from pydantic import BaseModel
+from datetime import date, datetime, time, timedelta
 
-from app.models.models import Barber, User
-from app.db.database import get_db
-from app.api.auth import get_current_client
+from app.core.config import settings
+from app.models.models import Barber, BarberScheduleOverride, BarberWorkingHours, Category, Salon, Service
+from app.db.database import get_tenant_db, get_tenant_read_db
+from app.core.tenancy import get_tenant_id
+from app.core.audit import audit_logger, diff
+from app.core.permissions import Principal, BARBERS_WRITE
+from app.api.auth import require_permission
+from app.schemas import (
+    AvailableSlotResponse,
+    BarberCreate,
+    BarberResponse,
+    BarberScheduleResponse,
+    ScheduleOverrideResponse,
+    ScheduleOverrideUpdate,
+    TimeRange,
+    WorkingHoursResponse,
+    WorkingHoursUpdate,
+    available_slot_list_adapter,
+    barber_list_adapter,
+    json_response,
+)
+from app.utils.schedule import find_earliest_slots, load_busy_intervals, load_schedules
+from app.utils.timerange import local_today, localize, salon_zone, utc_now
+from app.utils.workhours import load_work_masks, mask_ranges, range_mask, working_hours_cache
 
 router = APIRouter()
 
-# Barber yaratish uchun schema
-class BarberCreate(BaseModel):
-    full_name: str
-    phone: str
-    email: Optional[str] = None
-    bio: Optional[str] = None
-    experience: Optional[int] = None
-    rating: Optional[float] = None
-    category_id: Optional[int] = None
-    image_url: Optional[str] = None
-
-# Barber ma'lumotlarini qaytarish uchun schema
-class BarberResponse(BaseModel):
-    id: int
-    full_name: str
-    phone: str
-    email: Optional[str] = None
-    bio: Optional[str] = None
-    experience: Optional[int] = None
-    rating: Optional[float] = None
-    category_id: Optional[int] = None
-    image_url: Optional[str] = None
-    
-    class Config:
-        from_attributes = True
+def _to_minutes(ranges: List[TimeRange]):
+    """Oraliqlarni minutlarga o'tkazish, kesishganlarini birlashtirish (bitmap orqali)"""
+    mask = 0
+    for item in ranges:
+        start = item.start.hour * 60 + item.start.minute
+        end = item.end.hour * 60 + item.end.minute or 24 * 60
+        if end <= start:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Ish vaqti oralig'ida end start dan keyin bo'lishi kerak"
+            )
+        mask |= range_mask(start, end)
+    return mask_ranges(mask)
+
+def _to_time_ranges(ranges):
+    """Minutlar oralig'ini javob formatiga (end = 24:00 -> 00:00)"""
+    return [
+        {"start": time(start // 60, start % 60), "end": time(end // 60 % 24, end % 60)}
+        for start, end in ranges
+    ]
+
+async def _get_barber_or_404(db: AsyncSession, tenant_id: int, barber_id: int):
+    query = select(Barber.id).where(
+        Barber.id == barber_id,
+        Barber.tenant_id == tenant_id,
+        Barber.deleted_at.is_(None),
+    )
+    result = await db.execute(query)
+    if result.scalar() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Barber topilmadi"
+        )
+
+async def _check_barber_refs(db: AsyncSession, tenant_id: int, category_id: Optional[int]):
+    """Barber shu salonga va uning kategoriyasiga biriktirilishi mumkinligini tekshirish"""
+    if category_id is not None:
+        query = select(Category.id).where(Category.id == category_id, Category.tenant_id == tenant_id)
+        if (await db.execute(query)).scalar() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Kategoriya topilmadi"
+            )
+    elif await db.get(Salon, tenant_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Salon topilmadi"
+        )
 
 # Yangi barber yaratish (faqat admin uchun)
 @router.post("/", response_model=BarberResponse, status_code=status.HTTP_201_CREATED)
 async def create_barber(
     barber_data: BarberCreate, 
-    db: AsyncSession = Depends(get_db),
-    current_client: User = Depends(get_current_client)
+    db: AsyncSession = Depends(get_tenant_db),
+    tenant_id: int = Depends(get_tenant_id),
+    principal: Principal = Depends(require_permission(BARBERS_WRITE))
 ):
-    # Admin tekshiruvi
-    
+    await _check_barber_refs(db, tenant_id, barber_data.category_id)
+
     # Telefon raqami mavjudligini tekshirish
-    query = select(Barber).where(Barber.phone == barber_data.phone)
+    query = select(Barber).where(Barber.phone == barber_data.phone, Barber.deleted_at.is_(None))
     result = await db.execute(query)
     existing_barber = result.scalars().first()
     
@@ -58,6 +104,7 @@ async def create_barber(
     
     # Yangi barber yaratish
     new_barber = Barber(
+        tenant_id=tenant_id,
         full_name=barber_data.full_name,
         phone=barber_data.phone,
         email=barber_data.email,
@@ -71,6 +118,11 @@ async def create_barber(
     db.add(new_barber)
     await db.commit()
     await db.refresh(new_barber)
+
+    audit_logger.record(
+        "create", "barber", new_barber.id,
+        actor=principal.id, tenant_id=tenant_id, changes=barber_data.model_dump(),
+    )
     
     return new_barber
 
@@ -79,22 +131,110 @@ async def create_barber(
 async def get_barbers(
     skip: int = 0, 
     limit: int = 100, 
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_tenant_read_db),
+    tenant_id: int = Depends(get_tenant_id)
 ):
-    # is_active ustunini ishlatmasdan barcha barberlarni olish
-    query = select(Barber).offset(skip).limit(limit)
+    # is_active ustunini ishlatmasdan salonning barcha barberlarini olish
+    query = (
+        select(Barber)
+        .where(Barber.tenant_id == tenant_id, Barber.deleted_at.is_(None))
+        .offset(skip)
+        .limit(limit)
+    )
     result = await db.execute(query)
     barbers = result.scalars().all()
     
-    return barbers
+    return json_response(barber_list_adapter, barbers)
+
+# Xizmat (yoki xizmatlar to'plami) uchun eng yaqin bo'sh barberlar
+# (birinchi xizmat kategoriyasidagi barcha barberlar orasidan)
+@router.get("/available", response_model=List[AvailableSlotResponse])
+async def get_available_barbers(
+    service_id: Optional[int] = None,
+    service_ids: List[int] = Query([]),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = 5,
+    db: AsyncSession = Depends(get_tenant_read_db),
+    tenant_id: int = Depends(get_tenant_id)
+):
+    service_ids = service_ids or ([service_id] if service_id is not None else [])
+    if not service_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="service_id yoki service_ids berilishi kerak"
+        )
+
+    query = select(Service.id, Service.category_id, Service.duration).where(
+        Service.id.in_(service_ids),
+        Service.tenant_id == tenant_id,
+        Service.deleted_at.is_(None),
+    )
+    result = await db.execute(query)
+    services = {row.id: row for row in result.all()}
+
+    if len(services) != len(set(service_ids)):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Xizmat topilmadi"
+        )
+
+    category_id = services[service_ids[0]].category_id
+    total_duration = sum(services[item].duration for item in service_ids)
+
+    # Qidiruv oynasi salonning mahalliy vaqtida (zonasiz start/end ham shunday tushuniladi)
+    zone = salon_zone(tenant_id)
+    start = localize(start, zone) if start is not None else utc_now().astimezone(zone)
+    if end is None:
+        end = start + timedelta(days=settings.SLOT_SEARCH_DAYS)
+    else:
+        end = localize(end, zone)
+
+    if end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end start dan keyin bo'lishi kerak"
+        )
+
+    names, busy = await load_busy_intervals(
+        db,
+        tenant_id,
+        category_id,
+        start,
+        end,
+        timedelta(minutes=settings.MAX_SERVICE_MINUTES),
+    )
+
+    work_masks = await load_work_masks(db, tenant_id, names, start.date(), (end - timedelta(microseconds=1)).date())
+    slots = find_earliest_slots(
+        busy,
+        work_masks,
+        start,
+        end,
+        total_duration,
+        settings.SLOT_STEP_MINUTES,
+        max(1, min(limit, 100)),
+    )
+
+    duration = timedelta(minutes=total_duration)
+
+    return json_response(available_slot_list_adapter, [
+        {"barber_id": barber_id, "barber_name": names[barber_id], "start": slot, "end": slot + duration}
+        for slot, barber_id in slots
+    ])
 
 # Barber ma'lumotlarini ID bo'yicha olish
 @router.get("/{barber_id}", response_model=BarberResponse)
 async def get_barber(
     barber_id: int, 
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_tenant_read_db),
+    tenant_id: int = Depends(get_tenant_id)
 ):
-    query = select(Barber).where(Barber.id == barber_id)
+    query = select(Barber).where(
+        Barber.id == barber_id,
+        Barber.tenant_id == tenant_id,
+        Barber.deleted_at.is_(None),
+    )
     result = await db.execute(query)
     barber = result.scalars().first()
     
@@ -106,17 +246,175 @@ async def get_barber(
     
     return barber
 
+# Barberning kunlik jadvali (buyurtmalar va bo'sh vaqtlar)
+@router.get("/{barber_id}/schedule", response_model=BarberScheduleResponse)
+async def get_barber_schedule(
+    barber_id: int,
+    date: date,
+    db: AsyncSession = Depends(get_tenant_read_db),
+    tenant_id: int = Depends(get_tenant_id)
+):
+    schedules = await load_schedules(db, tenant_id, date, barber_id=barber_id)
+
+    if not schedules:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Barber topilmadi"
+        )
+
+    return schedules[0]
+
+# Barberning ish vaqti (haftalik shablon va bugundan keyingi istisnolar)
+@router.get("/{barber_id}/working-hours", response_model=WorkingHoursResponse)
+async def get_working_hours(
+    barber_id: int,
+    db: AsyncSession = Depends(get_tenant_read_db),
+    tenant_id: int = Depends(get_tenant_id)
+):
+    await _get_barber_or_404(db, tenant_id, barber_id)
+
+    query = (
+        select(BarberWorkingHours)
+        .where(BarberWorkingHours.barber_id == barber_id)
+        .order_by(BarberWorkingHours.weekday, BarberWorkingHours.start_minute)
+    )
+    days = {}
+    for row in (await db.execute(query)).scalars().all():
+        days.setdefault(row.weekday, []).append((row.start_minute, row.end_minute))
+
+    query = (
+        select(BarberScheduleOverride)
+        .where(
+            BarberScheduleOverride.barber_id == barber_id,
+            BarberScheduleOverride.date >= local_today(salon_zone(tenant_id)),
+        )
+        .order_by(BarberScheduleOverride.date, BarberScheduleOverride.start_minute)
+    )
+    overrides = {}
+    for row in (await db.execute(query)).scalars().all():
+        override = overrides.setdefault(row.date, {"date": row.date, "day_off": False, "ranges": []})
+        if row.is_day_off:
+            override["day_off"] = True
+        else:
+            override["ranges"].append((row.start_minute, row.end_minute))
+
+    return {
+        "barber_id": barber_id,
+        "days": [
+            {"weekday": weekday, "ranges": _to_time_ranges(ranges)}
+            for weekday, ranges in sorted(days.items())
+        ],
+        "overrides": [
+            {**override, "ranges": _to_time_ranges(override["ranges"])}
+            for override in overrides.values()
+        ],
+    }
+
+# Haftalik ish vaqti shablonini almashtirish (faqat admin uchun)
+# Ro'yxatda yo'q hafta kunlari - dam olish kunlari
+@router.put("/{barber_id}/working-hours", response_model=WorkingHoursResponse)
+async def update_working_hours(
+    barber_id: int,
+    hours: WorkingHoursUpdate,
+    db: AsyncSession = Depends(get_tenant_db),
+    tenant_id: int = Depends(get_tenant_id),
+    principal: Principal = Depends(require_permission(BARBERS_WRITE))
+):
+    await _get_barber_or_404(db, tenant_id, barber_id)
+
+    rows = []
+    for day in hours.days:
+        for start, end in _to_minutes(day.ranges):
+            rows.append(BarberWorkingHours(
+                barber_id=barber_id, weekday=day.weekday, start_minute=start, end_minute=end
+            ))
+
+    await db.execute(delete(BarberWorkingHours).where(BarberWorkingHours.barber_id == barber_id))
+    db.add_all(rows)
+    await db.commit()
+    working_hours_cache.invalidate(tenant_id, barber_id)
+
+    audit_logger.record(
+        "update", "barber_working_hours", barber_id,
+        actor=principal.id, tenant_id=tenant_id, changes=hours.model_dump(),
+    )
+
+    return await get_working_hours(barber_id, db, tenant_id)
+
+# Aniq sana uchun ish vaqti yoki dam olish kunini belgilash (faqat admin uchun)
+@router.put("/{barber_id}/working-hours/overrides/{day}", response_model=ScheduleOverrideResponse)
+async def set_schedule_override(
+    barber_id: int,
+    day: date,
+    override: ScheduleOverrideUpdate,
+    db: AsyncSession = Depends(get_tenant_db),
+    tenant_id: int = Depends(get_tenant_id),
+    principal: Principal = Depends(require_permission(BARBERS_WRITE))
+):
+    await _get_barber_or_404(db, tenant_id, barber_id)
+
+    ranges = [] if override.day_off else _to_minutes(override.ranges)
+    if override.day_off or not ranges:
+        rows = [BarberScheduleOverride(barber_id=barber_id, date=day, is_day_off=True)]
+    else:
+        rows = [
+            BarberScheduleOverride(barber_id=barber_id, date=day, start_minute=start, end_minute=end)
+            for start, end in ranges
+        ]
+
+    await db.execute(delete(BarberScheduleOverride).where(
+        BarberScheduleOverride.barber_id == barber_id,
+        BarberScheduleOverride.date == day,
+    ))
+    db.add_all(rows)
+    await db.commit()
+    working_hours_cache.invalidate(tenant_id, barber_id)
+
+    audit_logger.record(
+        "update", "barber_schedule_override", barber_id,
+        actor=principal.id, tenant_id=tenant_id, changes={"date": day, **override.model_dump()},
+    )
+
+    return {"date": day, "day_off": not ranges, "ranges": _to_time_ranges(ranges)}
+
+# Istisnoni o'chirish - shu sana yana haftalik shablon bo'yicha (faqat admin uchun)
+@router.delete("/{barber_id}/working-hours/overrides/{day}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_schedule_override(
+    barber_id: int,
+    day: date,
+    db: AsyncSession = Depends(get_tenant_db),
+    tenant_id: int = Depends(get_tenant_id),
+    principal: Principal = Depends(require_permission(BARBERS_WRITE))
+):
+    await _get_barber_or_404(db, tenant_id, barber_id)
+    await db.execute(delete(BarberScheduleOverride).where(
+        BarberScheduleOverride.barber_id == barber_id,
+        BarberScheduleOverride.date == day,
+    ))
+    await db.commit()
+    working_hours_cache.invalidate(tenant_id, barber_id)
+
+    audit_logger.record(
+        "delete", "barber_schedule_override", barber_id,
+        actor=principal.id, tenant_id=tenant_id, changes={"date": day},
+    )
+
+    return None
+
 # Barberni yangilash (faqat admin uchun)
 @router.put("/{barber_id}", response_model=BarberResponse)
 async def update_barber(
     barber_id: int,
     barber_data: BarberCreate,
-    db: AsyncSession = Depends(get_db),
-    current_client: User = Depends(get_current_client)
+    db: AsyncSession = Depends(get_tenant_db),
+    tenant_id: int = Depends(get_tenant_id),
+    principal: Principal = Depends(require_permission(BARBERS_WRITE))
 ):
-    # Admin tekshiruvi
-    
-    query = select(Barber).where(Barber.id == barber_id)
+    query = select(Barber).where(
+        Barber.id == barber_id,
+        Barber.tenant_id == tenant_id,
+        Barber.deleted_at.is_(None),
+    )
     result = await db.execute(query)
     barber = result.scalars().first()
     
@@ -126,7 +424,10 @@ async def update_barber(
             detail="Barber topilmadi"
         )
     
+    await _check_barber_refs(db, tenant_id, barber_data.category_id)
+
     # Barberni yangilash
+    changes = diff(barber, barber_data.model_dump())
     barber.full_name = barber_data.full_name
     barber.phone = barber_data.phone
     barber.email = barber_data.email
@@ -138,6 +439,9 @@ async def update_barber(
     
     await db.commit()
     await db.refresh(barber)
+
+    if changes:
+        audit_logger.record("update", "barber", barber_id, actor=principal.id, tenant_id=tenant_id, changes=changes)
     
     return barber
 
@@ -145,12 +449,15 @@ async def update_barber(
 @router.delete("/{barber_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_barber(
     barber_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_client: User = Depends(get_current_client)
+    db: AsyncSession = Depends(get_tenant_db),
+    tenant_id: int = Depends(get_tenant_id),
+    principal: Principal = Depends(require_permission(BARBERS_WRITE))
 ):
-    # Admin tekshiruvi
-    
-    query = select(Barber).where(Barber.id == barber_id)
+    query = select(Barber).where(
+        Barber.id == barber_id,
+        Barber.tenant_id == tenant_id,
+        Barber.deleted_at.is_(None),
+    )
     result = await db.execute(query)
     barber = result.scalars().first()
     
@@ -160,8 +467,11 @@ async def delete_barber(
             detail="Barber topilmadi"
         )
     
-    # Barberni to'liq o'chirib tashlash
-    await db.delete(barber)
+    # Soft delete: buyurtmalar tarixi va analitika barberga havolani saqlaydi
+    barber.deleted_at = utc_now()
     await db.commit()
+    working_hours_cache.invalidate(tenant_id, barber_id)
+
+    audit_logger.record("delete", "barber", barber_id, actor=principal.id, tenant_id=tenant_id)
     
     return None 
\ No newline at end of file
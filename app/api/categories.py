@@ -3,33 +3,33 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.sql import func  
 from typing import List, Optional
-from pydantic import BaseModel
-from datetime import datetime
+from datetime import date
 
 from app.models.models import Category, Barber  
-from app.db.database import get_db
+from app.db.database import get_tenant_read_db
+from app.core.singleflight import shared_json
+from app.core.tenancy import get_tenant_id, tenant_key
+from app.schemas import BarberScheduleResponse, CategoryResponse, category_list_adapter, dump_json, json_response, schedule_list_adapter
+from app.utils.schedule import load_schedules
 
 router = APIRouter()
 
-# Kategoriya ma'lumotlarini qaytarish uchun schema
-class CategoryResponse(BaseModel):
-    id: int
-    created_at: datetime
-    name: str
-    description: str | None
-    image_url: str | None
-    barber_count: int  # Qo‘shildi
-
-    class Config:
-        from_attributes = True
-
 @router.get("/", response_model=List[CategoryResponse])
 async def get_categories(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_tenant_read_db),
+    tenant_id: int = Depends(get_tenant_id),
     name: Optional[str] = None,  # Filtrlash uchun
     sort_by: Optional[str] = "id",  # Default holatda ID bo‘yicha saralanadi
     order: Optional[str] = "asc",  # Default tartib (oshish tartibida)
 ):
+    # Bir vaqtda kelgan bir xil so'rovlar bitta so'rov natijasini bo'lishadi
+    if sort_by not in ("id", "name", "barber_count", "created_at"):
+        sort_by = "id"
+    order = "asc" if order == "asc" else "desc"
+    key = tenant_key(tenant_id, "categories", name or None, sort_by, order)
+    return await shared_json(key, lambda: _load_categories(db, tenant_id, name, sort_by, order))
+
+async def _load_categories(db: AsyncSession, tenant_id: int, name: Optional[str], sort_by: str, order: str) -> bytes:
     query = (
         select(
             Category.id,
@@ -39,7 +39,8 @@ async def get_categories(
             Category.image_url,
             func.count(Barber.id).label("barber_count"),
         )
-        .outerjoin(Barber, Category.id == Barber.category_id)
+        .outerjoin(Barber, (Category.id == Barber.category_id) & Barber.deleted_at.is_(None))
+        .where(Category.tenant_id == tenant_id)
         .group_by(Category.id, Category.created_at, Category.name, Category.description, Category.image_url)
     )
 
@@ -63,14 +64,15 @@ async def get_categories(
     result = await db.execute(query)
     categories = result.all()
 
-    return [
-        {
-            "id": row.id,
-            "created_at": row.created_at,
-            "name": row.name,
-            "description": row.description,
-            "image_url": row.image_url,
-            "barber_count": row.barber_count,
-        }
-        for row in categories
-    ]
+    # Row obyektlari atributlar orqali o'qiladi - oraliq dict'lar kerak emas
+    return dump_json(category_list_adapter, categories)
+
+# Kategoriyadagi barcha barberlarning kunlik jadvali
+@router.get("/{category_id}/schedule", response_model=List[BarberScheduleResponse])
+async def get_category_schedule(
+    category_id: int,
+    date: date,
+    db: AsyncSession = Depends(get_tenant_read_db),
+    tenant_id: int = Depends(get_tenant_id),
+):
+    return json_response(schedule_list_adapter, await load_schedules(db, tenant_id, date, category_id=category_id))
@@ -1,40 +1,34 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import union
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import List, Optional
-from pydantic import BaseModel, EmailStr, validator
-from datetime import datetime
+from datetime import timedelta
 
-from app.models.models import User
-from app.db.database import get_db
-from app.api.auth import get_current_client
+from app.models.models import Appointment, ClientRole, User
+from app.db.database import get_db, get_tenant_db
+from app.api.auth import get_principal, require_permission
 from app.utils.security import get_password_hash
+from app.core.audit import audit_logger
+from app.core.config import settings
+from app.core.permissions import CLIENTS_MANAGE, CLIENTS_READ, Principal, permission_cache, role_key
+from app.core.revocation import revocation_store
+from app.core.tenancy import get_tenant_id
+from app.core.ratelimit import limit_per_ip, limit_per_route
+from app.schemas import ClientCreate, ClientResponse, ClientRoleUpdate, client_list_adapter, json_response
+from app.utils.timerange import utc_now
 
 router = APIRouter()
 
-# Mijoz yaratish uchun schema
-class ClientCreate(BaseModel):
-    email: EmailStr
-    password: str
-    full_name: str
-    
-    @validator('password')
-    def password_strength(cls, v):
-        if len(v) < 6:
-            raise ValueError('Parol kamida 6 ta belgidan iborat bo\'lishi kerak')
-        return v
-
-# Mijoz ma'lumotlarini qaytarish uchun schema
-class ClientResponse(BaseModel):
-    id: int
-    created_at: datetime
-    email: str
-    full_name: str
-    
-    class Config:
-        from_attributes = True
-
-@router.post("/", response_model=ClientResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/",
+    response_model=ClientResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[
+        Depends(limit_per_route("signup", settings.RATE_LIMIT_SIGNUP_PER_ROUTE)),
+        Depends(limit_per_ip("signup", settings.RATE_LIMIT_SIGNUP_PER_IP)),
+    ],
+)
 async def create_client(client_data: ClientCreate, db: AsyncSession = Depends(get_db)):
     try:
         # Email mavjudligini tekshirish
@@ -61,6 +55,8 @@ async def create_client(client_data: ClientCreate, db: AsyncSession = Depends(ge
         await db.refresh(new_client)
         
         return new_client
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -74,42 +70,141 @@ async def create_client(client_data: ClientCreate, db: AsyncSession = Depends(ge
         )
 
 
-# Barcha mijozlarni olish (faqat admin uchun)
+def _with_role(client: User, role: Optional[str]) -> ClientResponse:
+    """Mijoz va uning so'rov salonidagi roli"""
+    return ClientResponse(
+        id=client.id, created_at=client.created_at, email=client.email, full_name=client.full_name, role=role
+    )
+
+def _clients_query(tenant_id: int):
+    """Mijozlar va ularning shu salondagi roli (rol bo'lmasa None)"""
+    role = (
+        select(ClientRole.role)
+        .where(ClientRole.client_id == User.id, ClientRole.tenant_id == tenant_id)
+        .scalar_subquery()
+    )
+    return select(User, role)
+
+async def _salon_client_filter(tenant_id: int, db: AsyncSession, tenant_db: AsyncSession):
+    """Salon mijozlari: shu salonda roli bor yoki shu salonda buyurtma qilganlar
+
+    So'rov salon a'zolari id'laridan boshlanadi (butun tarmoq mijozlari ko'rib
+    chiqilmaydi). Umumiy bazadagi salonda buyurtmalar ichki so'rov bilan olinadi,
+    alohida bazadagi salonda esa mijozlar jadvali boshqa bazada - id'lar avval
+    salon bazasidan o'qiladi.
+    """
+    staff = select(ClientRole.client_id).where(ClientRole.tenant_id == tenant_id)
+    visitors = select(Appointment.user_id).where(Appointment.tenant_id == tenant_id)
+    if tenant_db is db:
+        return User.id.in_(union(staff, visitors))
+
+    ids = set((await tenant_db.execute(visitors.distinct())).scalars().all())
+    ids.update((await db.execute(staff)).scalars().all())
+    return User.id.in_(ids)
+
+# Salon mijozlari va xodimlari (faqat shu salonda clients:read ruxsati bilan)
 @router.get("/", response_model=List[ClientResponse])
 async def get_clients(
     skip: int = 0, 
     limit: int = 100, 
     db: AsyncSession = Depends(get_db),
-    current_client: User = Depends(get_current_client)
+    tenant_db: AsyncSession = Depends(get_tenant_db),
+    tenant_id: int = Depends(get_tenant_id),
+    principal: Principal = Depends(require_permission(CLIENTS_READ))
 ):
-    # Bu yerda admin tekshiruvi bo'lishi kerak
-    
-    query = select(User).offset(skip).limit(limit)
+    query = (
+        _clients_query(tenant_id)
+        .where(await _salon_client_filter(tenant_id, db, tenant_db))
+        .order_by(User.id)
+        .offset(skip)
+        .limit(limit)
+    )
     result = await db.execute(query)
-    clients = result.scalars().all()
+    clients = [_with_role(client, role) for client, role in result.all()]
     
-    return clients
+    return json_response(client_list_adapter, clients)
 
 # Mijoz ma'lumotlarini ID bo'yicha olish
 @router.get("/{client_id}", response_model=ClientResponse)
 async def get_client(
     client_id: int, 
     db: AsyncSession = Depends(get_db),
-    current_client: User = Depends(get_current_client)
+    tenant_db: AsyncSession = Depends(get_tenant_db),
+    tenant_id: int = Depends(get_tenant_id),
+    principal: Principal = Depends(get_principal)
 ):
-    # Faqat o'z ma'lumotlarini yoki admin ko'ra oladi
-    if current_client.id != client_id:
-        # Admin tekshiruvi
-        pass
+    # Faqat o'z ma'lumotlarini yoki shu salon admini (faqat salon mijozlarini) ko'ra oladi
+    if principal.id != client_id and not principal.has(CLIENTS_READ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Bu amal uchun ruxsat yo'q"
+        )
     
-    query = select(User).where(User.id == client_id)
+    query = _clients_query(tenant_id).where(User.id == client_id)
+    if principal.id != client_id:
+        query = query.where(await _salon_client_filter(tenant_id, db, tenant_db))
     result = await db.execute(query)
-    client = result.scalars().first()
+    row = result.first()
     
-    if not client:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Mijoz topilmadi"
         )
     
-    return client 
\ No newline at end of file
+    return _with_role(*row)
+
+# Mijozning shu salondagi rolini o'zgartirish (faqat shu salon admini)
+@router.put("/{client_id}/role", response_model=ClientResponse)
+async def update_client_role(
+    client_id: int,
+    role_data: ClientRoleUpdate,
+    db: AsyncSession = Depends(get_db),
+    tenant_id: int = Depends(get_tenant_id),
+    principal: Principal = Depends(require_permission(CLIENTS_MANAGE))
+):
+    if role_data.role is not None and not permission_cache.is_known(role_data.role):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Noma'lum rol"
+        )
+
+    client = await db.get(User, client_id)
+    if not client:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Mijoz topilmadi"
+        )
+
+    client_role = await db.get(ClientRole, (client_id, tenant_id))
+    previous_role = client_role.role if client_role else None
+    if previous_role == role_data.role:
+        return _with_role(client, previous_role)
+
+    if role_data.role is None:
+        await db.delete(client_role)
+    elif client_role is None:
+        db.add(ClientRole(client_id=client_id, tenant_id=tenant_id, role=role_data.role))
+    else:
+        client_role.role = role_data.role
+
+    previous_version = client.role_version
+    client.role_version = previous_version + 1
+
+    # Rol va eski versiyali tokenlarni bekor qilish bitta tranzaksiyada yoziladi.
+    # Ruxsatlar tokenda bo'lgani uchun mijoz qayta kirganda yangi rol bilan token oladi.
+    # Kalit allaqachon mavjud bo'lsa - rol parallel so'rovda o'zgartirilgan
+    expires_at = utc_now() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    if not await revocation_store.revoke(db, role_key(client_id, previous_version), f"client:{client_id}", expires_at, "role"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Rol bir vaqtda o'zgartirilmoqda, qaytadan urinib ko'ring"
+        )
+
+    await db.refresh(client)
+    audit_logger.record(
+        "role", "client", client_id,
+        actor=principal.id, tenant_id=tenant_id, changes={"role": [previous_role, role_data.role]},
+    )
+
+    return _with_role(client, role_data.role)
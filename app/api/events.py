@@ -0,0 +1,69 @@
+import asyncio
+import json
+from datetime import date
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.events import barber_day_channel, client_channel, event_broker
+from app.core.tenancy import get_tenant_id
+from app.db.database import SessionLocal
+from app.api.auth import oauth2_scheme, _get_client_by_token
+
+router = APIRouter()
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # nginx javobni buferlamasligi uchun
+    "X-Accel-Buffering": "no",
+}
+
+
+async def _event_stream(request: Request, channel: str):
+    """Kanal hodisalarini SSE formatida uzatish, jim paytlarda heartbeat yuboriladi"""
+    async with event_broker.subscribe(channel) as queue:
+        yield "retry: 5000\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+# Mijozning buyurtmalari holati o'zgarishlari (GET /appointments/my ni so'rab turish o'rniga)
+@router.get("/me")
+async def client_events(
+    request: Request,
+    token: str = Depends(oauth2_scheme)
+):
+    # Sessiya faqat tekshiruv uchun ochiladi: uzoq yashaydigan SSE ulanishi
+    # pul'dagi baza ulanishini band qilib turmasligi kerak
+    async with SessionLocal() as db:
+        current_client = await _get_client_by_token(token, db)
+
+    return StreamingResponse(
+        _event_stream(request, client_channel(current_client.id)),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+# Barberning kunlik bo'sh vaqtlari o'zgarishlari (slot band qilindi / bo'shadi).
+# Autentifikatsiya ataylab talab qilinmaydi: bron sahifasini mehmonlar ham ko'radi va
+# hodisalarda ochiq GET /barbers/{id}/schedule dagidan ortiq ma'lumot yo'q (mijoz
+# ma'lumotlari faqat /events/me kanaliga yuboriladi, qarang: _change_events)
+@router.get("/barbers/{barber_id}")
+async def barber_day_events(
+    request: Request,
+    barber_id: int,
+    date: date,
+    tenant_id: int = Depends(get_tenant_id)
+):
+    return StreamingResponse(
+        _event_stream(request, barber_day_channel(tenant_id, barber_id, date)),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
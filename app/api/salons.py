@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from typing import List
+
+from app.models.models import Salon
+from app.db.database import get_db, get_read_db
+from app.core.permissions import Principal, SALONS_WRITE
+from app.api.auth import require_chain_permission
+from app.core.audit import audit_logger
+from app.schemas import SalonCreate, SalonResponse, json_response, salon_list_adapter
+
+router = APIRouter()
+
+# Salonlar ro'yxati doim asosiy bazada (alohida bazadagi salonlar ham shu yerda ro'yxatda)
+
+# Faol salonlar (mijoz ilovasi filialni tanlab, X-Salon-ID sarlavhasida yuboradi)
+@router.get("/", response_model=List[SalonResponse])
+async def get_salons(db: AsyncSession = Depends(get_read_db)):
+    query = select(Salon).where(Salon.is_active == True).order_by(Salon.id)
+    result = await db.execute(query)
+    return json_response(salon_list_adapter, result.scalars().all())
+
+# Salon ma'lumotlarini ID bo'yicha olish
+@router.get("/{salon_id}", response_model=SalonResponse)
+async def get_salon(salon_id: int, db: AsyncSession = Depends(get_read_db)):
+    salon = await db.get(Salon, salon_id)
+
+    if not salon:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Salon topilmadi"
+        )
+
+    return salon
+
+# Yangi salon yaratish (faqat asosiy salon admini - salonlar butun tarmoq uchun umumiy)
+@router.post("/", response_model=SalonResponse, status_code=status.HTTP_201_CREATED)
+async def create_salon(
+    salon_data: SalonCreate,
+    db: AsyncSession = Depends(get_db),
+    principal: Principal = Depends(require_chain_permission(SALONS_WRITE))
+):
+    query = select(Salon.id).where(Salon.slug == salon_data.slug)
+    result = await db.execute(query)
+    if result.scalar() is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bu slug bilan salon mavjud"
+        )
+
+    new_salon = Salon(name=salon_data.name, slug=salon_data.slug, address=salon_data.address)
+    db.add(new_salon)
+    await db.commit()
+    await db.refresh(new_salon)
+
+    audit_logger.record(
+        "create", "salon", new_salon.id,
+        actor=principal.id, tenant_id=new_salon.id, changes=salon_data.model_dump(),
+    )
+
+    return new_salon
@@ -1,46 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List, Optional
-from pydantic import BaseModel
+from typing import List
 
-from app.models.models import Service, Category, User
-from app.db.database import get_db
-from app.api.auth import get_current_client
+from app.models.models import Service, Category
+from app.db.database import get_tenant_db, get_tenant_read_db
+from app.core.audit import audit_logger, diff
+from app.core.singleflight import shared_json
+from app.core.tenancy import get_tenant_id, tenant_key
+from app.core.permissions import Principal, SERVICES_WRITE
+from app.api.auth import require_permission
+from app.schemas import ServiceCreate, ServiceResponse, dump_json, service_list_adapter
+from app.utils.timerange import utc_now
 
 router = APIRouter()
 
-# Xizmat yaratish uchun schema
-class ServiceCreate(BaseModel):
-    category_id: int
-    name: str
-    description: Optional[str] = None
-    price: float
-    duration: int  # Xizmat davomiyligi (minut)
-
-# Xizmat ma'lumotlarini qaytarish uchun schema
-class ServiceResponse(BaseModel):
-    id: int
-    category_id: int
-    name: str
-    description: Optional[str] = None
-    price: float
-    duration: int
-    
-    class Config:
-        from_attributes = True
-
 # Yangi xizmat yaratish (faqat admin uchun)
 @router.post("/", response_model=ServiceResponse, status_code=status.HTTP_201_CREATED)
 async def create_service(
     service_data: ServiceCreate, 
-    db: AsyncSession = Depends(get_db),
-    current_client: User = Depends(get_current_client)
+    db: AsyncSession = Depends(get_tenant_db),
+    tenant_id: int = Depends(get_tenant_id),
+    principal: Principal = Depends(require_permission(SERVICES_WRITE))
 ):
-    # Admin tekshiruvi
-    
     # Kategoriya mavjudligini tekshirish
-    query = select(Category).where(Category.id == service_data.category_id)
+    query = select(Category).where(Category.id == service_data.category_id, Category.tenant_id == tenant_id)
     result = await db.execute(query)
     category = result.scalars().first()
     
@@ -52,6 +36,7 @@ async def create_service(
     
     # Yangi xizmat yaratish
     new_service = Service(
+        tenant_id=tenant_id,
         category_id=service_data.category_id,
         name=service_data.name,
         description=service_data.description,
@@ -62,6 +47,11 @@ async def create_service(
     db.add(new_service)
     await db.commit()
     await db.refresh(new_service)
+
+    audit_logger.record(
+        "create", "service", new_service.id,
+        actor=principal.id, tenant_id=tenant_id, changes=service_data.model_dump(),
+    )
     
     return new_service
 
@@ -70,21 +60,37 @@ async def create_service(
 async def get_services(
     skip: int = 0, 
     limit: int = 100, 
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_tenant_read_db),
+    tenant_id: int = Depends(get_tenant_id)
 ):
-    query = select(Service).offset(skip).limit(limit)
+    # Bir vaqtda kelgan bir xil so'rovlar bitta so'rov natijasini bo'lishadi
+    key = tenant_key(tenant_id, "services", skip, limit)
+    return await shared_json(key, lambda: _load_services(db, tenant_id, skip, limit))
+
+async def _load_services(db: AsyncSession, tenant_id: int, skip: int, limit: int) -> bytes:
+    query = (
+        select(Service)
+        .where(Service.tenant_id == tenant_id, Service.deleted_at.is_(None))
+        .offset(skip)
+        .limit(limit)
+    )
     result = await db.execute(query)
     services = result.scalars().all()
     
-    return services
+    return dump_json(service_list_adapter, services)
 
 # Xizmat ma'lumotlarini ID bo'yicha olish
 @router.get("/{service_id}", response_model=ServiceResponse)
 async def get_service(
     service_id: int, 
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_tenant_read_db),
+    tenant_id: int = Depends(get_tenant_id)
 ):
-    query = select(Service).where(Service.id == service_id)
+    query = select(Service).where(
+        Service.id == service_id,
+        Service.tenant_id == tenant_id,
+        Service.deleted_at.is_(None),
+    )
     result = await db.execute(query)
     service = result.scalars().first()
     
@@ -101,13 +107,16 @@ async def get_service(
 async def update_service(
     service_id: int,
     service_data: ServiceCreate,
-    db: AsyncSession = Depends(get_db),
-    current_client: User = Depends(get_current_client)
+    db: AsyncSession = Depends(get_tenant_db),
+    tenant_id: int = Depends(get_tenant_id),
+    principal: Principal = Depends(require_permission(SERVICES_WRITE))
 ):
-    # Admin tekshiruvi
-    
     # Xizmatni tekshirish
-    query = select(Service).where(Service.id == service_id)
+    query = select(Service).where(
+        Service.id == service_id,
+        Service.tenant_id == tenant_id,
+        Service.deleted_at.is_(None),
+    )
     result = await db.execute(query)
     service = result.scalars().first()
     
@@ -118,7 +127,7 @@ async def update_service(
         )
     
     # Kategoriyani tekshirish
-    query = select(Category).where(Category.id == service_data.category_id)
+    query = select(Category).where(Category.id == service_data.category_id, Category.tenant_id == tenant_id)
     result = await db.execute(query)
     category = result.scalars().first()
     
@@ -129,6 +138,7 @@ async def update_service(
         )
     
     # Xizmatni yangilash
+    changes = diff(service, service_data.model_dump())
     service.category_id = service_data.category_id
     service.name = service_data.name
     service.description = service_data.description
@@ -137,6 +147,9 @@ async def update_service(
     
     await db.commit()
     await db.refresh(service)
+
+    if changes:
+        audit_logger.record("update", "service", service_id, actor=principal.id, tenant_id=tenant_id, changes=changes)
     
     return service
 
@@ -144,12 +157,15 @@ async def update_service(
 @router.delete("/{service_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_service(
     service_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_client: User = Depends(get_current_client)
+    db: AsyncSession = Depends(get_tenant_db),
+    tenant_id: int = Depends(get_tenant_id),
+    principal: Principal = Depends(require_permission(SERVICES_WRITE))
 ):
-    # Admin tekshiruvi
-    
-    query = select(Service).where(Service.id == service_id)
+    query = select(Service).where(
+        Service.id == service_id,
+        Service.tenant_id == tenant_id,
+        Service.deleted_at.is_(None),
+    )
     result = await db.execute(query)
     service = result.scalars().first()
     
@@ -159,7 +175,10 @@ async def delete_service(
             detail="Xizmat topilmadi"
         )
     
-    await db.delete(service)
+    # Soft delete: o'tgan buyurtmalar xizmatga havolasini yo'qotmaydi
+    service.deleted_at = utc_now()
     await db.commit()
+
+    audit_logger.record("delete", "service", service_id, actor=principal.id, tenant_id=tenant_id)
     
     return None 
\ No newline at end of file
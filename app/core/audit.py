@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert, inspect
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.models import AuditLog
+from app.utils.timerange import utc_now
+
+logger = logging.getLogger(__name__)
+
+
+def diff(instance, values: Dict[str, Any]) -> Dict[str, list]:
+    """O'zgaradigan maydonlar: {"maydon": [eski, yangi]} (obyektga qiymat berishdan oldin chaqiriladi)"""
+    return {
+        name: [getattr(instance, name), value]
+        for name, value in values.items()
+        if getattr(instance, name) != value
+    }
+
+
+def _identity(instance) -> Optional[int]:
+    """ORM obyektining id si - commit dan keyin ham bazaga murojaat qilmasdan"""
+    if instance is None or isinstance(instance, int):
+        return instance
+    identity = inspect(instance).identity
+    return identity[0] if identity else None
+
+
+class AuditLogger:
+    """O'zgarishlar jurnalini fon vazifasida partiyalab yozish
+
+    record() faqat xotiradagi navbatga qo'shadi (so'rov tranzaksiyasiga INSERT
+    qo'shilmaydi). Fon vazifasi navbatni flush_interval da yoki batch_size ga
+    yetganda bitta executemany INSERT bilan yozadi; baza ishlamasa partiya
+    qayta yoziladi. Navbat to'lsa (uzoq nosozlik) yangi yozuvlar tashlanadi
+    va log'ga chiqariladi. Jarayon to'satdan to'xtasa navbatdagi yozuvlar
+    yo'qoladi - jurnal yordamchi ma'lumot, buyurtmalarning o'zi emas.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, queue_size: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._stopping = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.dropped = 0
+
+    def record(
+        self,
+        action: str,
+        entity: str,
+        entity_id: Optional[int] = None,
+        *,
+        actor=None,
+        tenant_id: Optional[int] = None,
+        changes: Optional[dict] = None,
+    ) -> None:
+        """Yozuvni navbatga qo'shish (commit muvaffaqiyatli bo'lgandan keyin chaqiriladi)"""
+        entry = {
+            "created_at": utc_now(),
+            "tenant_id": tenant_id,
+            "actor_id": _identity(actor),
+            "action": action,
+            "entity": entity,
+            "entity_id": entity_id,
+            "changes": jsonable_encoder(changes) if changes is not None else None,
+        }
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.error("Audit navbati to'lgan, yozuv tashlandi: %s %s %s", action, entity, entity_id)
+
+    def start(self, session_factory=SessionLocal) -> None:
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run(session_factory))
+
+    async def stop(self) -> None:
+        """Navbatdagi qolgan yozuvlarni yozib, fon vazifasini to'xtatish"""
+        if self._task is None:
+            return
+        self._stopping.set()
+        task, self._task = self._task, None
+        await task
+
+    async def _run(self, session_factory) -> None:
+        while True:
+            batch = await self._collect()
+            if batch:
+                await self._write(session_factory, batch)
+            elif self._stopping.is_set():
+                return
+
+    async def _collect(self) -> List[dict]:
+        """flush_interval davomida batch_size tagacha yozuv yig'ish"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        batch = []
+        while len(batch) < self.batch_size:
+            if self._stopping.is_set():
+                while len(batch) < self.batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), max(0.0, deadline - loop.time())))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _write(self, session_factory, batch: List[dict]) -> None:
+        while True:
+            try:
+                async with session_factory() as db:
+                    await db.execute(insert(AuditLog), batch)
+                    await db.commit()
+                self.written += len(batch)
+                return
+            except Exception:
+                logger.exception("Audit yozuvlarini saqlab bo'lmadi (%s ta)", len(batch))
+                if self._stopping.is_set():
+                    self.dropped += len(batch)
+                    return
+                await asyncio.sleep(self.flush_interval)
+
+
+audit_logger = AuditLogger(
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_SECONDS,
+    queue_size=settings.AUDIT_QUEUE_SIZE,
+)
@@ -0,0 +1,233 @@
+import time
+import zlib
+from typing import Optional
+
+# Allaqachon siqilgan yoki oqim sifatida uzatiladigan turlar siqilmaydi
+SKIP_CONTENT_TYPES = (
+    "text/event-stream",
+    "image/",
+    "video/",
+    "audio/",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/octet-stream",
+)
+
+
+class CompressionStats:
+    """Siqish natijalari: tejalgan baytlar va sarflangan CPU vaqti"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.responses = 0
+        self.compressed = {"gzip": 0, "br": 0}
+        self.skipped_small = 0
+        self.skipped_type = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    def snapshot(self) -> dict:
+        saved = self.bytes_in - self.bytes_out
+        return {
+            "responses": self.responses,
+            "compressed": dict(self.compressed),
+            "skipped_small": self.skipped_small,
+            "skipped_type": self.skipped_type,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved": saved,
+            "ratio": round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else None,
+            "cpu_ms": round(self.cpu_seconds * 1000, 3),
+            # Har bir millisekund CPU evaziga tejalgan kilobaytlar
+            "kb_saved_per_cpu_ms": round(saved / 1024 / (self.cpu_seconds * 1000), 2)
+            if self.cpu_seconds else None,
+        }
+
+
+def _accepted_encodings(header: str) -> dict:
+    """Accept-Encoding sarlavhasini {encoding: q} ko'rinishiga keltirish"""
+    encodings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            encodings[name.strip().lower()] = q
+    return encodings
+
+
+class _GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        # wbits=31: gzip sarlavhasi bilan
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        # Oqimda har bir bo'lak darhol mijozga yetib borishi uchun flush qilinadi
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class _BrotliEncoder:
+    name = "br"
+
+    def __init__(self, brotli, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """gzip/brotli siqish (ASGI middleware)
+
+    - minimum_size dan kichik javoblar siqilmaydi (sarlavha xarajati foydadan katta)
+    - Content-Encoding bor yoki SKIP_CONTENT_TYPES dagi javoblar o'zgartirilmaydi
+    - Bo'laklab yuborilayotgan (streaming) javoblar bo'lak-bo'lak siqiladi
+    - brotli faqat brotli paketi o'rnatilgan va mijoz "br" qabul qilsa ishlatiladi
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6,
+                 brotli_quality: int = 4, stats: Optional[CompressionStats] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.stats = stats or CompressionStats()
+        try:
+            import brotli
+        except ImportError:
+            brotli = None
+        self._brotli = brotli
+
+    def _encoder(self, scope):
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encodings = _accepted_encodings(accept)
+
+        if self._brotli is not None and encodings.get("br", 0) > 0:
+            return _BrotliEncoder(self._brotli, self.brotli_quality)
+        if encodings.get("gzip", 0) > 0:
+            return _GzipEncoder(self.gzip_level)
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoder = self._encoder(scope)
+        if encoder is None:
+            await self.app(scope, receive, send)
+            return
+
+        stats = self.stats
+        start_message = None
+        # Qaror qabul qilinguncha yig'ilgan bo'laklar (http middleware'lar javobni
+        # bo'laklab uzatadi, shuning uchun hajm minimum_size ga yetguncha kutamiz)
+        pending = []
+        pending_size = 0
+        # None - hali hal qilinmagan, True - siqiladi, False - o'zgarishsiz
+        compress = None
+
+        def encode(body: bytes, more_body: bool) -> bytes:
+            started = time.perf_counter()
+            data = encoder.chunk(body) if more_body else encoder.finish(body)
+            stats.cpu_seconds += time.perf_counter() - started
+            stats.bytes_in += len(body)
+            stats.bytes_out += len(data)
+            return data
+
+        async def send_compressed(message):
+            nonlocal start_message, compress, pending_size
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compress is None:
+                headers = start_message["headers"]
+                content_type = b""
+                encoded = False
+                for name, value in headers:
+                    if name == b"content-type":
+                        content_type = value
+                    elif name == b"content-encoding":
+                        encoded = True
+
+                if encoded or content_type.decode("latin-1").startswith(SKIP_CONTENT_TYPES):
+                    stats.responses += 1
+                    stats.skipped_type += 1
+                    compress = False
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                pending.append(body)
+                pending_size += len(body)
+                if more_body and pending_size < self.minimum_size:
+                    return
+
+                stats.responses += 1
+                body = b"".join(pending)
+                pending.clear()
+
+                if not more_body and len(body) < self.minimum_size:
+                    stats.skipped_small += 1
+                    compress = False
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body, "more_body": False})
+                    return
+
+                compress = True
+                headers = [(name, value) for name, value in headers if name != b"content-length"]
+                headers.append((b"content-encoding", encoder.name.encode()))
+                vary = [index for index, (name, _) in enumerate(headers) if name == b"vary"]
+                if not vary:
+                    headers.append((b"vary", b"Accept-Encoding"))
+                elif b"accept-encoding" not in headers[vary[0]][1].lower():
+                    headers[vary[0]] = (b"vary", headers[vary[0]][1] + b", Accept-Encoding")
+                stats.compressed[encoder.name] += 1
+
+                data = encode(body, more_body)
+                if not more_body:
+                    headers.append((b"content-length", str(len(data)).encode()))
+                await send({**start_message, "headers": headers})
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            if not compress:
+                await send(message)
+                return
+
+            await send({"type": "http.response.body", "body": encode(body, more_body), "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+compression_stats = CompressionStats()
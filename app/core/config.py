@@ -1,12 +1,8 @@
-import os
-from pydantic_settings import BaseSettings
-from dotenv import load_dotenv
-from typing import Optional
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Dict, List, Optional
 from functools import lru_cache
 
-# .env faylini yuklash
-load_dotenv()
-
 class Settings(BaseSettings):
     """
     Dastur konfiguratsiyasi uchun asosiy sozlamalar
@@ -15,17 +11,53 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "StyleHub API"
     
+    # Production server sozlamalari (python -m app.server)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 7777
+    WEB_CONCURRENCY: Optional[int] = None  # Workerlar soni (default: CPU yadrolari soni)
+    SERVER_MAX_REQUESTS: int = 10000  # Shuncha so'rovdan keyin worker qayta ishga tushiriladi
+    SERVER_MAX_REQUESTS_JITTER: int = 1000  # Workerlar bir vaqtda qayta ishga tushmasligi uchun
+    SERVER_GRACEFUL_TIMEOUT: int = 30  # SIGTERM dan keyin tugallanmagan so'rovlarni kutish (s)
+    SERVER_KEEPALIVE_TIMEOUT: int = 5
+    
     # Ma'lumotlar bazasi sozlamalari
-    DATABASE_URL: str = os.getenv("DATABASE_URL")
+    DATABASE_URL: Optional[str] = None
+    DATABASE_ECHO: bool = True  # SQL so'rovlarini logga chiqarish
+    DATABASE_REPLICA_URLS: List[str] = []  # O'qish uchun replikalar (JSON ro'yxat)
+    REPLICA_MAX_LAG_SECONDS: float = 5.0  # Replikaning ruxsat etilgan kechikishi
+    REPLICA_HEALTH_CHECK_SECONDS: float = 10.0  # Replika holatini tekshirish intervali
+    READ_YOUR_WRITES_SECONDS: int = 10  # Yozuvdan keyin mijoz asosiy bazadan o'qiydigan vaqt
+    
+    # Salonlar (tenant) sozlamalari
+    DEFAULT_TENANT_ID: int = 1  # X-Salon-ID sarlavhasi berilmaganda
+    # Katta salonlar uchun alohida baza (JSON): {"7": "postgresql+asyncpg://..."}
+    # Mijozlar, tokenlar va salonlar ro'yxati doim asosiy bazada qoladi
+    TENANT_DATABASE_URLS: Dict[int, str] = {}
+
+    # Vaqt zonalari: bazada vaqtlar UTC da saqlanadi, "bugun"/"shu hafta", ish vaqti
+    # va kunlik jadval salonning mahalliy vaqtida hisoblanadi (IANA nomlari)
+    DEFAULT_TIMEZONE: str = "UTC"  # Masalan "Asia/Tashkent"
+    SALON_TIMEZONES: Dict[int, str] = {}  # Salon bo'yicha (JSON): {"7": "Asia/Samarkand"}
     
     # JWT sozlamalari
-    SECRET_KEY: str = os.getenv("SECRET_KEY")
-    if not SECRET_KEY:
-        raise ValueError("SECRET_KEY .env faylda yo'q! Uni qo'shing.")
+    SECRET_KEY: str = Field("", validate_default=True)
     
     ALGORITHM: str = "HS256"
+    JWT_KEYS: str = ""  # Qo'shimcha kalitlar (JSON): {"kid": {"alg": "RS256", "private_key_file": "..."}}
+    JWT_ACTIVE_KID: Optional[str] = None  # Yangi tokenlar imzolanadigan kalit (default: SECRET_KEY)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+
+    # Rollar va ruxsatlar (JSON): {"manager": ["services:write", ...]}.
+    # Standart rollar app/core/permissions.py da; ruxsatlar tokenga yoziladi
+    ROLE_PERMISSIONS: Dict[str, List[str]] = {}
+
+    # Bekor qilingan tokenlar ro'yxati (revocation store) sozlamalari
+    REVOCATION_SYNC_SECONDS: float = 5.0  # Boshqa workerlardagi o'zgarishlarni olish intervali
+    REVOCATION_BLOOM_CAPACITY: int = 100_000  # Bloom filtrdagi kutilgan yozuvlar soni
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001  # Soxta ijobiy natija ehtimoli
+    REVOCATION_CACHE_SIZE: int = 10_000  # Aniq tekshirilgan kalitlar keshi (LRU)
+    REVOCATION_PURGE_HOURS: int = 6  # Muddati o'tgan yozuvlarni tozalash intervali (python -m app.workers.revocation)
     
     # CORS sozlamalari
     BACKEND_CORS_ORIGINS: list = ["*"]
@@ -34,9 +66,89 @@ class Settings(BaseSettings):
     PWD_HASH_ALGORITHM: str = "bcrypt"
     PWD_SALT_ROUNDS: int = 12
     
-    class Config:
-        case_sensitive = True
-        env_file = ".env"
+    # So'rovlar sonini cheklash (rate limiting) sozlamalari
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_STORAGE_URL: Optional[str] = None  # redis://... (bo'sh bo'lsa xotirada)
+    # X-Forwarded-For faqat shu manzillardan (IP yoki CIDR) kelgan so'rovlarda hisobga
+    # olinadi - reverse proxy (nginx, load balancer) manzillari. python -m app.server
+    # uvicorn'ga ham forwarded_allow_ips sifatida beradi. Ro'yxatda bo'lmagan mijoz
+    # sarlavhani o'zi yozib, IP bo'yicha limitni chetlab o'ta olmaydi
+    TRUSTED_PROXIES: List[str] = ["127.0.0.1"]
+    RATE_LIMIT_LOGIN_PER_IP: str = "10/minute"
+    RATE_LIMIT_LOGIN_PER_ACCOUNT: str = "5/minute"
+    RATE_LIMIT_LOGIN_PER_ROUTE: str = "50/second"
+    RATE_LIMIT_SIGNUP_PER_IP: str = "5/hour"
+    RATE_LIMIT_SIGNUP_PER_ROUTE: str = "20/second"
+    
+    # Eslatma (reminder) yuborish sozlamalari
+    REMINDER_LEAD_MINUTES: int = 60  # Buyurtmadan necha minut oldin eslatiladi
+    REMINDER_BATCH_SIZE: int = 500  # Bitta so'rovda egallanadigan eslatmalar soni
+    REMINDER_CONCURRENCY: int = 50  # Bir vaqtda yuboriladigan eslatmalar soni
+    REMINDER_LEASE_MINUTES: int = 10  # Egallangan, lekin yuborilmagan eslatma shundan keyin qayta olinadi
+    REMINDER_POLL_SECONDS: int = 30  # Navbat bo'sh bo'lganda kutish vaqti
+    
+    # Tasdiqlanmagan (pending) buyurtmalarni bekor qilish sozlamalari
+    PENDING_HOLD_MINUTES: int = 30  # Pending buyurtma necha minut ushlab turiladi
+    EXPIRY_BATCH_SIZE: int = 1000  # Bitta tranzaksiyada yangilanadigan qatorlar soni
+    EXPIRY_BATCH_PAUSE_SECONDS: float = 0.1  # Partiyalar orasidagi tanaffus
+    EXPIRY_POLL_SECONDS: int = 60  # Tekshiruvlar orasidagi interval
+    
+    # Buyurtmalar jadvali bo'limlari (oylik partitsiyalar) sozlamalari
+    APPOINTMENT_PARTITION_MONTHS_AHEAD: int = 3  # Oldindan yaratiladigan oylar soni
+    APPOINTMENT_HOT_MONTHS: int = 12  # Asosiy jadvalda saqlanadigan oylar soni
+    APPOINTMENT_ARCHIVE_SCHEMA: str = "archive"  # Eski partitsiyalar ko'chiriladigan sxema
+    APPOINTMENT_ARCHIVE_TABLESPACE: Optional[str] = None  # Arxiv uchun arzonroq disk (ixtiyoriy)
+    PARTITION_MAINTENANCE_HOURS: int = 24  # Partitsiyalarni tekshirish intervali
+
+    # Bo'sh vaqt (slot) qidirish sozlamalari
+    SLOT_STEP_MINUTES: int = 15  # Slotlar boshlanish vaqtining qadami
+    SLOT_SEARCH_DAYS: int = 7  # end berilmaganda qidiriladigan oyna uzunligi
+    MAX_SERVICE_MINUTES: int = 480  # Eng uzun xizmat yoki to'plam (oynadan oldin boshlangan buyurtmalar uchun)
+    MAX_BUNDLE_SERVICES: int = 5  # Bitta buyurtmadagi (to'plamdagi) xizmatlar soni chegarasi
+    DEFAULT_WORKING_HOURS: str = "09:00-19:00"  # Ish vaqti shabloni kiritilmagan barberlar uchun
+    WORKING_HOURS_CACHE_SECONDS: int = 300  # Barber-hafta bitmap'lari keshi
+
+    # Real vaqt hodisalari (SSE) sozlamalari
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0  # Jim paytlarda ulanishni tirik saqlash intervali
+    EVENTS_QUEUE_SIZE: int = 100  # Har bir obunachi uchun navbatdagi hodisalar chegarasi
+    EVENTS_RECONNECT_MIN_SECONDS: float = 1.0  # LISTEN ulanishi uzilganda birinchi kutish
+    EVENTS_RECONNECT_MAX_SECONDS: float = 30.0  # Kutish har urinishda ikki barobar, shu chegaragacha
+
+    # Idempotency-Key sozlamalari (qayta yuborilgan so'rovlar)
+    # redis://... - barcha workerlar uchun umumiy. Bo'sh bo'lsa har bir worker o'z
+    # xotirasida saqlaydi: boshqa workerga tushgan qayta urinish yana bajariladi
+    IDEMPOTENCY_STORAGE_URL: Optional[str] = None
+    IDEMPOTENCY_TTL_SECONDS: int = 86400  # Javob qancha vaqt saqlanadi
+    IDEMPOTENCY_MAX_ENTRIES: int = 10_000  # Xotiradagi javoblar soni chegarasi
+    IDEMPOTENCY_LOCK_SECONDS: int = 60  # Redis'da bajarilayotgan so'rov qulfining muddati
+    IDEMPOTENCY_MAX_BODY_BYTES: int = 65536  # Bundan katta javoblar saqlanmaydi
+
+    # Analitika (rollup) sozlamalari
+    ROLLUP_POLL_SECONDS: int = 60  # O'zgarishlarni tekshirish intervali
+    ROLLUP_LAG_SECONDS: int = 30  # Hali commit qilinmagan tranzaksiyalar uchun zaxira
+    ROLLUP_BATCH_DAYS: int = 31  # Bitta tranzaksiyada qayta hisoblanadigan kunlar
+    WORKING_DAY_MINUTES: int = 600  # Barberning kunlik ish vaqti (bandlik foizi uchun)
+
+    # O'zgarishlar jurnali (audit log) sozlamalari
+    AUDIT_BATCH_SIZE: int = 500  # Bitta INSERT dagi yozuvlar soni
+    AUDIT_FLUSH_SECONDS: float = 1.0  # Navbat shu vaqtda kamida bir marta yoziladi
+    AUDIT_QUEUE_SIZE: int = 50_000  # Xotiradagi yozilmagan yozuvlar chegarasi
+
+    # Javoblarni siqish (gzip/brotli) sozlamalari
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # Bundan kichik javoblar siqilmaydi (bayt)
+    COMPRESSION_GZIP_LEVEL: int = 6  # 1 (tez) - 9 (kichik)
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0 (tez) - 11 (kichik), brotli paketi kerak
+    
+    # Qiymatlar muhit o'zgaruvchilari va .env fayldan Settings() yaratilganda o'qiladi
+    model_config = SettingsConfigDict(case_sensitive=True, env_file=".env")
+
+    @field_validator("SECRET_KEY")
+    @classmethod
+    def secret_key_required(cls, v):
+        if not v:
+            raise ValueError("SECRET_KEY .env faylda yo'q! Uni qo'shing.")
+        return v
 
 @lru_cache()
 def get_settings():
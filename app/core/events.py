@@ -0,0 +1,175 @@
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Barcha hodisalar bitta Postgres kanali orqali o'tadi, ichida mantiqiy kanal nomi bor
+PG_CHANNEL = "stylehub_events"
+# NOTIFY payload chegarasi 8000 bayt
+MAX_PAYLOAD_BYTES = 7900
+
+
+def client_channel(user_id: int) -> str:
+    return f"client:{user_id}"
+
+
+def barber_day_channel(tenant_id: int, barber_id: int, day) -> str:
+    # Alohida bazadagi salonlarda barber id'lari takrorlanishi mumkin
+    return f"barber:{tenant_id}:{barber_id}:{day.isoformat()}"
+
+
+def _asyncpg_dsn(url: str) -> Optional[str]:
+    """SQLAlchemy URL'ini asyncpg DSN ga aylantirish (Postgres bo'lmasa None)"""
+    if not url or not url.startswith("postgresql"):
+        return None
+    scheme, rest = url.split("://", 1)
+    return f"postgresql://{rest}"
+
+
+class EventBroker:
+    """Hodisalarni obunachilarga tarqatish (fan-out)
+
+    Har bir worker o'z obunachilarini (SSE ulanishlari) xotirada saqlaydi.
+    Postgres'da hodisa NOTIFY orqali yuboriladi va barcha workerlar LISTEN
+    orqali oladi, shuning uchun boshqa workerga ulangan mijoz ham xabar topadi.
+    Boshqa bazalarda (SQLite) hodisa faqat shu jarayon ichida tarqatiladi.
+    """
+
+    def __init__(
+        self,
+        database_url: Optional[str],
+        queue_size: int = 100,
+        reconnect_min_seconds: float = 1.0,
+        reconnect_max_seconds: float = 30.0,
+    ):
+        self.dsn = _asyncpg_dsn(database_url)
+        self.queue_size = queue_size
+        self.reconnect_min_seconds = reconnect_min_seconds
+        self.reconnect_max_seconds = reconnect_max_seconds
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._connection = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        if self.dsn is None or self._connection is not None:
+            return
+        self._stopping = False
+        if not await self._connect():
+            # Baza bilan muammo bo'lsa ham ilova ishlaydi, hodisalar faqat lokal tarqaladi
+            self._schedule_reconnect()
+
+    async def stop(self):
+        self._stopping = True
+        if self._reconnect_task is not None:
+            task, self._reconnect_task = self._reconnect_task, None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            await connection.close()
+
+    async def _connect(self) -> bool:
+        """LISTEN ulanishini ochish. Muvaffaqiyatsiz bo'lsa False"""
+        import asyncpg
+
+        connection = None
+        try:
+            connection = await asyncpg.connect(self.dsn)
+            # Ulanish uzilsa (Postgres qayta ishga tushdi, failover) LISTEN ham yo'qoladi
+            connection.add_termination_listener(self._on_terminate)
+            await connection.add_listener(PG_CHANNEL, self._on_notify)
+        except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError):
+            logger.exception("LISTEN ulanishini ochib bo'lmadi, hodisalar faqat lokal")
+            if connection is not None:
+                connection.terminate()
+            return False
+
+        self._connection = connection
+        return True
+
+    def _on_terminate(self, connection):
+        if connection is not self._connection or self._stopping:
+            return
+        # Qayta ulanguncha publish() hodisalarni lokal tarqatadi
+        logger.warning("LISTEN ulanishi uzildi, qayta ulanilmoqda")
+        self._connection = None
+        self._schedule_reconnect()
+
+    def _schedule_reconnect(self):
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self):
+        """Ulanish tiklanguncha eksponensial kutish (backoff) bilan qayta urinish"""
+        delay = self.reconnect_min_seconds
+        while not self._stopping:
+            await asyncio.sleep(delay)
+            if await self._connect():
+                logger.info("LISTEN ulanishi tiklandi")
+                return
+            delay = min(delay * 2, self.reconnect_max_seconds)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        self._deliver(message["channel"], message["event"])
+
+    def _deliver(self, channel: str, event: dict):
+        for queue in self._subscribers.get(channel, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Sekin o'qiyotgan mijoz boshqalarni to'xtatmasligi kerak
+                logger.warning("%s obunachisi navbati to'lgan, hodisa tashlab yuborildi", channel)
+
+    async def publish(self, channel: str, event: dict):
+        """Hodisani yuborish. Chaqiruvchi tranzaksiya commit qilingandan keyin chaqiriladi"""
+        if self._connection is None:
+            self._deliver(channel, event)
+            return
+
+        payload = json.dumps({"channel": channel, "event": event}, default=str)
+        if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+            logger.warning("%s hodisasi juda katta, yuborilmadi", channel)
+            return
+
+        try:
+            # Bitta asyncpg ulanishida bir vaqtda faqat bitta so'rov bajarilishi mumkin
+            async with self._lock:
+                await self._connection.execute("SELECT pg_notify($1, $2)", PG_CHANNEL, payload)
+        except Exception:
+            logger.exception("NOTIFY yuborilmadi, hodisa faqat lokal tarqatiladi")
+            self._deliver(channel, event)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(channel, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+
+event_broker = EventBroker(
+    settings.DATABASE_URL,
+    queue_size=settings.EVENTS_QUEUE_SIZE,
+    reconnect_min_seconds=settings.EVENTS_RECONNECT_MIN_SECONDS,
+    reconnect_max_seconds=settings.EVENTS_RECONNECT_MAX_SECONDS,
+)
@@ -0,0 +1,250 @@
+import asyncio
+import base64
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse, Response
+
+from app.core.config import settings
+from app.core.tenancy import TENANT_HEADER
+from app.utils.security import verify_token
+
+HEADER = "Idempotency-Key"
+REPLAY_HEADER = "Idempotent-Replayed"
+MUTATING_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+# Faqat natijasi qayta urinishda o'zgarmaydigan javoblar saqlanadi. 401/403 (token
+# yangilangandan keyin o'tadi), 409 (bo'sh vaqt keyin bo'shashi mumkin), 429 va 5xx
+# saqlanmaydi - qayta urinish handlerni yana ishga tushirishi kerak
+STORED_ERROR_STATUSES = (400, 404, 422)
+# Sessiya cookie'lari (refresh token) boshqa so'rovga qayta yuborilmasligi kerak
+STRIPPED_HEADERS = (b"set-cookie",)
+
+
+def is_storable(status_code: int) -> bool:
+    return 200 <= status_code < 300 or status_code in STORED_ERROR_STATUSES
+
+
+class StoredResponse:
+    """Saqlangan javob: faqat status, sarlavhalar va tana baytlari"""
+
+    __slots__ = ("fingerprint", "status_code", "raw_headers", "body", "expires_at")
+
+    def __init__(self, fingerprint: bytes, status_code: int, raw_headers: List[Tuple[bytes, bytes]],
+                 body: bytes, expires_at: float):
+        self.fingerprint = fingerprint
+        self.status_code = status_code
+        self.raw_headers = raw_headers
+        self.body = body
+        self.expires_at = expires_at
+
+    def to_response(self) -> Response:
+        response = Response(content=self.body, status_code=self.status_code)
+        response.raw_headers = self.raw_headers + [(REPLAY_HEADER.lower().encode(), b"true")]
+        return response
+
+    def dumps(self) -> bytes:
+        return json.dumps({
+            "fingerprint": self.fingerprint.hex(),
+            "status_code": self.status_code,
+            "headers": [[name.decode("latin-1"), value.decode("latin-1")] for name, value in self.raw_headers],
+            "body": base64.b64encode(self.body).decode(),
+        }).encode()
+
+    @classmethod
+    def loads(cls, data: bytes) -> "StoredResponse":
+        value = json.loads(data)
+        return cls(
+            bytes.fromhex(value["fingerprint"]),
+            value["status_code"],
+            [(name.encode("latin-1"), header.encode("latin-1")) for name, header in value["headers"]],
+            base64.b64decode(value["body"]),
+            float("inf"),
+        )
+
+
+class IdempotencyBackend:
+    """Saqlangan javoblar uchun interfeys"""
+
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        raise NotImplementedError
+
+    async def put(self, key: str, stored: StoredResponse, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def acquire(self, key: str) -> bool:
+        """Kalitni shu so'rov uchun band qilish. Boshqa jarayon bajarayotgan bo'lsa False"""
+        raise NotImplementedError
+
+    async def release(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class MemoryBackend(IdempotencyBackend):
+    """Jarayon xotirasida saqlash: kalit faqat shu worker ichida himoyalangan
+
+    Bir nechta workerda (python -m app.server) boshqa workerga tushgan qayta
+    urinish handlerni yana bajaradi - buning uchun IDEMPOTENCY_STORAGE_URL kerak.
+    Eng eski yozuvlar max_entries dan oshganda o'chiriladi.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._responses: "OrderedDict[str, StoredResponse]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        stored = self._responses.get(key)
+        if stored is not None and stored.expires_at <= time.monotonic():
+            del self._responses[key]
+            return None
+        return stored
+
+    async def put(self, key: str, stored: StoredResponse, ttl: float) -> None:
+        stored.expires_at = time.monotonic() + ttl
+        self._responses[key] = stored
+        self._responses.move_to_end(key)
+        while len(self._responses) > self.max_entries:
+            self._responses.popitem(last=False)
+
+    async def acquire(self, key: str) -> bool:
+        # Bitta jarayon ichidagi parallel so'rovlar IdempotencyStore._in_flight orqali kutadi
+        return True
+
+    async def release(self, key: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        self._responses.clear()
+
+
+class RedisBackend(IdempotencyBackend):
+    """Barcha workerlar/serverlar uchun umumiy saqlash (redis paketi kerak)"""
+
+    def __init__(self, url: str, lock_seconds: float):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+        self.lock_seconds = lock_seconds
+
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        data = await self._client.get(f"idempotency:{key}")
+        return StoredResponse.loads(data) if data is not None else None
+
+    async def put(self, key: str, stored: StoredResponse, ttl: float) -> None:
+        await self._client.set(f"idempotency:{key}", stored.dumps(), ex=max(1, int(ttl)))
+
+    async def acquire(self, key: str) -> bool:
+        # Qulf muddati bilan: worker so'rov o'rtasida o'lsa kalit abadiy band qolmaydi
+        return bool(await self._client.set(
+            f"idempotency:lock:{key}", b"1", nx=True, px=int(self.lock_seconds * 1000)
+        ))
+
+    async def release(self, key: str) -> None:
+        await self._client.delete(f"idempotency:lock:{key}")
+
+
+def create_backend(url: Optional[str]) -> IdempotencyBackend:
+    if url and url.startswith(("redis://", "rediss://")):
+        return RedisBackend(url, settings.IDEMPOTENCY_LOCK_SECONDS)
+    return MemoryBackend(settings.IDEMPOTENCY_MAX_ENTRIES)
+
+
+class IdempotencyStore:
+    """Kalit -> javob (TTL bilan) va bajarilayotgan so'rovlar
+
+    Javoblar backend'da (xotira yoki Redis) saqlanadi. Bir xil kalitli parallel
+    qayta urinishlar shu worker ichida birlashtiriladi, boshqa workerda
+    bajarilayotgan bo'lsa 409 qaytariladi.
+    """
+
+    def __init__(self, backend: IdempotencyBackend, ttl: float, max_body_bytes: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_body_bytes = max_body_bytes
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    async def handle(self, request: Request, call_next) -> Response:
+        idempotency_key = request.headers.get(HEADER)
+        if not idempotency_key or request.method not in MUTATING_METHODS:
+            return await call_next(request)
+
+        if len(idempotency_key) > 255:
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"detail": f"{HEADER} juda uzun"},
+            )
+
+        key = _scope_key(request, idempotency_key)
+        fingerprint = hashlib.sha256(await request.body()).digest()
+
+        stored = await self.backend.get(key)
+        if stored is None and key in self._in_flight:
+            # Xuddi shu kalitli so'rov hali bajarilmoqda - uning natijasini kutamiz
+            stored = await asyncio.shield(self._in_flight[key])
+            if stored is None:
+                return _in_progress()
+
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                return JSONResponse(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    content={"detail": f"{HEADER} boshqa so'rov tanasi bilan ishlatilgan"},
+                )
+            return stored.to_response()
+
+        if not await self.backend.acquire(key):
+            return _in_progress()
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        stored = None
+        try:
+            response = await call_next(request)
+            body = b"".join([chunk async for chunk in response.body_iterator])
+            if is_storable(response.status_code) and len(body) <= self.max_body_bytes:
+                stored = StoredResponse(
+                    fingerprint,
+                    response.status_code,
+                    [(name, value) for name, value in response.raw_headers if name.lower() not in STRIPPED_HEADERS],
+                    body,
+                    float("inf"),
+                )
+                await self.backend.put(key, stored, self.ttl)
+
+            replay = Response(content=body, status_code=response.status_code)
+            replay.raw_headers = list(response.raw_headers)
+            replay.background = response.background
+            return replay
+        finally:
+            del self._in_flight[key]
+            future.set_result(stored)
+            await self.backend.release(key)
+
+
+def _in_progress() -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": "Avvalgi so'rov yakunlanmadi, qayta urinib ko'ring"},
+    )
+
+
+def _scope_key(request: Request, idempotency_key: str) -> str:
+    """Kalit salon, metod, yo'l va foydalanuvchi doirasida: boshqa mijoz kaliti to'qnashmaydi"""
+    owner = "anonymous"
+    authorization = request.headers.get("Authorization", "")
+    if authorization.lower().startswith("bearer "):
+        payload = verify_token(authorization[7:])
+        if payload and payload.get("sub"):
+            owner = f"user:{payload['sub']}"
+    tenant = request.headers.get(TENANT_HEADER, "")
+    return f"{owner}:{tenant}:{request.method}:{request.url.path}:{idempotency_key}"
+
+
+idempotency_store = IdempotencyStore(
+    create_backend(settings.IDEMPOTENCY_STORAGE_URL),
+    ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+    max_body_bytes=settings.IDEMPOTENCY_MAX_BODY_BYTES,
+)
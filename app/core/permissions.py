@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from app.core.config import settings
+
+# Ruxsatlar: "<resurs>:<amal>". Token ichida salon bo'yicha ro'yxat sifatida
+# yuboriladi ({"<salon id>": [...]}), shuning uchun nomlar qisqa va o'zgarmas bo'lishi kerak
+SERVICES_WRITE = "services:write"
+BARBERS_WRITE = "barbers:write"
+APPOINTMENTS_MANAGE = "appointments:manage"
+CLIENTS_READ = "clients:read"
+CLIENTS_MANAGE = "clients:manage"
+ANALYTICS_READ = "analytics:read"
+SALONS_WRITE = "salons:write"
+
+ALL_PERMISSIONS = frozenset({
+    SERVICES_WRITE,
+    BARBERS_WRITE,
+    APPOINTMENTS_MANAGE,
+    CLIENTS_READ,
+    CLIENTS_MANAGE,
+    ANALYTICS_READ,
+    SALONS_WRITE,
+})
+
+# Standart rollar (settings.ROLE_PERMISSIONS orqali o'zgartirish yoki qo'shish mumkin).
+# Roli yo'q foydalanuvchi - oddiy mijoz, hech qanday admin ruxsati yo'q
+DEFAULT_ROLE_PERMISSIONS: Dict[str, Iterable[str]] = {
+    "admin": ALL_PERMISSIONS,
+    "manager": (SERVICES_WRITE, BARBERS_WRITE, APPOINTMENTS_MANAGE, CLIENTS_READ, ANALYTICS_READ),
+    "receptionist": (APPOINTMENTS_MANAGE, CLIENTS_READ),
+}
+
+
+def role_key(user_id, role_version: int) -> str:
+    """Foydalanuvchining shu rol versiyasi bilan berilgan tokenlarini bekor qilish uchun kalit"""
+    return f"role:{user_id}:{role_version}"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Token claim'laridan olingan foydalanuvchi (bazaga murojaat qilmasdan)
+
+    role va permissions - so'rov salonidagi (tenant_id, X-Salon-ID) rol va ruxsatlar.
+    Boshqa salondagi rol bu yerda hisobga olinmaydi.
+    """
+
+    id: int
+    tenant_id: int
+    role: Optional[str]
+    permissions: FrozenSet[str]
+
+    def has(self, *permissions: str) -> bool:
+        return self.permissions.issuperset(permissions)
+
+
+class PermissionCache:
+    """Rol -> ruxsatlar to'plami va token claim'lari -> frozenset keshi
+
+    Har bir so'rovda to'plam qaytadan qurilmaydi: bir xil claim'lar (odatda
+    bir nechta rol) bitta frozenset obyektini bo'lishadi. Rollar ta'rifi
+    o'zgarganda invalidate() chaqiriladi.
+    """
+
+    def __init__(self, overrides: Dict[str, Iterable[str]], max_entries: int = 1024):
+        self.overrides = overrides
+        self.max_entries = max_entries
+        self._roles: Dict[str, FrozenSet[str]] = {}
+        self._claims: Dict[tuple, FrozenSet[str]] = {}
+
+    def is_known(self, role: str) -> bool:
+        return role in self.overrides or role in DEFAULT_ROLE_PERMISSIONS
+
+    def for_role(self, role: Optional[str]) -> FrozenSet[str]:
+        """Rolning ruxsatlari (token yaratishda ishlatiladi)"""
+        if not role:
+            return frozenset()
+        permissions = self._roles.get(role)
+        if permissions is None:
+            permissions = frozenset(self.overrides.get(role, DEFAULT_ROLE_PERMISSIONS.get(role, ())))
+            self._roles[role] = permissions
+        return permissions
+
+    def for_roles(self, roles: Dict[str, str]) -> Dict[str, List[str]]:
+        """Salon -> rol claim'idan salon -> ruxsatlar claim'i (token yaratishda)"""
+        return {tenant: sorted(self.for_role(role)) for tenant, role in roles.items()}
+
+    def from_claims(self, claims) -> FrozenSet[str]:
+        """Token'dagi bitta salon "perms" ro'yxatini frozenset ga aylantirish"""
+        if not claims:
+            return frozenset()
+        key = tuple(claims)
+        permissions = self._claims.get(key)
+        if permissions is None:
+            if len(self._claims) >= self.max_entries:
+                self._claims.clear()
+            permissions = frozenset(key)
+            self._claims[key] = permissions
+        return permissions
+
+    def invalidate(self, role: Optional[str] = None) -> None:
+        if role is None:
+            self._roles.clear()
+        else:
+            self._roles.pop(role, None)
+        self._claims.clear()
+
+
+permission_cache = PermissionCache(settings.ROLE_PERMISSIONS)
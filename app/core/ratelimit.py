@@ -0,0 +1,181 @@
+import ipaddress
+import math
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """'10/minute' ko'rinishidagi limitni (soni, soniyalar) ga aylantirish"""
+    count, _, period = rate.partition("/")
+    return int(count), PERIODS[period.strip()]
+
+
+class RateLimitBackend:
+    """Token bucket holatini saqlash uchun interfeys"""
+
+    async def take(self, key: str, capacity: int, refill_per_second: float, cost: int = 1) -> float:
+        """Token olish. Ruxsat berilsa 0, aks holda kutish kerak bo'lgan soniyalar"""
+        raise NotImplementedError
+
+
+class MemoryBackend(RateLimitBackend):
+    """Jarayon ichidagi xotirada saqlash (bitta worker yoki testlar uchun)"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, capacity: int, refill_per_second: float, cost: int = 1) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (float(capacity), now))
+        tokens = min(float(capacity), tokens + (now - updated_at) * refill_per_second)
+
+        retry_after = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            retry_after = (cost - tokens) / refill_per_second
+
+        self._buckets[key] = (tokens, now)
+        # Eng uzoq ishlatilmagan kalitlarni chiqarib tashlash
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return retry_after
+
+
+# Redis'da atomar token bucket (barcha workerlar uchun umumiy)
+REDIS_TOKEN_BUCKET = """
+local tokens_key = KEYS[1]
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+
+local state = redis.call('HMGET', tokens_key, 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    retry_after = (cost - tokens) / rate
+end
+
+redis.call('HSET', tokens_key, 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', tokens_key, math.ceil(capacity / rate) + 1)
+return tostring(retry_after)
+"""
+
+
+class RedisBackend(RateLimitBackend):
+    """Bir nechta worker/server o'rtasida umumiy limitlar (redis paketi kerak)"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(REDIS_TOKEN_BUCKET)
+
+    async def take(self, key: str, capacity: int, refill_per_second: float, cost: int = 1) -> float:
+        result = await self._script(
+            keys=[f"ratelimit:{key}"],
+            args=[capacity, refill_per_second, time.time(), cost],
+        )
+        return float(result)
+
+
+def create_backend(url: Optional[str]) -> RateLimitBackend:
+    if url and url.startswith(("redis://", "rediss://")):
+        return RedisBackend(url)
+    return MemoryBackend()
+
+
+backend = create_backend(settings.RATE_LIMIT_STORAGE_URL)
+
+
+class RateLimiter:
+    """Token bucket limiti: '5/minute' - daqiqasiga 5 ta so'rov, 5 tagacha ketma-ket"""
+
+    def __init__(self, scope: str, rate: str):
+        self.scope = scope
+        self.capacity, self.period = parse_rate(rate)
+        self.refill_per_second = self.capacity / self.period
+
+    async def hit(self, key: str = "") -> None:
+        """Limitdan bitta token olish, limit tugagan bo'lsa 429 qaytarish"""
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        retry_after = await backend.take(
+            f"{self.scope}:{key}", self.capacity, self.refill_per_second
+        )
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="So'rovlar soni juda ko'p. Birozdan keyin qayta urinib ko'ring",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+
+@lru_cache(maxsize=None)
+def _trusted_networks(proxies: Tuple[str, ...]):
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in proxies)
+
+
+def _is_trusted(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _trusted_networks(tuple(settings.TRUSTED_PROXIES)))
+
+
+def client_ip(request: Request) -> str:
+    """Mijoz IP manzili
+
+    So'rov ishonchli proxy'dan (TRUSTED_PROXIES) kelgan bo'lsa, X-Forwarded-For
+    o'ngdan chapga o'qiladi va birinchi ishonchsiz manzil olinadi: chapdagi
+    qiymatlarni mijoz o'zi yozishi mumkin.
+    """
+    host = request.client.host if request.client else "unknown"
+    if not _is_trusted(host):
+        return host
+
+    forwarded = request.headers.get("x-forwarded-for", "")
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted(hop):
+            return hop
+    # Zanjirdagi barcha manzillar ishonchli - eng chapdagisi mijozga eng yaqin
+    return hops[0] if hops else host
+
+
+def limit_per_ip(scope: str, rate: str):
+    """Dependency: har bir IP uchun alohida limit"""
+    limiter = RateLimiter(f"{scope}:ip", rate)
+
+    async def dependency(request: Request):
+        await limiter.hit(client_ip(request))
+
+    return dependency
+
+
+def limit_per_route(scope: str, rate: str):
+    """Dependency: endpoint uchun umumiy limit (barcha mijozlar uchun)"""
+    limiter = RateLimiter(f"{scope}:route", rate)
+
+    async def dependency():
+        await limiter.hit()
+
+    return dependency
@@ -0,0 +1,188 @@
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.models.models import RevokedToken
+from app.utils.timerange import utc_now
+
+
+# Soatlar farqi va kech commit qilingan yozuvlar o'tkazib yuborilmasligi uchun
+SYNC_OVERLAP = timedelta(seconds=30)
+# is_revoked faqat oila va rol kalitlarini so'raydi (family_key, permissions.role_key).
+# Almashtirilgan refresh token jti'lari (reason="rotated") faqat unique cheklov orqali
+# qayta ishlatishni aniqlash uchun yoziladi - ular xotiraga yuklanmaydi
+TRACKED_PREFIXES = ("family:", "role:")
+
+
+def family_key(family_id: str) -> str:
+    """Butun token oilasini bekor qilish uchun kalit"""
+    return f"family:{family_id}"
+
+
+class BloomFilter:
+    """Ixcham ehtimoliy to'plam: "yo'q" javobi har doim aniq"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class LRUSet:
+    """Hajmi cheklangan to'plam (eng eski kalitlar chiqarib tashlanadi)"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: "OrderedDict[str, None]" = OrderedDict()
+
+    def add(self, key: str) -> None:
+        self._items[key] = None
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        self._items.pop(key, None)
+
+    def __contains__(self, key: str) -> bool:
+        if key in self._items:
+            self._items.move_to_end(key)
+            return True
+        return False
+
+
+class RevocationStore:
+    """Bekor qilingan tokenlar ro'yxati: xotirada bloom filtr + LRU, asosiy manba - revoked_tokens
+
+    Tekshiruv O(1) va odatda bazaga murojaat qilmaydi: bloom filtr "yo'q" desa
+    token aniq bekor qilinmagan. Faqat filtr "bor" deganda (haqiqiy yoki soxta
+    ijobiy) bazadan bir marta tekshiriladi va natija keshlanadi.
+    Boshqa workerlarda qo'shilgan yozuvlar har REVOCATION_SYNC_SECONDS da yuklanadi.
+    """
+
+    def __init__(self):
+        self._reset()
+        self._synced_at = float("-inf")
+
+    def _reset(self, capacity: int = 0) -> None:
+        capacity = max(capacity, settings.REVOCATION_BLOOM_CAPACITY)
+        self._bloom = BloomFilter(capacity, settings.REVOCATION_BLOOM_ERROR_RATE)
+        self._revoked = LRUSet(settings.REVOCATION_CACHE_SIZE)
+        self._not_revoked = LRUSet(settings.REVOCATION_CACHE_SIZE)
+        self._watermark: Optional[datetime] = None
+
+    def _remember(self, key: str) -> None:
+        if key not in self._bloom:
+            self._bloom.add(key)
+        self._revoked.add(key)
+        self._not_revoked.discard(key)
+
+    async def sync(self, db, force: bool = False) -> None:
+        """Bazadagi yangi yozuvlarni xotiraga yuklash (faqat o'qiydi, replikada ham ishlaydi)"""
+        now = time.monotonic()
+        if not force and now - self._synced_at < settings.REVOCATION_SYNC_SECONDS:
+            return
+        self._synced_at = now
+
+        # Filtr to'lib qolsa, soxta ijobiy natijalar ko'payadi - qaytadan quramiz
+        # (muddati o'tgan yozuvlar ham shunda tushib qoladi)
+        if self._bloom.count >= self._bloom.capacity:
+            self._watermark = None
+
+        query = select(RevokedToken.jti, RevokedToken.revoked_at).where(
+            or_(*(RevokedToken.jti.startswith(prefix) for prefix in TRACKED_PREFIXES))
+        )
+        full = self._watermark is None
+        if full:
+            query = query.where(RevokedToken.expires_at >= utc_now())
+        else:
+            query = query.where(RevokedToken.revoked_at >= self._watermark - SYNC_OVERLAP)
+
+        rows = (await db.execute(query)).all()
+        if full:
+            # Filtr amaldagi oila/rol yozuvlari sonining ikki barobariga mo'ljallanadi
+            self._reset(capacity=2 * len(rows))
+        for jti, revoked_at in rows:
+            self._remember(jti)
+            if self._watermark is None or revoked_at > self._watermark:
+                self._watermark = revoked_at
+
+    @staticmethod
+    async def purge(db) -> int:
+        """Muddati o'tgan yozuvlarni o'chirish (app/workers/revocation.py dan chaqiriladi)
+
+        Workerlardagi filtrlar o'chirilgan kalitlarni to'lib qolgandagina unutadi:
+        bunday kalit uchun bazadan bir marta tekshiriladi va "yo'q" natija keshlanadi.
+        """
+        result = await db.execute(delete(RevokedToken).where(RevokedToken.expires_at < utc_now()))
+        await db.commit()
+        return result.rowcount
+
+    async def is_revoked(self, db, key: str) -> bool:
+        """Token (jti) yoki oila (family_key) bekor qilinganmi"""
+        await self.sync(db)
+
+        if key not in self._bloom:
+            return False
+        if key in self._revoked:
+            return True
+        if key in self._not_revoked:
+            return False
+
+        # Bloom filtr ijobiy, lekin keshda yo'q - bazadan aniqlaymiz
+        found = await db.scalar(select(RevokedToken.jti).where(RevokedToken.jti == key))
+        if found:
+            self._remember(key)
+            return True
+
+        self._not_revoked.add(key)
+        return False
+
+    async def revoke(self, db, key: str, family_id: str, expires_at: datetime, reason: str) -> bool:
+        """Kalitni bekor qilinganlar ro'yxatiga qo'shish
+
+        Kalit avval qo'shilgan bo'lsa False qaytaradi - refresh token
+        qayta ishlatilganini aniqlash shu orqali atomar bajariladi.
+        """
+        db.add(RevokedToken(jti=key, family_id=family_id, reason=reason, expires_at=expires_at))
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            self._track(key)
+            return False
+
+        self._track(key)
+        return True
+
+    def _track(self, key: str) -> None:
+        if key.startswith(TRACKED_PREFIXES):
+            self._remember(key)
+
+
+revocation_store = RevocationStore()
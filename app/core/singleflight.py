@@ -0,0 +1,55 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable
+
+from fastapi.responses import Response
+
+
+class SingleFlight:
+    """Bir xil kalitli parallel chaqiruvlarni bitta bajarishga birlashtirish
+
+    Birinchi chaqiruv (leader) funksiyani bajaradi, shu vaqtda kelgan boshqa
+    chaqiruvlar uning natijasini kutadi. Natija keshlanmaydi: chaqiruv tugashi
+    bilan kalit o'chiriladi va keyingi so'rov yana bazaga boradi.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable]):
+        future = self._calls.get(key)
+        if future is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # Leader so'rovi uzilgan - o'zimiz bajaramiz
+                return await func()
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Kutayotganlar bo'lmasa "exception was never retrieved" ogohlantirishi chiqmasin
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+
+# Ommaviy o'qish endpointlari uchun umumiy (worker ichida)
+single_flight = SingleFlight()
+
+
+async def shared_json(key: Hashable, load: Callable[[], Awaitable[bytes]]) -> Response:
+    """Bir xil so'rovlar bitta SQL so'rovi va bitta tayyor JSON tanasini bo'lishadi"""
+    body = await single_flight.do(key, load)
+    return Response(content=body, media_type="application/json")
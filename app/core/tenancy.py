@@ -0,0 +1,24 @@
+from typing import Optional
+
+from fastapi import Header
+
+from app.core.config import settings
+
+# Mijoz ilovasi tanlangan salonni (filialni) shu sarlavhada yuboradi
+TENANT_HEADER = "X-Salon-ID"
+
+
+def get_tenant_id(
+    salon_id: Optional[int] = Header(None, alias=TENANT_HEADER, ge=1)
+) -> int:
+    """So'rov qaysi salon doirasida bajarilishi (sarlavha bo'lmasa DEFAULT_TENANT_ID)"""
+    return salon_id if salon_id is not None else settings.DEFAULT_TENANT_ID
+
+
+def tenant_key(tenant_id: int, *parts) -> tuple:
+    """Keshlar va single-flight uchun salon nomlar fazosidagi kalit
+
+    Alohida bazadagi salonlarda id'lar boshqa salonlar bilan takrorlanishi
+    mumkin, shuning uchun kalit doim tenant_id bilan boshlanadi.
+    """
+    return ("tenant", tenant_id, *parts)
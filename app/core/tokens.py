@@ -0,0 +1,241 @@
+import base64
+import calendar
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+HMAC_ALGORITHMS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+
+
+class TokenError(Exception):
+    """Token yaroqsiz, imzosi noto'g'ri yoki muddati tugagan"""
+
+
+def b64url_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _int_to_b64(value: int, length: Optional[int] = None) -> str:
+    length = length or (value.bit_length() + 7) // 8
+    return b64url_encode(value.to_bytes(length, "big"))
+
+
+class SigningKey:
+    """Bitta kalit (kid). Kalit obyektlari yaratilganda bir marta yuklanadi"""
+
+    def __init__(
+        self,
+        kid: str,
+        alg: str,
+        secret: Optional[str] = None,
+        private_key: Optional[str] = None,
+        public_key: Optional[str] = None,
+    ):
+        self.kid = kid
+        self.alg = alg
+        self.can_sign = False
+
+        if alg in HMAC_ALGORITHMS:
+            self._digest = HMAC_ALGORITHMS[alg]
+            self._secret = secret.encode()
+            self.can_sign = True
+        elif alg in ASYMMETRIC_ALGORITHMS:
+            # cryptography faqat asimmetrik kalitlar sozlanganda yuklanadi
+            from cryptography.hazmat.primitives import hashes, serialization
+            from cryptography.hazmat.primitives.asymmetric import ec, padding
+
+            self._hash = hashes.SHA256()
+            self._padding = padding.PKCS1v15()
+            self._ecdsa = ec.ECDSA(hashes.SHA256()) if alg == "ES256" else None
+            self._private = None
+            if private_key:
+                self._private = serialization.load_pem_private_key(private_key.encode(), password=None)
+                self.can_sign = True
+            self._public = (
+                serialization.load_pem_public_key(public_key.encode())
+                if public_key
+                else self._private.public_key()
+            )
+        else:
+            raise ValueError(f"Qo'llab-quvvatlanmaydigan algoritm: {alg}")
+
+    def sign(self, message: bytes) -> bytes:
+        if self.alg in HMAC_ALGORITHMS:
+            return hmac.new(self._secret, message, self._digest).digest()
+        if self.alg == "RS256":
+            return self._private.sign(message, self._padding, self._hash)
+
+        # ES256: DER imzoni JWS formatiga (r || s) o'tkazish
+        from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
+
+        r, s = decode_dss_signature(self._private.sign(message, self._ecdsa))
+        return r.to_bytes(32, "big") + s.to_bytes(32, "big")
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        if self.alg in HMAC_ALGORITHMS:
+            expected = hmac.new(self._secret, message, self._digest).digest()
+            return hmac.compare_digest(expected, signature)
+
+        from cryptography.exceptions import InvalidSignature
+
+        try:
+            if self.alg == "RS256":
+                self._public.verify(signature, message, self._padding, self._hash)
+            else:
+                from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
+
+                if len(signature) != 64:
+                    return False
+                der = encode_dss_signature(
+                    int.from_bytes(signature[:32], "big"), int.from_bytes(signature[32:], "big")
+                )
+                self._public.verify(der, message, self._ecdsa)
+        except InvalidSignature:
+            return False
+        return True
+
+    def public_jwk(self) -> Optional[dict]:
+        """Boshqa servislar tokenni o'zi tekshirishi uchun ochiq kalit (JWK)"""
+        if self.alg == "RS256":
+            numbers = self._public.public_numbers()
+            return {"kty": "RSA", "kid": self.kid, "alg": self.alg, "use": "sig",
+                    "n": _int_to_b64(numbers.n), "e": _int_to_b64(numbers.e)}
+        if self.alg == "ES256":
+            numbers = self._public.public_numbers()
+            return {"kty": "EC", "kid": self.kid, "alg": self.alg, "use": "sig", "crv": "P-256",
+                    "x": _int_to_b64(numbers.x, 32), "y": _int_to_b64(numbers.y, 32)}
+        return None
+
+
+class KeyRing:
+    """Kalitlar to'plami: faol kalit bilan imzolanadi, istalgan ma'lum kid bilan tekshiriladi
+
+    Kalitni almashtirish (rotation): yangi kalit qo'shilib faol qilinadi,
+    eskisi eski tokenlar muddati tugaguncha ro'yxatda qoladi.
+    """
+
+    def __init__(self, keys: List[SigningKey], active_kid: str, fallback_kid: Optional[str] = None):
+        self.keys: Dict[str, SigningKey] = {key.kid: key for key in keys}
+        self.active = self.keys[active_kid]
+        if not self.active.can_sign:
+            raise ValueError(f"Faol kalitda maxfiy qism yo'q: {active_kid}")
+        # kid siz (eski) tokenlar uchun kalit
+        self.fallback = self.keys.get(fallback_kid) if fallback_kid else None
+
+        self._header = b64url_encode(
+            json.dumps({"alg": self.active.alg, "kid": self.active.kid, "typ": "JWT"},
+                       separators=(",", ":")).encode()
+        )
+        # Header qismi barcha tokenlarda bir xil - tahlil natijasini keshlaymiz
+        self._header_cache: Dict[str, SigningKey] = {}
+
+    def encode(self, payload: dict) -> str:
+        claims = {
+            name: calendar.timegm(value.utctimetuple()) if isinstance(value, datetime) else value
+            for name, value in payload.items()
+        }
+        body = b64url_encode(json.dumps(claims, separators=(",", ":")).encode())
+        signing_input = f"{self._header}.{body}"
+        signature = b64url_encode(self.active.sign(signing_input.encode()))
+        return f"{signing_input}.{signature}"
+
+    def _key_for_header(self, header_segment: str) -> SigningKey:
+        key = self._header_cache.get(header_segment)
+        if key is not None:
+            return key
+
+        try:
+            header = json.loads(b64url_decode(header_segment))
+        except (ValueError, TypeError):
+            raise TokenError("Header noto'g'ri")
+        if not isinstance(header, dict):
+            raise TokenError("Header noto'g'ri")
+
+        kid = header.get("kid")
+        # kid dict kaliti sifatida ishlatiladi: ro'yxat/obyekt TypeError (500) bermasligi kerak
+        if kid is not None and not isinstance(kid, str):
+            raise TokenError("Header noto'g'ri")
+        key = self.keys.get(kid) if kid else self.fallback
+        # Algoritmni header emas, kalit belgilaydi ("alg": "none" hujumlariga qarshi)
+        if key is None or header.get("alg") != key.alg:
+            raise TokenError("Noma'lum kalit")
+
+        if len(self._header_cache) < 64:
+            self._header_cache[header_segment] = key
+        return key
+
+    def decode(self, token: str) -> dict:
+        try:
+            header_segment, body_segment, signature_segment = token.split(".")
+        except (AttributeError, ValueError):
+            raise TokenError("Token formati noto'g'ri")
+
+        key = self._key_for_header(header_segment)
+
+        try:
+            signature = b64url_decode(signature_segment)
+        except (ValueError, TypeError):
+            raise TokenError("Imzo noto'g'ri")
+        if not key.verify(f"{header_segment}.{body_segment}".encode(), signature):
+            raise TokenError("Imzo noto'g'ri")
+
+        try:
+            payload = json.loads(b64url_decode(body_segment))
+        except (ValueError, TypeError):
+            raise TokenError("Payload noto'g'ri")
+        if not isinstance(payload, dict):
+            raise TokenError("Payload noto'g'ri")
+
+        exp = payload.get("exp")
+        if exp is not None and (isinstance(exp, bool) or not isinstance(exp, (int, float))):
+            raise TokenError("Payload noto'g'ri")
+        if exp is not None and exp <= time.time():
+            raise TokenError("Token muddati tugagan")
+
+        return payload
+
+    def jwks(self) -> dict:
+        return {"keys": [jwk for jwk in (key.public_jwk() for key in self.keys.values()) if jwk]}
+
+
+def _read_pem(config: dict, name: str) -> Optional[str]:
+    if config.get(name):
+        return config[name]
+    path = config.get(f"{name}_file")
+    if path:
+        with open(path) as pem:
+            return pem.read()
+    return None
+
+
+def load_key_ring() -> KeyRing:
+    """Sozlamalardan kalitlarni yuklash
+
+    JWT_KEYS bo'sh bo'lsa SECRET_KEY va ALGORITHM dan bitta "default" kalit yaratiladi.
+    Aks holda JWT_KEYS - {"kid": {"alg": ..., "secret" | "private_key(_file)" | "public_key(_file)"}}.
+    """
+    keys = [SigningKey("default", settings.ALGORITHM, secret=settings.SECRET_KEY)]
+
+    for kid, config in json.loads(settings.JWT_KEYS or "{}").items():
+        keys.append(SigningKey(
+            kid,
+            config.get("alg", "HS256"),
+            secret=config.get("secret"),
+            private_key=_read_pem(config, "private_key"),
+            public_key=_read_pem(config, "public_key"),
+        ))
+
+    return KeyRing(keys, active_kid=settings.JWT_ACTIVE_KID or "default", fallback_kid="default")
+
+
+key_ring = load_key_ring()
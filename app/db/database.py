@@ -1,18 +1,122 @@
-import os
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
-from dotenv import load_dotenv
+import time
+from typing import Optional
+from fastapi import Depends, Request
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
+from app.core.tenancy import get_tenant_id
+from app.db.replicas import ReplicaRouter, primary_sticky_until
+from app.db.tenants import TenantRouter
+
+def create_engine(url: Optional[str] = None, **engine_kwargs) -> AsyncEngine:
+    """Async engine yaratish (url berilmasa DATABASE_URL)
+
+    SQLite'da (lokal ishga tushirish va testlar) tranzaksiyani drayver emas,
+    SQLAlchemy boshlaydi - aks holda pysqlite SAVEPOINT'larni to'g'ri bajarmaydi.
+    """
+    engine_kwargs.setdefault("echo", settings.DATABASE_ECHO)
+    new_engine = create_async_engine(url or settings.DATABASE_URL, **engine_kwargs)
+
+    if new_engine.dialect.name == "sqlite":
+        @event.listens_for(new_engine.sync_engine, "connect")
+        def _disable_driver_transactions(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(new_engine.sync_engine, "begin")
+        def _begin(connection):
+            connection.exec_driver_sql("BEGIN")
+
+    return new_engine
+
+def create_sessionmaker(bind, **session_kwargs) -> sessionmaker:
+    """Loyiha bo'yicha bir xil sozlangan sessiya fabrikasi (engine yoki ulanish uchun)"""
+    return sessionmaker(autocommit=False, autoflush=False, bind=bind, class_=AsyncSession, **session_kwargs)
 
 # SQLAlchemy database engine
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+engine = create_engine()
 
 # Session yaratish
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+SessionLocal = create_sessionmaker(engine)
 Base = declarative_base()
 
+def configure_database(url: str, **engine_kwargs) -> AsyncEngine:
+    """Asosiy bazani almashtirish (testlar, skriptlar)
+
+    SessionLocal obyekti o'zgarmaydi, faqat qayta bog'lanadi - uni import qilgan
+    modullar (workerlar, audit, SSE) ham yangi bazaga ulanadi.
+    """
+    global engine
+    engine = create_engine(url, **engine_kwargs)
+    SessionLocal.configure(bind=engine)
+    return engine
+
+# O'qish replikalari (sozlanmagan bo'lsa barcha so'rovlar asosiy bazaga boradi)
+replica_router = ReplicaRouter(
+    settings.DATABASE_REPLICA_URLS,
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_HEALTH_CHECK_SECONDS,
+    echo=settings.DATABASE_ECHO,
+)
+
+# Alohida bazaga chiqarilgan katta salonlar
+tenant_router = TenantRouter(settings.TENANT_DATABASE_URLS, echo=settings.DATABASE_ECHO)
+
 # Dependency: Database sessiyani olish
 async def get_db():
     async with SessionLocal() as session:
-        yield session 
\ No newline at end of file
+        yield session
+
+# Dependency: Faqat o'qish uchun sessiya (replika yoki asosiy baza)
+async def get_read_db(request: Request):
+    replica = None
+
+    # Yaqinda yozgan mijoz o'z o'zgarishlarini ko'rishi uchun asosiy bazadan o'qiydi
+    if primary_sticky_until(request.cookies) <= time.time():
+        replica = await replica_router.pick()
+
+    if replica is None:
+        async with SessionLocal() as session:
+            yield session
+        return
+
+    async with replica.sessionmaker() as session:
+        try:
+            yield session
+        except DBAPIError as e:
+            if e.connection_invalidated:
+                replica_router.mark_down(replica)
+            raise
+
+
+def tenant_session_factory(tenant_id: int):
+    """Salon ma'lumotlari joylashgan bazaning sessiya fabrikasi"""
+    return tenant_router.sessionmaker(tenant_id) or SessionLocal
+
+# Dependency: Salon ma'lumotlari (kategoriyalar, xizmatlar, barberlar, buyurtmalar) uchun sessiya
+# Umumiy bazadagi salonlar uchun get_db sessiyasining o'zi qaytadi (ikkinchi ulanish ochilmaydi)
+async def get_tenant_db(
+    tenant_id: int = Depends(get_tenant_id),
+    db: AsyncSession = Depends(get_db),
+):
+    dedicated = tenant_router.sessionmaker(tenant_id)
+    if dedicated is None:
+        yield db
+        return
+
+    async with dedicated() as session:
+        yield session
+
+# Dependency: Salon ma'lumotlarini o'qish (umumiy bazada replika, alohida bazada uning o'zi)
+async def get_tenant_read_db(
+    tenant_id: int = Depends(get_tenant_id),
+    db: AsyncSession = Depends(get_read_db),
+):
+    dedicated = tenant_router.sessionmaker(tenant_id)
+    if dedicated is None:
+        yield db
+        return
+
+    async with dedicated() as session:
+        yield session
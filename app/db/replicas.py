@@ -0,0 +1,108 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+logger = logging.getLogger(__name__)
+
+# Replika kechikishini soniyalarda hisoblash (WAL to'liq qo'llangan bo'lsa 0)
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+# Yozuvdan keyin mijozni asosiy bazaga bog'lab turadigan cookie
+STICKY_COOKIE = "db_primary_until"
+
+
+class Replica:
+    """Bitta o'qish replikasi va uning oxirgi holati"""
+
+    def __init__(self, url: str, **engine_kwargs):
+        self.url = url
+        self.engine = create_async_engine(url, **engine_kwargs)
+        self.sessionmaker = sessionmaker(
+            autocommit=False, autoflush=False, bind=self.engine, class_=AsyncSession
+        )
+        self.healthy = True
+        self.checked_at = 0.0
+
+
+class ReplicaRouter:
+    """O'qish so'rovlarini sog'lom replikalar o'rtasida navbat bilan taqsimlash
+
+    Har bir replika REPLICA_HEALTH_CHECK_SECONDS da bir marta tekshiriladi.
+    Kechikishi max_lag dan katta yoki ishlamayotgan replika tanlanmaydi;
+    birorta ham sog'lom replika bo'lmasa None qaytadi (asosiy baza ishlatiladi).
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        max_lag: float,
+        check_interval: float,
+        check_timeout: float = 1.0,
+        **engine_kwargs
+    ):
+        self.replicas = [Replica(url, **engine_kwargs) for url in urls]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self._order = itertools.cycle(self.replicas) if self.replicas else None
+
+    @staticmethod
+    async def _lag(replica: Replica):
+        async with replica.engine.connect() as conn:
+            return await conn.scalar(LAG_QUERY)
+
+    async def _check(self, replica: Replica) -> None:
+        # Bir vaqtda kelgan so'rovlar tekshiruvni takrorlamasligi uchun vaqtni oldindan yozamiz
+        replica.checked_at = time.monotonic()
+        try:
+            # Timeout ulanishni ham qamraydi: javob bermayotgan (blackhole) replika
+            # so'rovni asyncpg'ning connect timeout'igacha (60s) ushlab turmasligi kerak
+            lag = await asyncio.wait_for(self._lag(replica), self.check_timeout)
+            replica.healthy = float(lag or 0) <= self.max_lag
+            if not replica.healthy:
+                logger.warning("Replika kechikmoqda (%.1fs): %s", float(lag), replica.engine.url)
+        except Exception:
+            logger.warning("Replika ishlamayapti: %s", replica.engine.url)
+            replica.healthy = False
+
+    async def pick(self) -> Optional[Replica]:
+        """Navbatdagi sog'lom replikani tanlash"""
+        if not self.replicas:
+            return None
+
+        for _ in range(len(self.replicas)):
+            replica = next(self._order)
+            if time.monotonic() - replica.checked_at >= self.check_interval:
+                await self._check(replica)
+            if replica.healthy:
+                return replica
+
+        return None
+
+    def mark_down(self, replica: Replica) -> None:
+        """So'rov vaqtida ulanish uzilgan replikani keyingi tekshiruvgacha chetlatish"""
+        replica.healthy = False
+        replica.checked_at = time.monotonic()
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+def primary_sticky_until(cookies) -> float:
+    """Mijoz asosiy bazadan o'qishi kerak bo'lgan vaqt (unix timestamp)"""
+    try:
+        return float(cookies.get(STICKY_COOKIE, 0))
+    except (TypeError, ValueError):
+        return 0.0
@@ -0,0 +1,44 @@
+import logging
+from typing import Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+logger = logging.getLogger(__name__)
+
+
+class TenantDatabase:
+    """Alohida bazaga chiqarilgan bitta salon"""
+
+    def __init__(self, url: str, **engine_kwargs):
+        self.url = url
+        self.engine = create_async_engine(url, **engine_kwargs)
+        self.sessionmaker = sessionmaker(
+            autocommit=False, autoflush=False, bind=self.engine, class_=AsyncSession
+        )
+
+
+class TenantRouter:
+    """Katta salonlarning so'rovlarini ularning alohida bazasiga yo'naltirish
+
+    Ro'yxatda yo'q salonlar asosiy bazada (umumiy jadvallarda, tenant_id
+    bo'yicha ajratilgan holda) qoladi. Alohida bazalar bir xil migratsiyalar
+    bilan yaratiladi; har bir baza o'z ulanishlar puliga ega, shuning uchun
+    bitta katta salon yuklamasi boshqalarning so'rovlarini sekinlashtirmaydi.
+    """
+
+    def __init__(self, urls: Dict[int, str], **engine_kwargs):
+        self.databases = {
+            tenant_id: TenantDatabase(url, **engine_kwargs) for tenant_id, url in urls.items()
+        }
+        if self.databases:
+            logger.info("Alohida bazadagi salonlar: %s", sorted(self.databases))
+
+    def sessionmaker(self, tenant_id: int) -> Optional[sessionmaker]:
+        """Salonning alohida bazasi (bo'lmasa None - asosiy baza ishlatiladi)"""
+        database = self.databases.get(tenant_id)
+        return database.sessionmaker if database else None
+
+    async def dispose(self) -> None:
+        for database in self.databases.values():
+            await database.engine.dispose()
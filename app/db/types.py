@@ -0,0 +1,35 @@
+from datetime import timezone
+
+from sqlalchemy import DateTime
+from sqlalchemy.types import TypeDecorator
+
+
+class UTCDateTime(TypeDecorator):
+    """Vaqt doim UTC da saqlanadi va timezone-aware qaytariladi
+
+    PostgreSQL'da timestamptz. SQLite vaqt zonasini saqlamaydi, shuning uchun
+    qiymat UTC ga o'tkazilib, zonasiz yoziladi va o'qishda UTC deb belgilanadi -
+    ikkala bazada ham ilova faqat aware datetime bilan ishlaydi. Zonasiz qiymat
+    berilsa (eski kod, testlar), u UTC deb hisoblanadi.
+    """
+
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        else:
+            value = value.astimezone(timezone.utc)
+        if dialect.name == "sqlite":
+            return value.replace(tzinfo=None)
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
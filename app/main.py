@@ -1,12 +1,36 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
-from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
 from app.api import router as api_router
+from app.api.auth import require_chain_permission
+from app.core.audit import audit_logger
+from app.core.events import event_broker
+from app.core.idempotency import idempotency_store
+from app.core.compression import CompressionMiddleware, compression_stats
+from app.core.permissions import ANALYTICS_READ
+from app.db import database
+from app.db.database import replica_router, tenant_router
+from app.db.replicas import STICKY_COOKIE
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await event_broker.start()
+    audit_logger.start()
+    yield
+    await event_broker.stop()
+    # Navbatda qolgan audit yozuvlari ulanishlar yopilishidan oldin yoziladi
+    await audit_logger.stop()
+    # Server to'xtaganda (joriy so'rovlar tugagandan keyin) ulanishlar pulini yopish
+    await replica_router.dispose()
+    await tenant_router.dispose()
+    await database.engine.dispose()
 
 # FastAPI ilovasini yaratish
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.PROJECT_NAME,
     description="StyleHub - Sartaroshxona uchun API",
     version="1.0.0",
@@ -23,6 +47,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Yozuvdan keyin mijozni qisqa vaqt asosiy bazaga bog'lash (read-your-writes)
+@app.middleware("http")
+async def primary_stickiness(request: Request, call_next):
+    response = await call_next(request)
+    if (
+        replica_router.replicas
+        and request.method not in ("GET", "HEAD", "OPTIONS")
+        and response.status_code < 400
+    ):
+        response.set_cookie(
+            key=STICKY_COOKIE,
+            value=str(int(time.time()) + settings.READ_YOUR_WRITES_SECONDS),
+            max_age=settings.READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+            samesite="strict",
+        )
+    return response
+
+# Idempotency-Key: qayta yuborilgan so'rovga saqlangan javob qaytariladi
+@app.middleware("http")
+async def idempotency_keys(request: Request, call_next):
+    return await idempotency_store.handle(request, call_next)
+
+# Javoblarni siqish (eng tashqi middleware - barcha javoblarga qo'llanadi)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        stats=compression_stats,
+    )
+
 # API routerlarni qo'shish
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -49,6 +106,16 @@ def root():
 def health_check():
     return {"status": "healthy"}
 
+# Siqish statistikasi (shu worker bo'yicha): tejalgan baytlar va CPU vaqti.
+# Statistika butun jarayonniki, shuning uchun ruxsat tarmoq darajasida tekshiriladi
+@app.get(
+    "/metrics/compression",
+    include_in_schema=False,
+    dependencies=[Depends(require_chain_permission(ANALYTICS_READ))],
+)
+def compression_metrics():
+    return compression_stats.snapshot()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=7777, reload=True)
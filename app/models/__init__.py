@@ -5,11 +5,20 @@
 from app.models.models import (
     Base,
     User,
+    Salon,
     Category,
     Service,
     Appointment,
     AppointmentStatus,
+    AppointmentService,
     Barber,
-    Banner
+    BarberWorkingHours,
+    BarberScheduleOverride,
+    Banner,
+    RevokedToken,
+    AppointmentRollupHourly,
+    AppointmentRollupDaily,
+    RollupWatermark,
+    AuditLog
 )
 
@@ -1,9 +1,9 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Enum, Boolean, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, Float, Enum, Boolean, Text, Index, JSON
 from sqlalchemy.orm import relationship
-from sqlalchemy.ext.declarative import declarative_base
 import enum
-from datetime import datetime
 from app.db.database import Base  # Import Base from app.db.database
+from app.db.types import UTCDateTime  # Vaqtlar UTC da, timezone-aware (PostgreSQL'da timestamptz)
+from app.utils.timerange import utc_now
 
 # Buyurtma statusi uchun ENUM
 class AppointmentStatus(str, enum.Enum):
@@ -11,88 +11,337 @@ class AppointmentStatus(str, enum.Enum):
     confirmed = "confirmed"
     cancelled = "cancelled"
     completed = "completed"
+    no_show = "no_show"  # Mijoz kelmadi
 
 # 1. Foydalanuvchilar jadvali (Clients)
 class User(Base):
     __tablename__ = "clients"
 
     id = Column(Integer, primary_key=True, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(UTCDateTime, default=utc_now)
     phone = Column(String, unique=True, nullable=True)  # phone maydoni ixtiyoriy
     password_hash = Column(Text, nullable=False)
-    role = Column(String, nullable=True)  # role ixtiyoriy
+    # Rollar salon bo'yicha (client_roles). Istalgan salondagi rol o'zgarganda
+    # oshiriladi: eski versiyali tokenlar bekor qilinadi
+    role_version = Column(Integer, nullable=False, default=0)
     email = Column(String, unique=True, nullable=False)  # email majburiy
     full_name = Column(String, nullable=False)  # full_name majburiy
     
     appointments = relationship("Appointment", back_populates="user")
 
+# Mijozning salondagi roli (admin, manager, ...). Ruxsatlar faqat shu salon
+# doirasida amal qiladi; qatori yo'q salonda mijoz oddiy mijoz
+class ClientRole(Base):
+    __tablename__ = "client_roles"
+
+    client_id = Column(Integer, ForeignKey("clients.id"), primary_key=True)
+    tenant_id = Column(Integer, ForeignKey("salons.id"), primary_key=True)
+    role = Column(String, nullable=False)
+
+    __table_args__ = (
+        # Salon xodimlari ro'yxati (GET /clients/)
+        Index("ix_client_roles_tenant", "tenant_id", "client_id"),
+    )
+
+# Salonlar (filiallar) - tenant. Kategoriyalar, xizmatlar, barberlar va buyurtmalar
+# salonga tegishli; mijozlar butun tarmoq uchun umumiy
+class Salon(Base):
+    __tablename__ = "salons"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    slug = Column(String, unique=True, nullable=False)
+    address = Column(String, nullable=True)
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(UTCDateTime, default=utc_now)
+
 # 2. Xizmat kategoriyalari jadvali (Categories)
 class Category(Base):
     __tablename__ = "categories"
 
     id = Column(Integer, primary_key=True, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    name = Column(String, unique=True, nullable=False)
+    tenant_id = Column(Integer, ForeignKey("salons.id"), nullable=False, default=1)
+    created_at = Column(UTCDateTime, default=utc_now)
+    name = Column(String, nullable=False)
     description = Column(String, nullable=True)
     image_url = Column(String, nullable=True)
 
     services = relationship("Service", back_populates="category")
     barbers = relationship("Barber", back_populates="category")
 
+    __table_args__ = (
+        # Nom salon ichida takrorlanmaydi (turli filiallarda bir xil kategoriya bo'lishi mumkin)
+        Index("ix_categories_tenant_name", "tenant_id", "name", unique=True),
+    )
+
 # 3. Xizmatlar jadvali (Services)
 class Service(Base):
     __tablename__ = "services"
 
     id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("salons.id"), nullable=False, default=1)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     name = Column(String, nullable=False)
     description = Column(String, nullable=True)
     price = Column(Float, nullable=False)
     duration = Column(Integer, nullable=False)  # Xizmat davomiyligi (minut)
+    # O'chirilgan vaqt (soft delete): eski buyurtmalar xizmatga havolasini saqlaydi
+    deleted_at = Column(UTCDateTime, nullable=True)
 
     category = relationship("Category", back_populates="services")
     appointments = relationship("Appointment", back_populates="service")
 
+    __table_args__ = (
+        # Katalog so'rovlari faqat o'chirilmagan qatorlarni o'qiydi (qisman indeks)
+        Index(
+            "ix_services_active_tenant_category",
+            "tenant_id",
+            "category_id",
+            postgresql_where=deleted_at.is_(None),
+            sqlite_where=deleted_at.is_(None),
+        ),
+    )
+
 # 4. Buyurtmalar jadvali (Appointments)
+# PostgreSQL'da jadval appointment_time bo'yicha oylarga bo'lingan (RANGE partitioning),
+# qarang: migrations/versions/0003_partition_appointments.py va app/workers/partitions.py
 class Appointment(Base):
     __tablename__ = "appointments"
 
     id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("salons.id"), nullable=False, default=1)
     user_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
     service_id = Column(Integer, ForeignKey("services.id"), nullable=False)
     barber_id = Column(Integer, ForeignKey("barbers.id"), nullable=True)  # Barber ID qo'shamiz
-    appointment_time = Column(DateTime, nullable=False)
+    appointment_time = Column(UTCDateTime, nullable=False)
     status = Column(Enum(AppointmentStatus), default=AppointmentStatus.pending)
+    created_at = Column(UTCDateTime, default=utc_now)
+    reminder_sent_at = Column(UTCDateTime, nullable=True)  # Eslatma yuborilgan vaqt
+    # Worker eslatmani egallagan vaqt (ijara): yuborilmay qolsa muddatidan keyin qayta olinadi
+    reminder_claimed_at = Column(UTCDateTime, nullable=True)
+    # Oxirgi o'zgarish vaqti (analitika rollup'lari shu bo'yicha yangilanadi)
+    updated_at = Column(UTCDateTime, default=utc_now, onupdate=utc_now, nullable=False)
+    # Bron vaqtidagi umumiy davomiylik va narx (to'plamda barcha xizmatlar yig'indisi).
+    # Eski buyurtmalarda NULL - service_id dagi xizmat qiymatlari ishlatiladi
+    duration_minutes = Column(Integer, nullable=True)
+    total_price = Column(Float, nullable=True)
 
     user = relationship("User", back_populates="appointments")
-    service = relationship("Service", back_populates="appointments")
+    service = relationship("Service", back_populates="appointments")  # To'plamdagi birinchi xizmat
     barber = relationship("Barber", back_populates="appointments")  # Barber bilan bog'laymiz
+    # To'plam xizmatlari (selectin: async sessiyada javob uchun oldindan yuklanadi)
+    services = relationship(
+        "AppointmentService",
+        primaryjoin="Appointment.id == foreign(AppointmentService.appointment_id)",
+        order_by="AppointmentService.position",
+        lazy="selectin",
+        cascade="all, delete-orphan",
+    )
+
+    __table_args__ = (
+        # Mijozning buyurtmalari vaqt bo'yicha (faqat kerakli partitsiyalar o'qiladi)
+        Index("ix_appointments_user_time", "user_id", "appointment_time"),
+        # Salonning buyurtmalari vaqt bo'yicha (admin ro'yxati)
+        Index("ix_appointments_tenant_time", "tenant_id", "appointment_time"),
+        # Barberning kunlik jadvali va bo'sh vaqtlarini qidirish uchun
+        Index("ix_appointments_barber_time", "barber_id", "appointment_time"),
+        # Eslatma kutayotgan buyurtmalar uchun qisman indeks (vaqt oralig'i bo'yicha qidirish)
+        Index(
+            "ix_appointments_reminder_due",
+            "appointment_time",
+            postgresql_where=reminder_sent_at.is_(None),
+            sqlite_where=reminder_sent_at.is_(None),
+        ),
+        # Muddati o'tgan pending buyurtmalarni topish uchun qisman indeks
+        Index(
+            "ix_appointments_pending_created",
+            "created_at",
+            postgresql_where=status == AppointmentStatus.pending,
+            sqlite_where=status == AppointmentStatus.pending,
+        ),
+        # Rollup worker o'zgargan buyurtmalarni watermark'dan keyin topishi uchun
+        Index("ix_appointments_updated_at", "updated_at"),
+    )
+
+    @property
+    def service_ids(self):
+        # Eski (to'plamdan oldingi) buyurtmalarda appointment_services qatorlari yo'q
+        return [item.service_id for item in self.services] or [self.service_id]
+
+# Buyurtma tarkibidagi xizmatlar (to'plam): ketma-ketlik, narx va davomiylik bron vaqtidagi holatida
+# appointments partitsiyalangan (PRIMARY KEY (id, appointment_time)), shuning uchun
+# appointment_id ga FOREIGN KEY qo'yib bo'lmaydi - bog'liqlik ORM orqali saqlanadi
+class AppointmentService(Base):
+    __tablename__ = "appointment_services"
+
+    id = Column(Integer, primary_key=True)
+    appointment_id = Column(Integer, nullable=False)
+    service_id = Column(Integer, ForeignKey("services.id"), nullable=False)
+    position = Column(Integer, nullable=False, default=0)
+    price = Column(Float, nullable=False)
+    duration = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_appointment_services_appointment", "appointment_id", "position"),
+    )
 
 # Barber modeli
 class Barber(Base):
     __tablename__ = "barbers"
 
     id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("salons.id"), nullable=False, default=1)
     full_name = Column(String, nullable=False)
-    phone = Column(String, unique=True, nullable=False)
-    email = Column(String, unique=True, nullable=True)
+    phone = Column(String, nullable=False)
+    email = Column(String, nullable=True)
     bio = Column(String, nullable=True)
     experience = Column(Integer, nullable=True)
     rating = Column(Float, nullable=True)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
     image_url = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(UTCDateTime, default=utc_now)
+    # O'chirilgan vaqt (soft delete): buyurtmalar tarixi va analitika saqlanadi
+    deleted_at = Column(UTCDateTime, nullable=True)
 
     # Barber bilan bog'liq bo'lgan buyurtmalar
     appointments = relationship("Appointment", back_populates="barber")
     category = relationship("Category", back_populates="barbers")
 
+    __table_args__ = (
+        # Kategoriyadagi ishlayotgan barberlar (jadval va bo'sh vaqt qidirish) salon bo'yicha
+        Index(
+            "ix_barbers_active_tenant_category",
+            "tenant_id",
+            "category_id",
+            postgresql_where=deleted_at.is_(None),
+            sqlite_where=deleted_at.is_(None),
+        ),
+        # Telefon va email faqat o'chirilmagan barberlar orasida yagona
+        Index(
+            "ix_barbers_active_phone",
+            "phone",
+            unique=True,
+            postgresql_where=deleted_at.is_(None),
+            sqlite_where=deleted_at.is_(None),
+        ),
+        Index(
+            "ix_barbers_active_email",
+            "email",
+            unique=True,
+            postgresql_where=deleted_at.is_(None),
+            sqlite_where=deleted_at.is_(None),
+        ),
+    )
+
+# Barberning haftalik ish vaqti shabloni (bir kunda bir nechta oraliq - tanaffuslar uchun)
+# Vaqtlar kun boshidan minutlarda: 09:00 -> 540
+class BarberWorkingHours(Base):
+    __tablename__ = "barber_working_hours"
+
+    id = Column(Integer, primary_key=True)
+    barber_id = Column(Integer, ForeignKey("barbers.id", ondelete="CASCADE"), nullable=False)
+    weekday = Column(Integer, nullable=False)  # 0 - dushanba, 6 - yakshanba
+    start_minute = Column(Integer, nullable=False)
+    end_minute = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_barber_working_hours_barber", "barber_id", "weekday"),
+    )
+
+# Aniq sana uchun istisno: shu sanada shablon o'rniga ishlatiladi
+# is_day_off = True - dam olish kuni (start/end bo'sh)
+class BarberScheduleOverride(Base):
+    __tablename__ = "barber_schedule_overrides"
+
+    id = Column(Integer, primary_key=True)
+    barber_id = Column(Integer, ForeignKey("barbers.id", ondelete="CASCADE"), nullable=False)
+    date = Column(Date, nullable=False)
+    is_day_off = Column(Boolean, nullable=False, default=False)
+    start_minute = Column(Integer, nullable=True)
+    end_minute = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        Index("ix_barber_schedule_overrides_barber_date", "barber_id", "date"),
+    )
+
 # Banner modeli
 class Banner(Base):
     __tablename__ = "banners"
 
     id = Column(Integer, primary_key=True, index=True)
-    start_date = Column(DateTime(timezone=True), nullable=True)
-    end_date = Column(DateTime(timezone=True), nullable=True)
+    start_date = Column(UTCDateTime, nullable=True)
+    end_date = Column(UTCDateTime, nullable=True)
     is_active = Column(Boolean, default=True)
     image_url = Column(String, nullable=True)
+
+# Bekor qilingan (revoked) tokenlar jadvali
+# jti - ishlatilgan refresh token ID si yoki "family:<fid>" ko'rinishidagi butun oila
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String, primary_key=True)
+    family_id = Column(String, nullable=False)
+    reason = Column(String, nullable=False)  # rotated, reuse, logout
+    expires_at = Column(UTCDateTime, nullable=False, index=True)  # Shu vaqtdan keyin yozuv keraksiz
+    revoked_at = Column(UTCDateTime, default=utc_now, nullable=False, index=True)
+
+# Analitika rollup jadvallari (app/workers/rollups.py yangilaydi)
+# barber_id = 0 - barber biriktirilmagan buyurtmalar
+class AppointmentRollupHourly(Base):
+    __tablename__ = "appointment_rollups_hourly"
+
+    bucket_start = Column(UTCDateTime, primary_key=True)  # Soat boshi
+    barber_id = Column(Integer, primary_key=True)
+    category_id = Column(Integer, primary_key=True)
+    total_count = Column(Integer, nullable=False, default=0)
+    completed_count = Column(Integer, nullable=False, default=0)
+    cancelled_count = Column(Integer, nullable=False, default=0)
+    no_show_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)  # Yakunlangan xizmatlar narxi
+    booked_minutes = Column(Integer, nullable=False, default=0)  # Bekor qilinmaganlar davomiyligi
+
+class AppointmentRollupDaily(Base):
+    __tablename__ = "appointment_rollups_daily"
+
+    bucket_date = Column(Date, primary_key=True)
+    barber_id = Column(Integer, primary_key=True)
+    category_id = Column(Integer, primary_key=True)
+    total_count = Column(Integer, nullable=False, default=0)
+    completed_count = Column(Integer, nullable=False, default=0)
+    cancelled_count = Column(Integer, nullable=False, default=0)
+    no_show_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    booked_minutes = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Kategoriya bo'yicha hisobotlar uchun
+        Index("ix_appointment_rollups_daily_category", "category_id", "bucket_date"),
+    )
+
+# Fon jarayonlari qayerga qadar ishlov berganini saqlash
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String, primary_key=True)
+    value = Column(UTCDateTime, nullable=False)
+
+# O'zgarishlar jurnali (faqat qo'shiladi, o'zgartirilmaydi). Yozuvlar app/core/audit.py
+# orqali fon vazifasida partiyalab yoziladi - so'rov tranzaksiyasiga INSERT qo'shilmaydi
+class AuditLog(Base):
+    __tablename__ = "audit_log"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(UTCDateTime, nullable=False, default=utc_now)  # O'zgarish vaqti
+    tenant_id = Column(Integer, nullable=True)
+    actor_id = Column(Integer, nullable=True)  # O'zgartirgan mijoz (clients.id)
+    action = Column(String, nullable=False)  # create, update, delete, status
+    entity = Column(String, nullable=False)  # service, barber, appointment, ...
+    entity_id = Column(Integer, nullable=True)
+    changes = Column(JSON, nullable=True)  # {"maydon": [eski, yangi]} yoki yaratilgan qiymatlar
+
+    __table_args__ = (
+        # Bitta obyektning tarixi
+        Index("ix_audit_log_entity", "entity", "entity_id", "created_at"),
+        # Salon bo'yicha vaqt oralig'idagi o'zgarishlar
+        Index("ix_audit_log_tenant_created", "tenant_id", "created_at"),
+    )
@@ -0,0 +1,32 @@
+# Pydantic schemalari (so'rov va javoblar) - routerlar shu yerdan import qiladi.
+# List javoblar uchun TypeAdapter'lar modul yuklanganda bir marta quriladi.
+
+from app.schemas.common import Id, ORMModel, dump_json, json_response
+from app.schemas.clients import ClientCreate, ClientResponse, ClientRoleUpdate, client_list_adapter
+from app.schemas.salons import SalonCreate, SalonResponse, salon_list_adapter
+from app.schemas.categories import CategoryResponse, category_list_adapter
+from app.schemas.services import ServiceCreate, ServiceResponse, service_list_adapter
+from app.schemas.barbers import (
+    AvailableSlotResponse,
+    BarberCreate,
+    BarberResponse,
+    BarberScheduleResponse,
+    ScheduleEntry,
+    ScheduleOverrideResponse,
+    ScheduleOverrideUpdate,
+    TimeRange,
+    WorkingDay,
+    WorkingHoursResponse,
+    WorkingHoursUpdate,
+    available_slot_list_adapter,
+    barber_list_adapter,
+    schedule_list_adapter,
+)
+from app.schemas.appointments import AppointmentCreate, AppointmentResponse, appointment_list_adapter
+from app.schemas.banners import BannerResponse, banner_list_adapter
+from app.schemas.analytics import (
+    DailyMetricsResponse,
+    HourlyMetricsResponse,
+    daily_metrics_adapter,
+    hourly_metrics_adapter,
+)
@@ -0,0 +1,33 @@
+from datetime import date, datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, TypeAdapter
+
+
+# Kunlik ko'rsatkichlar (barber yoki kategoriya bo'yicha)
+class DailyMetricsResponse(BaseModel):
+    date: date
+    barber_id: Optional[int] = None
+    category_id: Optional[int] = None
+    total_count: int
+    completed_count: int
+    cancelled_count: int
+    no_show_count: int
+    no_show_rate: Optional[float] = None
+    revenue: float
+    booked_minutes: int
+    utilization: Optional[float] = None
+
+
+# Soatlik ko'rsatkichlar (bandlik xaritasi uchun)
+class HourlyMetricsResponse(BaseModel):
+    hour: datetime
+    total_count: int
+    completed_count: int
+    no_show_count: int
+    revenue: float
+    booked_minutes: int
+
+
+daily_metrics_adapter = TypeAdapter(List[DailyMetricsResponse])
+hourly_metrics_adapter = TypeAdapter(List[HourlyMetricsResponse])
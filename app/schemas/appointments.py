@@ -0,0 +1,48 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, TypeAdapter, model_validator
+
+from app.core.config import settings
+from app.schemas.common import Id, ORMModel
+
+
+# Buyurtma yaratish uchun schema
+# service_ids - to'plam: xizmatlar ketma-ket, bitta barberda bajariladi
+class AppointmentCreate(BaseModel):
+    service_id: Optional[Id] = None
+    service_ids: List[Id] = []
+    appointment_time: datetime
+    barber_id: Optional[Id] = None
+
+    @model_validator(mode="after")
+    def check_services(self):
+        if not self.service_ids:
+            if self.service_id is None:
+                raise ValueError("service_id yoki service_ids berilishi kerak")
+            self.service_ids = [self.service_id]
+        elif self.service_id is not None and self.service_id != self.service_ids[0]:
+            raise ValueError("service_id to'plamdagi birinchi xizmat bo'lishi kerak")
+        if len(set(self.service_ids)) != len(self.service_ids):
+            raise ValueError("Xizmatlar takrorlanmasligi kerak")
+        if len(self.service_ids) > settings.MAX_BUNDLE_SERVICES:
+            raise ValueError(f"Bitta buyurtmada ko'pi bilan {settings.MAX_BUNDLE_SERVICES} ta xizmat bo'lishi mumkin")
+        return self
+
+
+# Buyurtma ma'lumotlarini qaytarish uchun schema
+class AppointmentResponse(ORMModel):
+    id: int
+    tenant_id: int
+    user_id: int
+    service_id: int
+    service_ids: List[int]
+    barber_id: Optional[int] = None
+    appointment_time: datetime
+    duration_minutes: Optional[int] = None
+    total_price: Optional[float] = None
+    status: str
+    created_at: datetime
+
+
+appointment_list_adapter = TypeAdapter(List[AppointmentResponse])
@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import TypeAdapter
+
+from app.schemas.common import ORMModel
+
+
+# Banner ma'lumotlarini qaytarish uchun schema
+class BannerResponse(ORMModel):
+    id: int
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    is_active: bool
+    image_url: Optional[str] = None
+
+
+banner_list_adapter = TypeAdapter(List[BannerResponse])
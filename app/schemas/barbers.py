@@ -0,0 +1,100 @@
+from datetime import date, datetime, time
+from typing import Annotated, List, Optional
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+from app.schemas.common import Id, ORMModel
+
+
+# Barber yaratish uchun schema
+class BarberCreate(BaseModel):
+    full_name: str
+    phone: str
+    email: Optional[str] = None
+    bio: Optional[str] = None
+    experience: Optional[Annotated[int, Field(strict=True, ge=0)]] = None
+    rating: Optional[float] = None
+    category_id: Optional[Id] = None
+    image_url: Optional[str] = None
+
+
+# Barber ma'lumotlarini qaytarish uchun schema
+class BarberResponse(ORMModel):
+    id: int
+    full_name: str
+    phone: str
+    email: Optional[str] = None
+    bio: Optional[str] = None
+    experience: Optional[int] = None
+    rating: Optional[float] = None
+    category_id: Optional[int] = None
+    image_url: Optional[str] = None
+
+
+# Kunlik jadval elementi: buyurtma yoki bo'sh oraliq (type = "appointment" | "gap")
+class ScheduleEntry(BaseModel):
+    type: str
+    start: datetime
+    end: datetime
+    appointment_id: Optional[int] = None
+    status: Optional[str] = None
+    service_name: Optional[str] = None
+    duration: Optional[int] = None
+    client_name: Optional[str] = None
+
+
+# Barberning kunlik jadvali
+class BarberScheduleResponse(BaseModel):
+    barber_id: int
+    barber_name: str
+    date: date
+    timeline: List[ScheduleEntry]
+
+
+# Bo'sh vaqt (slot) - shu vaqtda xizmatni bajara oladigan barber
+class AvailableSlotResponse(BaseModel):
+    barber_id: int
+    barber_name: str
+    start: datetime
+    end: datetime
+
+
+# Ish vaqti oralig'i (end = 00:00 - kun oxiri)
+class TimeRange(BaseModel):
+    start: time
+    end: time
+
+
+# Hafta kunining ish vaqti (bir nechta oraliq - tanaffuslar bilan)
+class WorkingDay(BaseModel):
+    weekday: int = Field(strict=True, ge=0, le=6)  # 0 - dushanba, 6 - yakshanba
+    ranges: List[TimeRange]
+
+
+# Haftalik ish vaqti shablonini almashtirish uchun schema
+class WorkingHoursUpdate(BaseModel):
+    days: List[WorkingDay]
+
+
+# Aniq sana uchun istisno (dam olish kuni yoki boshqa ish vaqti)
+class ScheduleOverrideUpdate(BaseModel):
+    day_off: bool = False
+    ranges: List[TimeRange] = []
+
+
+class ScheduleOverrideResponse(BaseModel):
+    date: date
+    day_off: bool
+    ranges: List[TimeRange]
+
+
+# Barberning ish vaqti: shablon va kelgusi istisnolar
+class WorkingHoursResponse(BaseModel):
+    barber_id: int
+    days: List[WorkingDay]
+    overrides: List[ScheduleOverrideResponse]
+
+
+barber_list_adapter = TypeAdapter(List[BarberResponse])
+schedule_list_adapter = TypeAdapter(List[BarberScheduleResponse])
+available_slot_list_adapter = TypeAdapter(List[AvailableSlotResponse])
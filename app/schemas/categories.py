@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import TypeAdapter
+
+from app.schemas.common import ORMModel
+
+
+# Kategoriya ma'lumotlarini qaytarish uchun schema
+class CategoryResponse(ORMModel):
+    id: int
+    created_at: datetime
+    name: str
+    description: Optional[str]
+    image_url: Optional[str]
+    barber_count: int
+
+
+category_list_adapter = TypeAdapter(List[CategoryResponse])
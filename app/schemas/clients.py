@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, EmailStr, TypeAdapter, field_validator
+
+from app.schemas.common import ORMModel
+
+
+# Mijoz yaratish uchun schema
+class ClientCreate(BaseModel):
+    email: EmailStr
+    password: str
+    full_name: str
+
+    @field_validator("password")
+    @classmethod
+    def password_strength(cls, v: str) -> str:
+        if len(v) < 6:
+            raise ValueError("Parol kamida 6 ta belgidan iborat bo'lishi kerak")
+        return v
+
+
+# Mijoz rolini o'zgartirish uchun schema (None - oddiy mijoz)
+class ClientRoleUpdate(BaseModel):
+    role: Optional[str] = None
+
+
+# Mijoz ma'lumotlarini qaytarish uchun schema
+class ClientResponse(ORMModel):
+    id: int
+    created_at: datetime
+    email: str
+    full_name: str
+    role: Optional[str] = None
+
+
+client_list_adapter = TypeAdapter(List[ClientResponse])
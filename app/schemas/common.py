@@ -0,0 +1,24 @@
+from typing import Annotated, Any
+
+from fastapi.responses import Response
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+
+# So'rov tanasidagi id'lar qat'iy butun son: "5" yoki 5.0 moslashtirilmaydi,
+# pydantic-core tekshiruvi qisqa yo'ldan o'tadi va xato mijozga aniq qaytadi
+Id = Annotated[int, Field(strict=True, ge=1)]
+
+
+class ORMModel(BaseModel):
+    """ORM obyektlaridan to'ldiriladigan javob schemalari uchun asos"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+def dump_json(adapter: TypeAdapter, data: Any) -> bytes:
+    """ORM obyektlari yoki dict'lar -> JSON baytlar (tekshiruv va serializatsiya pydantic-core ichida)"""
+    return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+
+def json_response(adapter: TypeAdapter, data: Any, status_code: int = 200) -> Response:
+    """Tayyor JSON javob: FastAPI response_model orqali qayta tekshirish va jsonable_encoder chetlab o'tiladi"""
+    return Response(content=dump_json(adapter, data), media_type="application/json", status_code=status_code)
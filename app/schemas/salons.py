@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, TypeAdapter
+
+from app.schemas.common import ORMModel
+
+
+# Salon yaratish uchun schema
+class SalonCreate(BaseModel):
+    name: str
+    slug: str
+    address: Optional[str] = None
+
+
+# Salon ma'lumotlarini qaytarish uchun schema
+class SalonResponse(ORMModel):
+    id: int
+    name: str
+    slug: str
+    address: Optional[str] = None
+    is_active: bool
+    created_at: Optional[datetime] = None
+
+
+salon_list_adapter = TypeAdapter(List[SalonResponse])
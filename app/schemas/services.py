@@ -0,0 +1,27 @@
+from typing import Annotated, List, Optional
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+from app.schemas.common import Id, ORMModel
+
+
+# Xizmat yaratish uchun schema
+class ServiceCreate(BaseModel):
+    category_id: Id
+    name: str
+    description: Optional[str] = None
+    price: Annotated[float, Field(ge=0)]
+    duration: Annotated[int, Field(strict=True, gt=0)]  # Xizmat davomiyligi (minut)
+
+
+# Xizmat ma'lumotlarini qaytarish uchun schema
+class ServiceResponse(ORMModel):
+    id: int
+    category_id: int
+    name: str
+    description: Optional[str] = None
+    price: float
+    duration: int
+
+
+service_list_adapter = TypeAdapter(List[ServiceResponse])
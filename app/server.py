@@ -0,0 +1,61 @@
+import importlib.util
+import logging
+import os
+
+import uvicorn
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def worker_count() -> int:
+    """Workerlar soni: WEB_CONCURRENCY yoki CPU yadrolari soni"""
+    if settings.WEB_CONCURRENCY:
+        return settings.WEB_CONCURRENCY
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def server_options() -> dict:
+    """Production uchun uvicorn parametrlari"""
+    options = {
+        "host": settings.SERVER_HOST,
+        "port": settings.SERVER_PORT,
+        "workers": worker_count(),
+        # uvloop va httptools o'rnatilgan bo'lsa ishlatiladi
+        "loop": "uvloop" if _available("uvloop") else "asyncio",
+        "http": "httptools" if _available("httptools") else "h11",
+        "lifespan": "on",
+        # SIGTERM: yangi ulanishlar qabul qilinmaydi, joriy so'rovlar tugashi kutiladi,
+        # keyin lifespan shutdown (bazaga ulanishlar yopiladi)
+        "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_TIMEOUT,
+        "timeout_keep_alive": settings.SERVER_KEEPALIVE_TIMEOUT,
+        # Xotira sizib chiqishining oldini olish uchun workerni davriy qayta ishga tushirish
+        "limit_max_requests": settings.SERVER_MAX_REQUESTS or None,
+        # Workerlar bir vaqtda qayta ishga tushmasligi uchun tasodifiy qo'shimcha
+        "limit_max_requests_jitter": settings.SERVER_MAX_REQUESTS_JITTER,
+        "proxy_headers": True,
+        "forwarded_allow_ips": settings.TRUSTED_PROXIES,
+        "access_log": False,
+    }
+    return options
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    options = server_options()
+    logger.info(
+        "StyleHub API: %s worker, loop=%s, http=%s",
+        options["workers"], options["loop"], options["http"],
+    )
+    uvicorn.run("app.main:app", **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import heapq
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.models.models import Appointment, AppointmentStatus, Barber, Service, User
+from app.utils.timerange import in_range, local_day_range, salon_zone
+from app.utils.workhours import busy_masks, fit_mask, load_work_masks, lowest_minute, range_mask, step_mask
+
+# Buyurtma davomiyligi: to'plamlarda saqlangan yig'indi, eski buyurtmalarda xizmatniki
+APPOINTMENT_DURATION = func.coalesce(Appointment.duration_minutes, Service.duration)
+
+
+def build_timeline(day_start: datetime, day_end: datetime, appointments: List[dict]) -> List[dict]:
+    """Vaqt bo'yicha saralangan buyurtmalardan kunlik jadval (buyurtmalar + bo'sh oraliqlar)
+
+    Bitta o'tishda hisoblanadi: tugash vaqti appointment_time + duration.
+    """
+    timeline = []
+    cursor = day_start
+
+    for item in appointments:
+        start = item["start"]
+        end = start + timedelta(minutes=item["duration"])
+
+        if start > cursor:
+            timeline.append({"type": "gap", "start": cursor, "end": start})
+
+        timeline.append({**item, "type": "appointment", "end": end})
+        cursor = max(cursor, end)
+
+    if cursor < day_end:
+        timeline.append({"type": "gap", "start": cursor, "end": day_end})
+
+    return timeline
+
+
+async def load_schedules(
+    db,
+    tenant_id: int,
+    day: date,
+    barber_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+) -> List[dict]:
+    """Barber(lar)ning kunlik jadvali - bitta so'rov bilan
+
+    barbers LEFT JOIN appointments (barber_id, appointment_time indeksi bo'yicha oraliq)
+    LEFT JOIN services, clients. Buyurtmasi yo'q barberlar ham natijaga kiradi.
+    Kun va jadvaldagi vaqtlar salonning mahalliy vaqtida.
+    """
+    zone = salon_zone(tenant_id)
+    day_start, day_end = local_day_range(day, zone)
+
+    query = (
+        select(
+            Barber.id.label("barber_id"),
+            Barber.full_name.label("barber_name"),
+            Appointment.id.label("appointment_id"),
+            Appointment.appointment_time,
+            Appointment.status,
+            Service.name.label("service_name"),
+            APPOINTMENT_DURATION.label("duration"),
+            User.full_name.label("client_name"),
+        )
+        .outerjoin(
+            Appointment,
+            and_(
+                Appointment.barber_id == Barber.id,
+                in_range(Appointment.appointment_time, day_start, day_end),
+                Appointment.status != AppointmentStatus.cancelled,
+            ),
+        )
+        .outerjoin(Service, Service.id == Appointment.service_id)
+        .outerjoin(User, User.id == Appointment.user_id)
+        .where(Barber.tenant_id == tenant_id, Barber.deleted_at.is_(None))
+        .order_by(Barber.id, Appointment.appointment_time)
+    )
+
+    if barber_id is not None:
+        query = query.where(Barber.id == barber_id)
+    if category_id is not None:
+        query = query.where(Barber.category_id == category_id)
+
+    result = await db.execute(query)
+
+    schedules: Dict[int, dict] = {}
+    appointments: Dict[int, list] = {}
+    for row in result.all():
+        if row.barber_id not in schedules:
+            schedules[row.barber_id] = {
+                "barber_id": row.barber_id,
+                "barber_name": row.barber_name,
+                "date": day,
+            }
+            appointments[row.barber_id] = []
+
+        if row.appointment_id is not None:
+            appointments[row.barber_id].append({
+                "appointment_id": row.appointment_id,
+                "start": row.appointment_time.astimezone(zone),
+                "duration": row.duration,
+                "status": row.status,
+                "service_name": row.service_name,
+                "client_name": row.client_name,
+            })
+
+    for barber_id, schedule in schedules.items():
+        schedule["timeline"] = build_timeline(day_start, day_end, appointments[barber_id])
+
+    return list(schedules.values())
+
+
+def find_earliest_slots(
+    busy: Dict[int, List[Tuple[datetime, datetime]]],
+    work_masks: Dict[int, Dict[date, int]],
+    window_start: datetime,
+    window_end: datetime,
+    duration: int,
+    step: int,
+    limit: int,
+) -> List[Tuple[datetime, int]]:
+    """Har bir barber uchun eng erta bo'sh vaqt, umumiy eng erta limit tasini qaytarish
+
+    busy - barber_id -> band oraliqlar, work_masks - barber_id -> kun -> ish vaqti
+    bitmap'i (app/utils/workhours.py). Kunlik bo'sh vaqt bitwise hisoblanadi:
+    ish vaqti & ~band & oyna, keyin fit_mask bilan davomiylikka sig'adigan
+    boshlanishlar va step_mask bilan qadamga to'g'ri keladiganlari olinadi.
+
+    Heap'da (nomzod vaqt, barber_id, kun indeksi, hisoblanganmi) saqlanadi:
+    kun faqat heap'ning boshiga chiqqanda hisoblanadi, shuning uchun natijaga
+    kirmaydigan barberlarning keyingi kunlari umuman ko'rib chiqilmaydi.
+    Oyna salon zonasida beriladi: kunlar va minutlar mahalliy vaqt bo'yicha.
+    """
+    zone = window_start.tzinfo
+    first_day = window_start.date()
+    days = []
+    day = first_day
+    while datetime.combine(day, time(), zone) < window_end:
+        days.append(day)
+        day += timedelta(days=1)
+
+    heap = [(window_start, barber_id, 0, False) for barber_id in busy]
+    heapq.heapify(heap)
+    starts = step_mask(step)
+    busy_by_day: Dict[int, Dict[date, int]] = {}
+    slots = []
+
+    while heap and len(slots) < limit:
+        candidate, barber_id, index, evaluated = heapq.heappop(heap)
+        if evaluated:
+            slots.append((candidate, barber_id))
+            continue
+
+        day = days[index]
+        day_start = datetime.combine(day, time(), zone)
+        window = range_mask(
+            int((window_start - day_start).total_seconds() // 60),
+            int((window_end - day_start).total_seconds() // 60),
+        )
+        if barber_id not in busy_by_day:
+            busy_by_day[barber_id] = busy_masks(busy[barber_id])
+        free = work_masks[barber_id].get(day, 0) & window & ~busy_by_day[barber_id].get(day, 0)
+        minute = lowest_minute(fit_mask(free, duration) & starts)
+
+        if minute is not None:
+            heapq.heappush(heap, (day_start + timedelta(minutes=minute), barber_id, index, True))
+        elif index + 1 < len(days):
+            next_day = days[index + 1]
+            heapq.heappush(heap, (datetime.combine(next_day, time(), zone), barber_id, index + 1, False))
+
+    return slots
+
+
+async def load_busy_intervals(
+    db,
+    tenant_id: int,
+    category_id: int,
+    window_start: datetime,
+    window_end: datetime,
+    max_duration: timedelta,
+) -> Tuple[Dict[int, str], Dict[int, List[Tuple[datetime, datetime]]]]:
+    """Kategoriyadagi barberlar va ularning band oraliqlari - bitta so'rov bilan
+
+    Oyna boshlanishidan oldin boshlanib, oyna ichiga cho'zilgan buyurtmalar ham
+    hisobga olinishi uchun pastki chegara max_duration ga kengaytiriladi
+    (shart appointment_time bo'yicha indeksdan foydalanish imkonini saqlaydi).
+    Band oraliqlar oyna zonasida (salonning mahalliy vaqtida) qaytariladi.
+    """
+    zone = window_start.tzinfo
+    query = (
+        select(
+            Barber.id.label("barber_id"),
+            Barber.full_name,
+            Appointment.appointment_time,
+            APPOINTMENT_DURATION.label("duration"),
+        )
+        .outerjoin(
+            Appointment,
+            and_(
+                Appointment.barber_id == Barber.id,
+                in_range(Appointment.appointment_time, window_start - max_duration, window_end),
+                Appointment.status != AppointmentStatus.cancelled,
+            ),
+        )
+        .outerjoin(Service, Service.id == Appointment.service_id)
+        .where(
+            Barber.tenant_id == tenant_id,
+            Barber.category_id == category_id,
+            Barber.deleted_at.is_(None),
+        )
+        .order_by(Barber.id, Appointment.appointment_time)
+    )
+
+    result = await db.execute(query)
+
+    names: Dict[int, str] = {}
+    busy: Dict[int, List[Tuple[datetime, datetime]]] = {}
+    for row in result.all():
+        if row.barber_id not in names:
+            names[row.barber_id] = row.full_name
+            busy[row.barber_id] = []
+        if row.appointment_time is not None:
+            start = row.appointment_time.astimezone(zone)
+            busy[row.barber_id].append((start, start + timedelta(minutes=row.duration)))
+
+    return names, busy
+
+
+async def check_barber_slot(db, tenant_id: int, barber_id: int, start: datetime, duration: int) -> Optional[str]:
+    """Barberning [start, start + duration) oralig'ini bron qilish mumkinligini tekshirish
+
+    Natija: None - bo'sh, "off" - ish vaqtidan tashqarida, "busy" - boshqa
+    buyurtma bilan kesishadi. Band oraliqlar bitta so'rov bilan olinadi.
+    start salon zonasida bo'lishi kerak (ish vaqti mahalliy kunlar bo'yicha).
+    """
+    end = start + timedelta(minutes=duration)
+    needed = busy_masks([(start, end)])
+
+    work_masks = await load_work_masks(db, tenant_id, [barber_id], min(needed), max(needed))
+    for day, mask in needed.items():
+        if mask & ~work_masks[barber_id][day]:
+            return "off"
+
+    query = (
+        select(Appointment.appointment_time, APPOINTMENT_DURATION.label("duration"))
+        .outerjoin(Service, Service.id == Appointment.service_id)
+        .where(
+            Appointment.barber_id == barber_id,
+            in_range(Appointment.appointment_time, start - timedelta(minutes=settings.MAX_SERVICE_MINUTES), end),
+            Appointment.status != AppointmentStatus.cancelled,
+        )
+    )
+    result = await db.execute(query)
+    for row in result.all():
+        if row.appointment_time + timedelta(minutes=row.duration) > start:
+            return "busy"
+
+    return None
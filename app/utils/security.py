@@ -1,17 +1,22 @@
-import bcrypt
+import uuid
 from typing import Optional
-from datetime import datetime, timedelta
-from jose import JWTError, jwt
+from datetime import timedelta
 
 from app.core.config import settings
+from app.core.tokens import TokenError, key_ring
+from app.utils.timerange import utc_now
 
 def get_password_hash(password: str) -> str:
     """Parolni hashlash"""
+    import bcrypt  # Faqat login/ro'yxatdan o'tishda kerak - ishga tushish vaqtida yuklanmaydi
+
     salt = bcrypt.gensalt(rounds=settings.PWD_SALT_ROUNDS)
     return bcrypt.hashpw(password.encode(), salt).decode()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Parolni tekshirish"""
+    import bcrypt
+
     return bcrypt.checkpw(
         plain_password.encode(),
         hashed_password.encode()
@@ -22,26 +27,32 @@ def create_token(data: dict, expires_delta: Optional[timedelta] = None, is_refre
     to_encode = data.copy()
     
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = utc_now() + expires_delta
     else:
         if is_refresh:
-            expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+            expire = utc_now() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
         else:
-            expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+            expire = utc_now() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({
         "exp": expire,
+        "jti": uuid.uuid4().hex,
         "type": "refresh" if is_refresh else "access"
     })
     
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return key_ring.encode(to_encode)
+
+def new_token_family() -> str:
+    """Yangi refresh token oilasi ID si (har bir login uchun)"""
+    return uuid.uuid4().hex
 
 def verify_token(token: str, is_refresh: bool = False) -> dict:
     """Tokenni tekshirish va payload qaytarish"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        if payload.get("type") != ("refresh" if is_refresh else "access"):
-            raise JWTError("Invalid token type")
-        return payload
-    except JWTError:
-        return None
\ No newline at end of file
+        payload = key_ring.decode(token)
+    except TokenError:
+        return None
+
+    if payload.get("type") != ("refresh" if is_refresh else "access"):
+        return None
+    return payload
\ No newline at end of file
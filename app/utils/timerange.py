@@ -0,0 +1,98 @@
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import and_
+
+from app.core.config import settings
+
+# Bazada barcha vaqtlar UTC da (app/db/types.py: UTCDateTime). "Bugun", "shu hafta",
+# ish vaqti va kunlik jadval esa salonning mahalliy vaqtida hisoblanadi: mahalliy
+# kun chegaralari UTC oniylariga aylantiriladi va ustunning o'zi bilan solishtiriladi
+# (column >= start AND column < end), shuning uchun indeks bo'yicha oraliq
+# qidiruvi ishlaydi. Ustunga funksiya qo'llash (date(), AT TIME ZONE) har bir
+# qatorda hisoblanadi va indeksdan foydalanishga to'sqinlik qiladi.
+UTC = timezone.utc
+
+
+def utc_now() -> datetime:
+    """Joriy vaqt (timezone-aware, UTC)"""
+    return datetime.now(UTC)
+
+
+def salon_zone(tenant_id: int) -> tzinfo:
+    """Salonning vaqt zonasi (SALON_TIMEZONES, bo'lmasa DEFAULT_TIMEZONE)"""
+    # ZoneInfo obyektlari modul ichida keshlanadi
+    return ZoneInfo(settings.SALON_TIMEZONES.get(tenant_id, settings.DEFAULT_TIMEZONE))
+
+
+def localize(value: datetime, zone: tzinfo) -> datetime:
+    """Salon vaqtiga o'tkazish: zonasiz qiymat salonning mahalliy vaqti deb hisoblanadi"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=zone)
+    return value.astimezone(zone)
+
+
+def local_today(zone: tzinfo, now: Optional[datetime] = None) -> date:
+    """Salondagi bugungi sana"""
+    return (now or utc_now()).astimezone(zone).date()
+
+
+def local_day_range(day: date, zone: tzinfo) -> Tuple[datetime, datetime]:
+    """Mahalliy kunning [start, end) chegaralari (aware, salon zonasida)
+
+    Chegaralar alohida hisoblanadi, shuning uchun yozgi vaqtga o'tish kunlari
+    23 yoki 25 soat bo'ladi.
+    """
+    return (
+        datetime.combine(day, time(), zone),
+        datetime.combine(day + timedelta(days=1), time(), zone),
+    )
+
+
+def local_days_range(first_day: date, last_day: date, zone: tzinfo) -> Tuple[datetime, datetime]:
+    """[first_day, last_day] mahalliy kunlarini qoplaydigan [start, end) oraliq"""
+    return local_day_range(first_day, zone)[0], local_day_range(last_day, zone)[1]
+
+
+def today_range(zone: tzinfo, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """Salondagi bugungi kun"""
+    return local_day_range(local_today(zone, now), zone)
+
+
+def week_range(zone: tzinfo, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """Salondagi joriy hafta (dushanbadan)"""
+    today = local_today(zone, now)
+    monday = today - timedelta(days=today.weekday())
+    return local_days_range(monday, monday + timedelta(days=6), zone)
+
+
+def month_start(value: date) -> date:
+    """Oyning birinchi kuni"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    """Sanaga oylar qo'shish (natija har doim oyning birinchi kuni)"""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def appointment_window(now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """Buyurtma vaqti uchun ruxsat etilgan [start, end) oraliq (UTC)
+
+    appointments oylik partitsiyalarga bo'lingan (app/workers/partitions.py):
+    APPOINTMENT_HOT_MONTHS oydan eskilari arxivlanadi, joriy oydan keyin
+    APPOINTMENT_PARTITION_MONTHS_AHEAD oy oldindan yaratiladi. Bu oraliqdan
+    tashqaridagi vaqt uchun partitsiya yo'q - INSERT xato beradi.
+    """
+    first = month_start((now or utc_now()).astimezone(UTC).date())
+    return (
+        datetime.combine(add_months(first, -settings.APPOINTMENT_HOT_MONTHS), time(), UTC),
+        datetime.combine(add_months(first, settings.APPOINTMENT_PARTITION_MONTHS_AHEAD + 1), time(), UTC),
+    )
+
+
+def in_range(column, start: datetime, end: datetime):
+    """Indeksdan foydalanadigan (sargable) yarim ochiq oraliq sharti: start <= column < end"""
+    return and_(column >= start, column < end)
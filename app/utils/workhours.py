@@ -0,0 +1,217 @@
+import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.models.models import BarberScheduleOverride, BarberWorkingHours
+
+# Kun 1440 ta minutdan iborat: i-bit = 00:00 dan keyingi i-minut.
+# Python int ixtiyoriy uzunlikda, shuning uchun bitta kun - bitta butun son
+# va kesishish/birlashtirish oddiy bitwise amallar (&, |, ~, >>) bilan bajariladi.
+MINUTES_PER_DAY = 24 * 60
+
+
+def range_mask(start_minute: int, end_minute: int) -> int:
+    """[start, end) minutlar oralig'i uchun bitmap"""
+    start_minute = max(0, start_minute)
+    end_minute = min(MINUTES_PER_DAY, end_minute)
+    if end_minute <= start_minute:
+        return 0
+    return ((1 << (end_minute - start_minute)) - 1) << start_minute
+
+
+def ranges_mask(ranges: Iterable[Tuple[int, int]]) -> int:
+    mask = 0
+    for start_minute, end_minute in ranges:
+        mask |= range_mask(start_minute, end_minute)
+    return mask
+
+
+def fit_mask(free: int, duration: int) -> int:
+    """i-bit o'rnatilgan, agar [i, i + duration) minutlarning barchasi bo'sh bo'lsa
+
+    Siljitib-ikkilantirish: har qadamda qoplangan uzunlik ikki barobar oshadi,
+    shuning uchun log2(duration) ta bitwise amal yetarli.
+    """
+    if duration <= 0:
+        return free
+    result = free
+    width = 1
+    while width < duration:
+        shift = min(width, duration - width)
+        result &= result >> shift
+        width += shift
+    return result
+
+
+@lru_cache(maxsize=32)
+def step_mask(step: int) -> int:
+    """Slot boshlanishi mumkin bo'lgan minutlar (00:00 dan har step minutda)"""
+    mask = 0
+    for minute in range(0, MINUTES_PER_DAY, step):
+        mask |= 1 << minute
+    return mask
+
+
+def lowest_minute(mask: int) -> Optional[int]:
+    """Eng kichik o'rnatilgan bit (eng erta minut)"""
+    if not mask:
+        return None
+    return (mask & -mask).bit_length() - 1
+
+
+def mask_ranges(mask: int) -> List[Tuple[int, int]]:
+    """Bitmap'ni [start, end) oraliqlar ro'yxatiga qaytarish (API javoblari uchun)"""
+    ranges = []
+    offset = 0
+    while mask:
+        # Keyingi 1 lar ketma-ketligining boshi va uzunligi
+        skip = lowest_minute(mask)
+        mask >>= skip
+        offset += skip
+        length = lowest_minute(~mask)
+        ranges.append((offset, offset + length))
+        mask >>= length
+        offset += length
+    return ranges
+
+
+def parse_hours(value: str) -> List[Tuple[int, int]]:
+    """'09:00-13:00,14:00-19:00' ko'rinishidagi qatorni minutlar oralig'iga aylantirish"""
+    ranges = []
+    for part in value.split(","):
+        if not part.strip():
+            continue
+        start, _, end = part.strip().partition("-")
+        start_hour, start_minute = (int(x) for x in start.split(":"))
+        end_hour, end_minute = (int(x) for x in end.split(":"))
+        ranges.append((start_hour * 60 + start_minute, end_hour * 60 + end_minute))
+    return ranges
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+class WorkingHoursCache:
+    """Salon-barber-hafta bo'yicha kunlik ish vaqti bitmap'lari keshi
+
+    Jadval o'zgartirilganda (API orqali) shu worker keshi darhol tozalanadi,
+    boshqa workerlarda yozuvlar ttl o'tgach yangilanadi.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._weeks: Dict[Tuple[int, int, date], Tuple[float, List[int]]] = {}
+
+    def get(self, tenant_id: int, barber_id: int, monday: date) -> Optional[List[int]]:
+        entry = self._weeks.get((tenant_id, barber_id, monday))
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, tenant_id: int, barber_id: int, monday: date, masks: List[int]):
+        if len(self._weeks) >= self.max_entries:
+            self._weeks.clear()
+        self._weeks[(tenant_id, barber_id, monday)] = (time.monotonic() + self.ttl, masks)
+
+    def invalidate(self, tenant_id: int, barber_id: int):
+        for key in [key for key in self._weeks if key[:2] == (tenant_id, barber_id)]:
+            del self._weeks[key]
+
+
+working_hours_cache = WorkingHoursCache(ttl=settings.WORKING_HOURS_CACHE_SECONDS)
+
+
+async def load_work_masks(
+    db, tenant_id: int, barber_ids: Iterable[int], first_day: date, last_day: date
+) -> Dict[int, Dict[date, int]]:
+    """Barberlarning [first_day, last_day] kunlaridagi ish vaqti bitmap'lari
+
+    Keshda yo'q haftalar uchun shablon va istisnolar ikki so'rov bilan
+    (barcha barberlar uchun birga) yuklanadi. Shabloni umuman yo'q barber
+    DEFAULT_WORKING_HOURS bo'yicha ishlaydi deb hisoblanadi.
+    """
+    barber_ids = list(barber_ids)
+    mondays = []
+    monday = week_start(first_day)
+    while monday <= last_day:
+        mondays.append(monday)
+        monday += timedelta(days=7)
+
+    weeks: Dict[int, Dict[date, List[int]]] = {barber_id: {} for barber_id in barber_ids}
+    missing = set()
+    for barber_id in barber_ids:
+        for monday in mondays:
+            masks = working_hours_cache.get(tenant_id, barber_id, monday)
+            if masks is None:
+                missing.add(barber_id)
+            else:
+                weeks[barber_id][monday] = masks
+
+    if missing:
+        templates: Dict[int, List[int]] = {}
+        query = select(BarberWorkingHours).where(BarberWorkingHours.barber_id.in_(missing))
+        for row in (await db.execute(query)).scalars().all():
+            days = templates.setdefault(row.barber_id, [0] * 7)
+            days[row.weekday] |= range_mask(row.start_minute, row.end_minute)
+
+        overrides: Dict[Tuple[int, date], int] = {}
+        query = select(BarberScheduleOverride).where(
+            BarberScheduleOverride.barber_id.in_(missing),
+            BarberScheduleOverride.date >= mondays[0],
+            BarberScheduleOverride.date < mondays[-1] + timedelta(days=7),
+        )
+        for row in (await db.execute(query)).scalars().all():
+            key = (row.barber_id, row.date)
+            overrides.setdefault(key, 0)
+            if not row.is_day_off:
+                overrides[key] |= range_mask(row.start_minute, row.end_minute)
+
+        default_day = ranges_mask(parse_hours(settings.DEFAULT_WORKING_HOURS))
+        for barber_id in missing:
+            template = templates.get(barber_id, [default_day] * 7)
+            for monday in mondays:
+                if monday in weeks[barber_id]:
+                    continue
+                masks = []
+                for offset in range(7):
+                    day = monday + timedelta(days=offset)
+                    masks.append(overrides.get((barber_id, day), template[offset]))
+                working_hours_cache.put(tenant_id, barber_id, monday, masks)
+                weeks[barber_id][monday] = masks
+
+    result: Dict[int, Dict[date, int]] = {}
+    for barber_id in barber_ids:
+        days = {}
+        day = first_day
+        while day <= last_day:
+            days[day] = weeks[barber_id][week_start(day)][day.weekday()]
+            day += timedelta(days=1)
+        result[barber_id] = days
+    return result
+
+
+def busy_masks(intervals: Iterable[Tuple[datetime, datetime]]) -> Dict[date, int]:
+    """Band oraliqlarni kunlik bitmap'larga aylantirish (bitta o'tishda)
+
+    Yarim tundan o'tgan oraliq keyingi kunning bitmap'iga ham tushadi.
+    Tugash vaqti minut ichida bo'lsa, shu minut ham band hisoblanadi.
+    """
+    masks: Dict[date, int] = {}
+    for start, end in intervals:
+        day = start.date()
+        start_minute = start.hour * 60 + start.minute
+        end_minute = start_minute - int(-(end - start).total_seconds() // 60)
+        while True:
+            masks[day] = masks.get(day, 0) | range_mask(start_minute, end_minute)
+            if end_minute <= MINUTES_PER_DAY:
+                break
+            day += timedelta(days=1)
+            start_minute = 0
+            end_minute -= MINUTES_PER_DAY
+    return masks
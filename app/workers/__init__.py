@@ -0,0 +1,2 @@
+# Background workers package
+# Fon rejimida ishlaydigan vazifalar (eslatmalar va boshqalar)
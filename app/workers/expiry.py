@@ -0,0 +1,92 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.models import Appointment, AppointmentStatus
+from app.utils.timerange import utc_now
+
+logger = logging.getLogger(__name__)
+
+
+async def expire_pending_batch(db, cutoff: datetime, limit: int) -> List[int]:
+    """Bitta partiya muddati o'tgan pending buyurtmalarni bekor qilish
+
+    Qatorlar ix_appointments_pending_created indeksi orqali tanlanadi,
+    boshqa tranzaksiya qulflagan qatorlar o'tkazib yuboriladi.
+    Tranzaksiya faqat shu partiya uchun ochiladi va darhol yopiladi.
+    """
+    stale = (
+        select(Appointment.id)
+        .where(
+            Appointment.status == AppointmentStatus.pending,
+            Appointment.created_at < cutoff,
+        )
+        .order_by(Appointment.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+    query = (
+        update(Appointment)
+        .where(
+            Appointment.id.in_(stale.scalar_subquery()),
+            Appointment.status == AppointmentStatus.pending,
+        )
+        .values(status=AppointmentStatus.cancelled)
+        .returning(Appointment.id)
+        .execution_options(synchronize_session=False)
+    )
+
+    result = await db.execute(query)
+    expired = list(result.scalars().all())
+    await db.commit()
+
+    return expired
+
+
+async def expire_pending_appointments(
+    session_factory=SessionLocal,
+    now: Optional[datetime] = None,
+) -> int:
+    """Barcha muddati o'tgan pending buyurtmalarni partiyalab bekor qilish"""
+    now = now or utc_now()
+    cutoff = now - timedelta(minutes=settings.PENDING_HOLD_MINUTES)
+    total = 0
+
+    async with session_factory() as db:
+        while True:
+            expired = await expire_pending_batch(db, cutoff, settings.EXPIRY_BATCH_SIZE)
+            total += len(expired)
+
+            if len(expired) < settings.EXPIRY_BATCH_SIZE:
+                break
+
+            # Qulflarni boshqa so'rovlarga bo'shatib berish uchun qisqa tanaffus
+            await asyncio.sleep(settings.EXPIRY_BATCH_PAUSE_SECONDS)
+
+    if total:
+        logger.info("%s ta pending buyurtma bekor qilindi", total)
+
+    return total
+
+
+async def run_expiry_worker(session_factory=SessionLocal) -> None:
+    """Pending buyurtmalarni davriy ravishda tozalab turish"""
+    while True:
+        try:
+            await expire_pending_appointments(session_factory)
+        except Exception:
+            logger.exception("Pending buyurtmalarni bekor qilishda xatolik")
+
+        await asyncio.sleep(settings.EXPIRY_POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_expiry_worker())
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import re
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db import database
+from app.utils.timerange import add_months, month_start, utc_now
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "appointments"
+PARTITION_NAME = re.compile(r"^appointments_p(\d{4})(\d{2})$")
+SERVICES_TABLE = "appointment_services"
+
+
+def partition_name(month: date) -> str:
+    """Oy uchun partitsiya nomi, masalan appointments_p202610"""
+    return f"{PARENT_TABLE}_p{month.year:04d}{month.month:02d}"
+
+
+async def list_partitions(conn) -> List[str]:
+    """Asosiy jadvalga ulangan partitsiyalar ro'yxati"""
+    result = await conn.execute(text("""
+        SELECT child.relname
+          FROM pg_inherits
+          JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+          JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+         WHERE parent.relname = :parent
+    """), {"parent": PARENT_TABLE})
+    return [row[0] for row in result.all()]
+
+
+async def ensure_future_partitions(conn, today: date, months_ahead: int) -> List[str]:
+    """Joriy oy va keyingi months_ahead oy uchun partitsiyalar mavjudligini ta'minlash"""
+    created = []
+    existing = set(await list_partitions(conn))
+    first = month_start(today)
+
+    for offset in range(months_ahead + 1):
+        start = add_months(first, offset)
+        name = partition_name(start)
+        if name in existing:
+            continue
+
+        # appointment_time - timestamptz: chegaralar sessiya zonasiga bog'liq bo'lmasligi uchun UTC da
+        await conn.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {PARENT_TABLE} '
+            f"FOR VALUES FROM ('{start.isoformat()} 00:00+00') TO ('{add_months(start, 1).isoformat()} 00:00+00')"
+        ))
+        created.append(name)
+
+    return created
+
+
+async def archive_old_partitions(conn, today: date, hot_months: int) -> List[str]:
+    """Eski partitsiyalarni asosiy jadvaldan ajratib, arxiv sxemasiga ko'chirish
+
+    Ajratilgan partitsiyalar appointments so'rovlarida umuman ko'rinmaydi,
+    shuning uchun "so'nggi buyurtmalar" so'rovlari faqat issiq oylarni o'qiydi.
+    Ularning xizmat qatorlari (appointment_services) ham arxiv sxemasidagi shu
+    nomli jadvalga ko'chiriladi. DETACH ... CONCURRENTLY tranzaksiyadan tashqarida
+    (AUTOCOMMIT) bajarilishi kerak.
+    """
+    cutoff = add_months(month_start(today), -hot_months)
+    schema = settings.APPOINTMENT_ARCHIVE_SCHEMA
+    tablespace = settings.APPOINTMENT_ARCHIVE_TABLESPACE
+    archived = []
+
+    await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+    await conn.execute(text(
+        f'CREATE TABLE IF NOT EXISTS "{schema}".{SERVICES_TABLE} '
+        f"(LIKE {SERVICES_TABLE} INCLUDING DEFAULTS INCLUDING INDEXES)"
+        + (f' TABLESPACE "{tablespace}"' if tablespace else "")
+    ))
+
+    for name in sorted(await list_partitions(conn)):
+        match = PARTITION_NAME.match(name)
+        if not match:
+            continue
+
+        start = date(int(match.group(1)), int(match.group(2)), 1)
+        if add_months(start, 1) > cutoff:
+            continue
+
+        await conn.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}" CONCURRENTLY'))
+        await conn.execute(text(f'ALTER TABLE "{name}" SET SCHEMA "{schema}"'))
+        if tablespace:
+            # Sovuq ma'lumotlarni arzonroq diskka ko'chirish
+            await conn.execute(text(f'ALTER TABLE "{schema}"."{name}" SET TABLESPACE "{tablespace}"'))
+
+        # Bitta so'rov (AUTOCOMMIT da ham atomar): qatorlar o'chiriladi va arxivga yoziladi
+        await conn.execute(text(f"""
+            WITH moved AS (
+                DELETE FROM {SERVICES_TABLE}
+                 WHERE appointment_id IN (SELECT id FROM "{schema}"."{name}")
+             RETURNING *
+            )
+            INSERT INTO "{schema}".{SERVICES_TABLE} SELECT * FROM moved
+        """))
+
+        archived.append(name)
+
+    return archived
+
+
+async def maintain_partitions(db_engine=None, today: Optional[date] = None) -> None:
+    """Kelajak partitsiyalarini yaratish va eskilarini arxivlash"""
+    db_engine = db_engine or database.engine
+    if db_engine.dialect.name != "postgresql":
+        logger.info("Partitsiyalar faqat PostgreSQL uchun qo'llab-quvvatlanadi")
+        return
+
+    today = today or utc_now().date()
+
+    async with db_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+        created = await ensure_future_partitions(conn, today, settings.APPOINTMENT_PARTITION_MONTHS_AHEAD)
+        archived = await archive_old_partitions(conn, today, settings.APPOINTMENT_HOT_MONTHS)
+
+    if created:
+        logger.info("Yangi partitsiyalar: %s", ", ".join(created))
+    if archived:
+        logger.info("Arxivlangan partitsiyalar: %s", ", ".join(archived))
+
+
+async def run_partition_worker(db_engine=None) -> None:
+    """Partitsiyalarni davriy ravishda boshqarib turish"""
+    while True:
+        try:
+            await maintain_partitions(db_engine)
+        except Exception:
+            logger.exception("Partitsiyalarni boshqarishda xatolik")
+
+        await asyncio.sleep(settings.PARTITION_MAINTENANCE_HOURS * 60 * 60)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_partition_worker())
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.models import Appointment, AppointmentStatus, User
+from app.utils.timerange import utc_now
+
+logger = logging.getLogger(__name__)
+
+# Yetkazish "kamida bir marta": eslatma egallanadi (reminder_claimed_at - ijara),
+# reminder_sent_at esa faqat muvaffaqiyatli yuborilgandan keyin yoziladi. Worker
+# yuborish paytida to'xtasa (deploy, OOM), ijara REMINDER_LEASE_MINUTES dan keyin
+# tugaydi va eslatmani boshqa worker oladi. Yuborilib, belgilanmay qolgan
+# eslatma qayta yuborilishi mumkin
+
+# Eslatma yuboriladigan statuslar
+REMINDABLE_STATUSES = (AppointmentStatus.pending, AppointmentStatus.confirmed)
+
+
+@dataclass
+class Reminder:
+    """Yuborilishi kerak bo'lgan bitta eslatma"""
+    appointment_id: int
+    user_id: int
+    email: str
+    phone: Optional[str]
+    full_name: str
+    appointment_time: datetime
+
+
+class ReminderSender:
+    """Eslatma yuboruvchi uchun asosiy interfeys (SMS, push, email va h.k.)"""
+
+    async def send(self, reminder: Reminder) -> None:
+        raise NotImplementedError
+
+
+class LogReminderSender(ReminderSender):
+    """Eslatmani faqat logga yozadigan lokal yuboruvchi"""
+
+    async def send(self, reminder: Reminder) -> None:
+        logger.info(
+            "Eslatma: buyurtma #%s, mijoz %s (%s), vaqt %s",
+            reminder.appointment_id,
+            reminder.full_name,
+            reminder.email,
+            reminder.appointment_time.isoformat(),
+        )
+
+
+async def claim_due_reminders(db, now: datetime, limit: int) -> List[Reminder]:
+    """Vaqti kelgan eslatmalarni egallash (SKIP LOCKED bilan)
+
+    Qidiruv faqat [now, now + lead) oralig'ida ishlaydi va
+    ix_appointments_reminder_due qisman indeksidan foydalanadi.
+    Boshqa worker egallab turgan qatorlar o'tkazib yuboriladi, muddati
+    o'tgan ijaralar esa qayta egallanadi.
+    """
+    lease_expired = now - timedelta(minutes=settings.REMINDER_LEASE_MINUTES)
+    due = (
+        select(Appointment.id)
+        .where(
+            Appointment.reminder_sent_at.is_(None),
+            or_(Appointment.reminder_claimed_at.is_(None), Appointment.reminder_claimed_at < lease_expired),
+            Appointment.appointment_time >= now,
+            Appointment.appointment_time < now + timedelta(minutes=settings.REMINDER_LEAD_MINUTES),
+            Appointment.status.in_(REMINDABLE_STATUSES),
+        )
+        .order_by(Appointment.appointment_time)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+    query = (
+        update(Appointment)
+        .where(Appointment.id.in_(due.scalar_subquery()))
+        .values(reminder_claimed_at=now)
+        .returning(Appointment.id, Appointment.user_id, Appointment.appointment_time)
+        .execution_options(synchronize_session=False)
+    )
+
+    result = await db.execute(query)
+    claimed = result.all()
+    await db.commit()
+
+    if not claimed:
+        return []
+
+    # Mijoz kontaktlarini bitta so'rov bilan olish
+    user_ids = {row.user_id for row in claimed}
+    result = await db.execute(
+        select(User.id, User.email, User.phone, User.full_name).where(User.id.in_(user_ids))
+    )
+    users = {row.id: row for row in result.all()}
+
+    reminders = []
+    for row in claimed:
+        user = users[row.user_id]
+        reminders.append(Reminder(
+            appointment_id=row.id,
+            user_id=row.user_id,
+            email=user.email,
+            phone=user.phone,
+            full_name=user.full_name,
+            appointment_time=row.appointment_time,
+        ))
+
+    return reminders
+
+
+async def mark_reminders_sent(db, appointment_ids: List[int], sent_at: datetime) -> None:
+    """Yuborilgan eslatmalarni belgilash (ijara yakunlanadi)"""
+    if not appointment_ids:
+        return
+
+    await db.execute(
+        update(Appointment)
+        .where(Appointment.id.in_(appointment_ids))
+        .values(reminder_sent_at=sent_at)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def release_reminders(db, appointment_ids: List[int]) -> None:
+    """Yuborilmagan eslatmalarni ijara tugashini kutmasdan navbatga qaytarish"""
+    if not appointment_ids:
+        return
+
+    await db.execute(
+        update(Appointment)
+        .where(Appointment.id.in_(appointment_ids))
+        .values(reminder_claimed_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def process_due_reminders(
+    sender: ReminderSender,
+    session_factory=SessionLocal,
+    now: Optional[datetime] = None,
+) -> int:
+    """Bitta partiya eslatmani egallab, yuborish. Yuborilganlar sonini qaytaradi"""
+    now = now or utc_now()
+
+    async with session_factory() as db:
+        reminders = await claim_due_reminders(db, now, settings.REMINDER_BATCH_SIZE)
+        if not reminders:
+            return 0
+
+        semaphore = asyncio.Semaphore(settings.REMINDER_CONCURRENCY)
+        sent: List[int] = []
+        failed: List[int] = []
+
+        async def deliver(reminder: Reminder):
+            async with semaphore:
+                try:
+                    await sender.send(reminder)
+                except Exception:
+                    logger.exception("Eslatma yuborilmadi: buyurtma #%s", reminder.appointment_id)
+                    failed.append(reminder.appointment_id)
+                else:
+                    sent.append(reminder.appointment_id)
+
+        await asyncio.gather(*(deliver(reminder) for reminder in reminders))
+        await mark_reminders_sent(db, sent, utc_now())
+        await release_reminders(db, failed)
+
+        return len(sent)
+
+
+async def run_reminder_worker(
+    sender: Optional[ReminderSender] = None,
+    session_factory=SessionLocal,
+) -> None:
+    """Eslatmalarni doimiy ravishda yuborib turish (har bir replikada ishga tushirish mumkin)"""
+    sender = sender or LogReminderSender()
+
+    while True:
+        try:
+            sent = await process_due_reminders(sender, session_factory)
+        except Exception:
+            logger.exception("Eslatma workerida xatolik")
+            sent = 0
+
+        # Partiya to'liq bo'lsa, navbatda yana eslatmalar bor - kutmasdan davom etamiz
+        if sent < settings.REMINDER_BATCH_SIZE:
+            await asyncio.sleep(settings.REMINDER_POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_reminder_worker())
@@ -0,0 +1,34 @@
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.core.revocation import RevocationStore
+from app.db.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_expired_revocations(session_factory=SessionLocal) -> int:
+    """Muddati o'tgan revoked_tokens yozuvlarini o'chirish"""
+    async with session_factory() as db:
+        purged = await RevocationStore.purge(db)
+
+    if purged:
+        logger.info("%s ta muddati o'tgan bekor qilish yozuvi o'chirildi", purged)
+    return purged
+
+
+async def run_revocation_purge_worker(session_factory=SessionLocal) -> None:
+    """revoked_tokens jadvalini davriy ravishda tozalab turish (so'rovlar yo'lidan tashqarida)"""
+    while True:
+        try:
+            await purge_expired_revocations(session_factory)
+        except Exception:
+            logger.exception("Bekor qilingan tokenlarni tozalashda xatolik")
+
+        await asyncio.sleep(settings.REVOCATION_PURGE_HOURS * 60 * 60)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_revocation_purge_worker())
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, insert
+from sqlalchemy.sql import func
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.models import (
+    Appointment,
+    AppointmentRollupDaily,
+    AppointmentRollupHourly,
+    AppointmentStatus,
+    RollupWatermark,
+    Service,
+)
+from app.utils.schedule import APPOINTMENT_DURATION
+from app.utils.timerange import UTC, in_range, local_day_range, utc_now
+
+logger = logging.getLogger(__name__)
+
+WATERMARK = "appointment_rollups"
+COUNTERS = ("total_count", "completed_count", "cancelled_count", "no_show_count", "revenue", "booked_minutes")
+
+
+async def changed_days(db, since: datetime, until: datetime) -> List[date]:
+    """Watermark oralig'ida o'zgargan buyurtmalar tegishli kunlar"""
+    query = (
+        select(Appointment.appointment_time)
+        .where(Appointment.updated_at > since, Appointment.updated_at <= until)
+    )
+    result = await db.execute(query)
+    return sorted({appointment_time.date() for appointment_time in result.scalars().all()})
+
+
+def aggregate(rows: Iterable) -> Tuple[Dict[tuple, dict], Dict[tuple, dict]]:
+    """Buyurtmalarni soatlik va kunlik bucket'larga yig'ish
+
+    Kalit: (bucket, barber_id, category_id). SQL'da soat bo'yicha guruhlash har bir
+    bazada boshqacha (date_trunc / strftime), shuning uchun yig'ish Python'da.
+    """
+    hourly: Dict[tuple, dict] = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    daily: Dict[tuple, dict] = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+
+    for row in rows:
+        hour = row.appointment_time.replace(minute=0, second=0, microsecond=0)
+        barber_id = row.barber_id or 0
+        for bucket in (
+            hourly[(hour, barber_id, row.category_id)],
+            daily[(hour.date(), barber_id, row.category_id)],
+        ):
+            bucket["total_count"] += 1
+            if row.status == AppointmentStatus.completed:
+                bucket["completed_count"] += 1
+                bucket["revenue"] += row.price
+            elif row.status == AppointmentStatus.cancelled:
+                bucket["cancelled_count"] += 1
+            elif row.status == AppointmentStatus.no_show:
+                bucket["no_show_count"] += 1
+            if row.status != AppointmentStatus.cancelled:
+                bucket["booked_minutes"] += row.duration
+
+    return hourly, daily
+
+
+async def recompute_days(db, days: List[date]) -> None:
+    """Kunlarning rollup'larini qayta hisoblash (delete + insert, har qanday bazada ishlaydi)
+
+    Bucket to'liq qayta hisoblanadi, shuning uchun bir kunni ikki marta
+    ishlash xavfsiz (idempotent). Kunlar va soatlar UTC bo'yicha: rollup'lar
+    barcha salonlar uchun umumiy, mahalliy kun so'rov vaqtida soatlardan olinadi.
+    """
+    for day in days:
+        day_start, day_end = local_day_range(day, UTC)
+
+        query = (
+            select(
+                Appointment.appointment_time,
+                Appointment.barber_id,
+                Appointment.status,
+                Service.category_id,
+                # Bron vaqtidagi narx (to'plamda yig'indi), eski buyurtmalarda joriy narx
+                func.coalesce(Appointment.total_price, Service.price).label("price"),
+                APPOINTMENT_DURATION.label("duration"),
+            )
+            .join(Service, Service.id == Appointment.service_id)
+            .where(in_range(Appointment.appointment_time, day_start, day_end))
+        )
+        result = await db.execute(query)
+        hourly, daily = aggregate(result.all())
+
+        await db.execute(
+            delete(AppointmentRollupHourly).where(in_range(AppointmentRollupHourly.bucket_start, day_start, day_end))
+        )
+        await db.execute(delete(AppointmentRollupDaily).where(AppointmentRollupDaily.bucket_date == day))
+
+        if hourly:
+            await db.execute(insert(AppointmentRollupHourly), [
+                {"bucket_start": bucket, "barber_id": barber_id, "category_id": category_id, **counters}
+                for (bucket, barber_id, category_id), counters in hourly.items()
+            ])
+            await db.execute(insert(AppointmentRollupDaily), [
+                {"bucket_date": bucket, "barber_id": barber_id, "category_id": category_id, **counters}
+                for (bucket, barber_id, category_id), counters in daily.items()
+            ])
+
+
+async def refresh_rollups(session_factory=SessionLocal, now: Optional[datetime] = None) -> int:
+    """Watermark'dan keyin o'zgargan kunlarni qayta hisoblash
+
+    Yuqori chegara ROLLUP_LAG_SECONDS orqada: hali commit qilinmagan
+    tranzaksiyalardagi updated_at qiymatlari keyingi o'tishda ko'rinadi.
+    Rollup'lar va yangi watermark bitta tranzaksiyada yoziladi.
+    """
+    now = now or utc_now()
+    until = now - timedelta(seconds=settings.ROLLUP_LAG_SECONDS)
+
+    async with session_factory() as db:
+        watermark = await db.get(RollupWatermark, WATERMARK)
+        since = watermark.value if watermark else datetime.min.replace(tzinfo=UTC)
+        if since >= until:
+            return 0
+
+        days = await changed_days(db, since, until)
+
+        for index in range(0, len(days), settings.ROLLUP_BATCH_DAYS):
+            await recompute_days(db, days[index:index + settings.ROLLUP_BATCH_DAYS])
+            if index + settings.ROLLUP_BATCH_DAYS < len(days):
+                # Katta tarixni birinchi marta hisoblashda tranzaksiyalar qisqa bo'lsin
+                await db.commit()
+
+        if watermark is None:
+            db.add(RollupWatermark(name=WATERMARK, value=until))
+        else:
+            watermark.value = until
+        await db.commit()
+
+    if days:
+        logger.info("%s kunlik rollup yangilandi", len(days))
+
+    return len(days)
+
+
+async def run_rollup_worker(session_factory=SessionLocal) -> None:
+    """Rollup jadvallarini davriy ravishda yangilab turish"""
+    while True:
+        try:
+            await refresh_rollups(session_factory)
+        except Exception:
+            logger.exception("Rollup'larni yangilashda xatolik")
+
+        await asyncio.sleep(settings.ROLLUP_POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_rollup_worker())
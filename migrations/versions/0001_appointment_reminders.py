@@ -0,0 +1,33 @@
+"""appointment reminders
+
+Revision ID: 0001_appointment_reminders
+Revises: 
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_appointment_reminders'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('appointments', sa.Column('reminder_sent_at', sa.DateTime(), nullable=True))
+    op.create_index(
+        'ix_appointments_reminder_due',
+        'appointments',
+        ['appointment_time'],
+        postgresql_where=sa.text('reminder_sent_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_appointments_reminder_due', table_name='appointments')
+    op.drop_column('appointments', 'reminder_sent_at')
@@ -0,0 +1,36 @@
+"""pending appointment expiry
+
+Revision ID: 0002_pending_expiry
+Revises: 0001_appointment_reminders
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_pending_expiry'
+down_revision: Union[str, None] = '0001_appointment_reminders'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'appointments',
+        sa.Column('created_at', sa.DateTime(), nullable=True, server_default=sa.text('now()')),
+    )
+    op.create_index(
+        'ix_appointments_pending_created',
+        'appointments',
+        ['created_at'],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_appointments_pending_created', table_name='appointments')
+    op.drop_column('appointments', 'created_at')
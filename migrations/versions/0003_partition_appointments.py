@@ -0,0 +1,105 @@
+"""partition appointments by month
+
+Revision ID: 0003_partition_appointments
+Revises: 0002_pending_expiry
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_partition_appointments'
+down_revision: Union[str, None] = '0002_pending_expiry'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Joriy oydan keyin oldindan yaratiladigan partitsiyalar soni
+MONTHS_AHEAD = 3
+
+
+def _create_indexes() -> None:
+    op.create_index('ix_appointments_id', 'appointments', ['id'])
+    op.create_index(
+        'ix_appointments_reminder_due',
+        'appointments',
+        ['appointment_time'],
+        postgresql_where=sa.text('reminder_sent_at IS NULL'),
+    )
+    op.create_index(
+        'ix_appointments_pending_created',
+        'appointments',
+        ['created_at'],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def upgrade() -> None:
+    # Eski jadvalni chetga olib qo'yamiz
+    op.execute("ALTER TABLE appointments RENAME TO appointments_legacy")
+
+    # Partitsiyalangan asosiy jadval (PRIMARY KEY partitsiya kalitini o'z ichiga olishi shart)
+    op.execute("""
+        CREATE TABLE appointments (LIKE appointments_legacy INCLUDING DEFAULTS)
+        PARTITION BY RANGE (appointment_time)
+    """)
+    op.execute("ALTER TABLE appointments ADD PRIMARY KEY (id, appointment_time)")
+    op.execute("ALTER TABLE appointments ADD FOREIGN KEY (user_id) REFERENCES clients (id)")
+    op.execute("ALTER TABLE appointments ADD FOREIGN KEY (service_id) REFERENCES services (id)")
+    op.execute("ALTER TABLE appointments ADD FOREIGN KEY (barber_id) REFERENCES barbers (id)")
+
+    # Mavjud ma'lumotlarning birinchi oyidan to oxirgi oyigacha (kamida joriy oy + MONTHS_AHEAD)
+    # oylik partitsiyalar yaratiladi
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month_start date;
+            last_month date;
+        BEGIN
+            SELECT
+                least(date_trunc('month', min(appointment_time)), date_trunc('month', now())),
+                greatest(
+                    date_trunc('month', max(appointment_time)),
+                    date_trunc('month', now()) + interval '{MONTHS_AHEAD} months'
+                )
+              INTO month_start, last_month
+              FROM appointments_legacy;
+
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF appointments FOR VALUES FROM (%L) TO (%L)',
+                    'appointments_p' || to_char(month_start, 'YYYYMM'),
+                    month_start,
+                    month_start + interval '1 month'
+                );
+                month_start := month_start + interval '1 month';
+            END LOOP;
+        END $$;
+    """)
+    op.execute("INSERT INTO appointments SELECT * FROM appointments_legacy")
+
+    # id ketma-ketligini yangi jadvalga o'tkazib, eski jadvalni o'chiramiz
+    op.execute("ALTER SEQUENCE appointments_id_seq OWNED BY appointments.id")
+    op.execute("DROP TABLE appointments_legacy")
+
+    _create_indexes()
+    op.create_index('ix_appointments_user_time', 'appointments', ['user_id', 'appointment_time'])
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE appointments RENAME TO appointments_partitioned")
+    op.execute("""
+        CREATE TABLE appointments (LIKE appointments_partitioned INCLUDING DEFAULTS)
+    """)
+    op.execute("ALTER TABLE appointments ADD PRIMARY KEY (id)")
+    op.execute("ALTER TABLE appointments ADD FOREIGN KEY (user_id) REFERENCES clients (id)")
+    op.execute("ALTER TABLE appointments ADD FOREIGN KEY (service_id) REFERENCES services (id)")
+    op.execute("ALTER TABLE appointments ADD FOREIGN KEY (barber_id) REFERENCES barbers (id)")
+    op.execute("INSERT INTO appointments SELECT * FROM appointments_partitioned")
+    op.execute("ALTER SEQUENCE appointments_id_seq OWNED BY appointments.id")
+    op.execute("DROP TABLE appointments_partitioned CASCADE")
+
+    _create_indexes()
@@ -0,0 +1,25 @@
+"""barber schedule index
+
+Revision ID: 0005_barber_schedule_index
+Revises: 0004_revoked_tokens
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_barber_schedule_index'
+down_revision: Union[str, None] = '0004_revoked_tokens'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_appointments_barber_time', 'appointments', ['barber_id', 'appointment_time'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_appointments_barber_time', table_name='appointments')
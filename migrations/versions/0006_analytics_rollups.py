@@ -0,0 +1,76 @@
+"""analytics rollups
+
+Revision ID: 0006_analytics_rollups
+Revises: 0005_barber_schedule_index
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006_analytics_rollups'
+down_revision: Union[str, None] = '0005_barber_schedule_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _rollup_columns():
+    return [
+        sa.Column('barber_id', sa.Integer(), primary_key=True),
+        sa.Column('category_id', sa.Integer(), primary_key=True),
+        sa.Column('total_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('cancelled_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('no_show_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('revenue', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('booked_minutes', sa.Integer(), nullable=False, server_default='0'),
+    ]
+
+
+def upgrade() -> None:
+    # ALTER TYPE ... ADD VALUE tranzaksiya ichida bajarilmaydi
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE appointmentstatus ADD VALUE IF NOT EXISTS 'no_show'")
+
+    op.add_column(
+        'appointments',
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+    )
+    # Mavjud buyurtmalar birinchi ishga tushishda rollup'ga tushishi uchun
+    op.execute("UPDATE appointments SET updated_at = COALESCE(created_at, appointment_time)")
+    op.create_index('ix_appointments_updated_at', 'appointments', ['updated_at'])
+
+    op.create_table(
+        'appointment_rollups_hourly',
+        sa.Column('bucket_start', sa.DateTime(), primary_key=True),
+        *_rollup_columns(),
+    )
+    op.create_table(
+        'appointment_rollups_daily',
+        sa.Column('bucket_date', sa.Date(), primary_key=True),
+        *_rollup_columns(),
+    )
+    op.create_index(
+        'ix_appointment_rollups_daily_category',
+        'appointment_rollups_daily',
+        ['category_id', 'bucket_date'],
+    )
+    op.create_table(
+        'rollup_watermarks',
+        sa.Column('name', sa.String(), primary_key=True),
+        sa.Column('value', sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rollup_watermarks')
+    op.drop_index('ix_appointment_rollups_daily_category', table_name='appointment_rollups_daily')
+    op.drop_table('appointment_rollups_daily')
+    op.drop_table('appointment_rollups_hourly')
+    op.drop_index('ix_appointments_updated_at', table_name='appointments')
+    op.drop_column('appointments', 'updated_at')
+    # Postgres enum qiymatini o'chirib bo'lmaydi: no_show qiymati qoladi
@@ -0,0 +1,52 @@
+"""barber working hours
+
+Revision ID: 0007_barber_working_hours
+Revises: 0006_analytics_rollups
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007_barber_working_hours'
+down_revision: Union[str, None] = '0006_analytics_rollups'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'barber_working_hours',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('barber_id', sa.Integer(), sa.ForeignKey('barbers.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('weekday', sa.Integer(), nullable=False),
+        sa.Column('start_minute', sa.Integer(), nullable=False),
+        sa.Column('end_minute', sa.Integer(), nullable=False),
+    )
+    op.create_index('ix_barber_working_hours_barber', 'barber_working_hours', ['barber_id', 'weekday'])
+
+    op.create_table(
+        'barber_schedule_overrides',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('barber_id', sa.Integer(), sa.ForeignKey('barbers.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('is_day_off', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('start_minute', sa.Integer(), nullable=True),
+        sa.Column('end_minute', sa.Integer(), nullable=True),
+    )
+    op.create_index(
+        'ix_barber_schedule_overrides_barber_date',
+        'barber_schedule_overrides',
+        ['barber_id', 'date'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_barber_schedule_overrides_barber_date', table_name='barber_schedule_overrides')
+    op.drop_table('barber_schedule_overrides')
+    op.drop_index('ix_barber_working_hours_barber', table_name='barber_working_hours')
+    op.drop_table('barber_working_hours')
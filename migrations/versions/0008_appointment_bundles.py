@@ -0,0 +1,48 @@
+"""appointment bundles
+
+Revision ID: 0008_appointment_bundles
+Revises: 0007_barber_working_hours
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008_appointment_bundles'
+down_revision: Union[str, None] = '0007_barber_working_hours'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Eski buyurtmalar uchun NULL qoldiriladi (so'rovlar services jadvaliga qaytadi),
+    # shuning uchun katta jadvalni qayta yozish shart emas
+    op.add_column('appointments', sa.Column('duration_minutes', sa.Integer(), nullable=True))
+    op.add_column('appointments', sa.Column('total_price', sa.Float(), nullable=True))
+
+    # appointments partitsiyalangan - appointment_id ga FOREIGN KEY qo'yilmaydi
+    op.create_table(
+        'appointment_services',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('appointment_id', sa.Integer(), nullable=False),
+        sa.Column('service_id', sa.Integer(), sa.ForeignKey('services.id'), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('duration', sa.Integer(), nullable=False),
+    )
+    op.create_index(
+        'ix_appointment_services_appointment',
+        'appointment_services',
+        ['appointment_id', 'position'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_appointment_services_appointment', table_name='appointment_services')
+    op.drop_table('appointment_services')
+    op.drop_column('appointments', 'total_price')
+    op.drop_column('appointments', 'duration_minutes')
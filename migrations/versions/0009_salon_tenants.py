@@ -0,0 +1,70 @@
+"""salon tenants
+
+Revision ID: 0009_salon_tenants
+Revises: 0008_appointment_bundles
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009_salon_tenants'
+down_revision: Union[str, None] = '0008_appointment_bundles'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TENANT_TABLES = ('categories', 'services', 'barbers', 'appointments')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'salons',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('slug', sa.String(), nullable=False, unique=True),
+        sa.Column('address', sa.String(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column('created_at', sa.DateTime(), nullable=True, server_default=sa.text('now()')),
+    )
+    # Mavjud ma'lumotlar birinchi (standart) salonga tegishli bo'ladi
+    op.execute("INSERT INTO salons (id, name, slug) VALUES (1, 'StyleHub', 'main')")
+    op.execute("SELECT setval(pg_get_serial_sequence('salons', 'id'), 1)")
+
+    # server_default bilan qo'shish mavjud qatorlarni qayta yozmaydi (PostgreSQL 11+)
+    for table in TENANT_TABLES:
+        op.add_column(
+            table,
+            sa.Column('tenant_id', sa.Integer(), nullable=False, server_default='1'),
+        )
+        op.create_foreign_key(f'fk_{table}_tenant_id', table, 'salons', ['tenant_id'], ['id'])
+
+    # Kategoriya nomi endi salon ichida yagona
+    op.drop_constraint('categories_name_key', 'categories', type_='unique')
+    op.create_index('ix_categories_tenant_name', 'categories', ['tenant_id', 'name'], unique=True)
+    op.create_index('ix_services_tenant_category', 'services', ['tenant_id', 'category_id'])
+    op.create_index('ix_barbers_tenant_category', 'barbers', ['tenant_id', 'category_id'])
+    op.create_index('ix_appointments_tenant_time', 'appointments', ['tenant_id', 'appointment_time'])
+
+    # Katta salonning alohida bazasi (alembic -x tenant_db=1 upgrade head): mijozlar
+    # asosiy bazada qoladi, shuning uchun bu yerda clients ga tashqi kalit bo'lmaydi.
+    # Salonning o'z qatori esa salons jadvaliga qo'lda qo'shiladi (asosiy bazadagi id bilan)
+    if context.get_x_argument(as_dictionary=True).get('tenant_db'):
+        op.execute("ALTER TABLE appointments DROP CONSTRAINT IF EXISTS appointments_user_id_fkey")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_appointments_tenant_time', table_name='appointments')
+    op.drop_index('ix_barbers_tenant_category', table_name='barbers')
+    op.drop_index('ix_services_tenant_category', table_name='services')
+    op.drop_index('ix_categories_tenant_name', table_name='categories')
+    op.create_unique_constraint('categories_name_key', 'categories', ['name'])
+
+    for table in reversed(TENANT_TABLES):
+        op.drop_constraint(f'fk_{table}_tenant_id', table, type_='foreignkey')
+        op.drop_column(table, 'tenant_id')
+
+    op.drop_table('salons')
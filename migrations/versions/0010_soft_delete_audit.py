@@ -0,0 +1,76 @@
+"""soft delete and audit log
+
+Revision ID: 0010_soft_delete_audit
+Revises: 0009_salon_tenants
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010_soft_delete_audit'
+down_revision: Union[str, None] = '0009_salon_tenants'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = sa.text('deleted_at IS NULL')
+
+
+def upgrade() -> None:
+    op.add_column('services', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.add_column('barbers', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+
+    # Katalog indekslari faqat o'chirilmagan qatorlar bo'yicha
+    op.drop_index('ix_services_tenant_category', table_name='services')
+    op.create_index(
+        'ix_services_active_tenant_category', 'services', ['tenant_id', 'category_id'],
+        postgresql_where=ACTIVE,
+    )
+    op.drop_index('ix_barbers_tenant_category', table_name='barbers')
+    op.create_index(
+        'ix_barbers_active_tenant_category', 'barbers', ['tenant_id', 'category_id'],
+        postgresql_where=ACTIVE,
+    )
+
+    # O'chirilgan barberning telefoni/emaili yangi barberga berilishi mumkin
+    op.drop_constraint('barbers_phone_key', 'barbers', type_='unique')
+    op.drop_constraint('barbers_email_key', 'barbers', type_='unique')
+    op.create_index('ix_barbers_active_phone', 'barbers', ['phone'], unique=True, postgresql_where=ACTIVE)
+    op.create_index('ix_barbers_active_email', 'barbers', ['email'], unique=True, postgresql_where=ACTIVE)
+
+    op.create_table(
+        'audit_log',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=True),
+        sa.Column('actor_id', sa.Integer(), nullable=True),
+        sa.Column('action', sa.String(), nullable=False),
+        sa.Column('entity', sa.String(), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=True),
+        sa.Column('changes', sa.JSON(), nullable=True),
+    )
+    op.create_index('ix_audit_log_entity', 'audit_log', ['entity', 'entity_id', 'created_at'])
+    op.create_index('ix_audit_log_tenant_created', 'audit_log', ['tenant_id', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_audit_log_tenant_created', table_name='audit_log')
+    op.drop_index('ix_audit_log_entity', table_name='audit_log')
+    op.drop_table('audit_log')
+
+    op.drop_index('ix_barbers_active_email', table_name='barbers')
+    op.drop_index('ix_barbers_active_phone', table_name='barbers')
+    op.create_unique_constraint('barbers_email_key', 'barbers', ['email'])
+    op.create_unique_constraint('barbers_phone_key', 'barbers', ['phone'])
+
+    op.drop_index('ix_barbers_active_tenant_category', table_name='barbers')
+    op.create_index('ix_barbers_tenant_category', 'barbers', ['tenant_id', 'category_id'])
+    op.drop_index('ix_services_active_tenant_category', table_name='services')
+    op.create_index('ix_services_tenant_category', 'services', ['tenant_id', 'category_id'])
+
+    op.drop_column('barbers', 'deleted_at')
+    op.drop_column('services', 'deleted_at')
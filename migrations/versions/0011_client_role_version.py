@@ -0,0 +1,29 @@
+"""client role version
+
+Revision ID: 0011_client_role_version
+Revises: 0010_soft_delete_audit
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011_client_role_version'
+down_revision: Union[str, None] = '0010_soft_delete_audit'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'clients',
+        sa.Column('role_version', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('clients', 'role_version')
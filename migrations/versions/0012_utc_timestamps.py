@@ -0,0 +1,161 @@
+"""store timestamps as timestamptz (UTC)
+
+Revision ID: 0012_utc_timestamps
+Revises: 0011_client_role_version
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012_utc_timestamps'
+down_revision: Union[str, None] = '0011_client_role_version'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Ilova barcha vaqtlarni datetime.utcnow() bilan yozgan, shuning uchun zonasiz
+# qiymatlar UTC deb o'giriladi. banners allaqachon timestamptz
+COLUMNS = {
+    'clients': ('created_at',),
+    'salons': ('created_at',),
+    'categories': ('created_at',),
+    'services': ('deleted_at',),
+    'barbers': ('created_at', 'deleted_at'),
+    'revoked_tokens': ('expires_at', 'revoked_at'),
+    'appointment_rollups_hourly': ('bucket_start',),
+    'rollup_watermarks': ('value',),
+    'audit_log': ('created_at',),
+}
+APPOINTMENT_COLUMNS = ('appointment_time', 'created_at', 'reminder_sent_at', 'updated_at')
+
+
+def _create_appointment_indexes() -> None:
+    op.create_index('ix_appointments_id', 'appointments', ['id'])
+    op.create_index(
+        'ix_appointments_reminder_due',
+        'appointments',
+        ['appointment_time'],
+        postgresql_where=sa.text('reminder_sent_at IS NULL'),
+    )
+    op.create_index(
+        'ix_appointments_pending_created',
+        'appointments',
+        ['created_at'],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    op.create_index('ix_appointments_user_time', 'appointments', ['user_id', 'appointment_time'])
+    op.create_index('ix_appointments_tenant_time', 'appointments', ['tenant_id', 'appointment_time'])
+    op.create_index('ix_appointments_barber_time', 'appointments', ['barber_id', 'appointment_time'])
+    op.create_index('ix_appointments_updated_at', 'appointments', ['updated_at'])
+
+
+def _rebuild_appointments(column_type: str) -> None:
+    """appointments jadvalini yangi vaqt turi bilan qayta qurish
+
+    appointment_time partitsiya kaliti, uning turini ALTER bilan o'zgartirib
+    bo'lmaydi. 0003 dagidek: eski jadval chetga olinadi, yangi partitsiyalangan
+    jadval yaratiladi va ma'lumotlar ko'chiriladi. Arxiv sxemasidagi (ajratilgan)
+    partitsiyalarga tegilmaydi.
+    """
+    op.execute("ALTER TABLE appointments RENAME TO appointments_legacy")
+    op.execute("ALTER INDEX appointments_pkey RENAME TO appointments_legacy_pkey")
+    # Eski partitsiyalar nomini bo'shatamiz (ular eski jadval bilan birga o'chiriladi)
+    op.execute("""
+        DO $$
+        DECLARE
+            partition_name text;
+        BEGIN
+            FOR partition_name IN
+                SELECT child.relname
+                  FROM pg_inherits
+                  JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                  JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                 WHERE parent.relname = 'appointments_legacy'
+            LOOP
+                EXECUTE format('ALTER TABLE %I RENAME TO %I', partition_name, partition_name || '_legacy');
+            END LOOP;
+        END $$;
+    """)
+
+    # Partitsiya kalitining turi jadval yaratilishidan oldin o'zgartirilishi kerak
+    op.execute("CREATE TABLE appointments_columns (LIKE appointments_legacy INCLUDING DEFAULTS)")
+    for column in APPOINTMENT_COLUMNS:
+        op.execute(f"ALTER TABLE appointments_columns ALTER COLUMN {column} TYPE {column_type}")
+    op.execute("""
+        CREATE TABLE appointments (LIKE appointments_columns INCLUDING DEFAULTS)
+        PARTITION BY RANGE (appointment_time)
+    """)
+    op.execute("DROP TABLE appointments_columns")
+
+    op.execute("ALTER TABLE appointments ADD PRIMARY KEY (id, appointment_time)")
+    # Salonning alohida bazasida mijozlar jadvaliga tashqi kalit yo'q (0009)
+    if not context.get_x_argument(as_dictionary=True).get('tenant_db'):
+        op.execute("ALTER TABLE appointments ADD FOREIGN KEY (user_id) REFERENCES clients (id)")
+    op.execute("ALTER TABLE appointments ADD FOREIGN KEY (service_id) REFERENCES services (id)")
+    op.execute("ALTER TABLE appointments ADD FOREIGN KEY (barber_id) REFERENCES barbers (id)")
+    op.execute(
+        "ALTER TABLE appointments ADD CONSTRAINT fk_appointments_tenant_id "
+        "FOREIGN KEY (tenant_id) REFERENCES salons (id)"
+    )
+
+    # Mavjud ma'lumotlar va joriy oydan keyingi 3 oy uchun oylik partitsiyalar
+    # (sessiya zonasi UTC - chegaralar UTC oy boshlari)
+    op.execute("""
+        DO $$
+        DECLARE
+            month_start timestamp;
+            last_month timestamp;
+        BEGIN
+            SELECT
+                least(date_trunc('month', min(appointment_time)), date_trunc('month', now())),
+                greatest(
+                    date_trunc('month', max(appointment_time)),
+                    date_trunc('month', now()) + interval '3 months'
+                )
+              INTO month_start, last_month
+              FROM appointments_legacy;
+
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF appointments FOR VALUES FROM (%L) TO (%L)',
+                    'appointments_p' || to_char(month_start, 'YYYYMM'),
+                    month_start,
+                    month_start + interval '1 month'
+                );
+                month_start := month_start + interval '1 month';
+            END LOOP;
+        END $$;
+    """)
+    # timestamp <-> timestamptz o'girishi sessiya zonasi (UTC) bo'yicha bajariladi
+    op.execute("INSERT INTO appointments SELECT * FROM appointments_legacy")
+
+    op.execute("ALTER SEQUENCE appointments_id_seq OWNED BY appointments.id")
+    op.execute("DROP TABLE appointments_legacy")
+
+    _create_appointment_indexes()
+
+
+def _convert(column_type: str) -> None:
+    # Barcha o'girishlar server sozlamasidan qat'i nazar UTC bo'yicha
+    op.execute("SET LOCAL TIME ZONE 'UTC'")
+
+    for table, columns in COLUMNS.items():
+        for column in columns:
+            op.execute(
+                f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {column_type} "
+                f"USING {column} AT TIME ZONE 'UTC'"
+            )
+
+    _rebuild_appointments(column_type)
+
+
+def upgrade() -> None:
+    _convert('timestamptz')
+
+
+def downgrade() -> None:
+    _convert('timestamp')
@@ -0,0 +1,56 @@
+"""salon-scoped client roles
+
+Revision ID: 0013_client_roles
+Revises: 0012_utc_timestamps
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0013_client_roles'
+down_revision: Union[str, None] = '0012_utc_timestamps'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'client_roles',
+        sa.Column('client_id', sa.Integer(), sa.ForeignKey('clients.id'), primary_key=True),
+        sa.Column('tenant_id', sa.Integer(), sa.ForeignKey('salons.id'), primary_key=True),
+        sa.Column('role', sa.String(), nullable=False),
+    )
+    op.create_index('ix_client_roles_tenant', 'client_roles', ['tenant_id', 'client_id'])
+
+    # Avvalgi global rol barcha salonlarda saqlanadi (huquqlar kamaymaydi);
+    # keyin ortiqchasi salon bo'yicha olib tashlanadi
+    op.execute("""
+        INSERT INTO client_roles (client_id, tenant_id, role)
+        SELECT clients.id, salons.id, clients.role
+          FROM clients CROSS JOIN salons
+         WHERE clients.role IS NOT NULL
+    """)
+    # Eski tokenlardagi ("role", ro'yxat ko'rinishidagi "perms") ruxsatlar endi
+    # hisobga olinmaydi: xodimlar qayta kirib, salonlar bo'yicha token oladi
+    op.drop_column('clients', 'role')
+
+
+def downgrade() -> None:
+    op.add_column('clients', sa.Column('role', sa.String(), nullable=True))
+    # Bir nechta salonda turli rol bo'lsa, asosiy (eng kichik id) salondagisi olinadi
+    op.execute("""
+        UPDATE clients
+           SET role = (
+               SELECT role FROM client_roles
+                WHERE client_roles.client_id = clients.id
+                ORDER BY tenant_id
+                LIMIT 1
+           )
+    """)
+    op.drop_index('ix_client_roles_tenant', table_name='client_roles')
+    op.drop_table('client_roles')
@@ -0,0 +1,30 @@
+"""reminder claim lease
+
+Revision ID: 0014_reminder_lease
+Revises: 0013_client_roles
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0014_reminder_lease'
+down_revision: Union[str, None] = '0013_client_roles'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Partitsiyalangan jadvalga qo'shilgan ustun barcha partitsiyalarga o'tadi
+    op.add_column(
+        'appointments',
+        sa.Column('reminder_claimed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('appointments', 'reminder_claimed_at')
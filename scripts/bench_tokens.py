@@ -0,0 +1,83 @@
+"""JWT imzolash va tekshirish tezligini o'lchash (tokens/sec)
+
+Ishga tushirish:
+    SECRET_KEY=... python -m scripts.bench_tokens [--seconds 2]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.core.tokens import KeyRing, SigningKey
+
+
+def generate_keys():
+    """Benchmark uchun vaqtinchalik kalitlar"""
+    keys = [SigningKey("hs256", "HS256", secret="benchmark-secret-key-0123456789")]
+
+    try:
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import ec, rsa
+    except ImportError:
+        return keys
+
+    def pem(private):
+        return private.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode()
+
+    keys.append(SigningKey("rs256", "RS256", private_key=pem(rsa.generate_private_key(65537, 2048))))
+    keys.append(SigningKey("es256", "ES256", private_key=pem(ec.generate_private_key(ec.SECP256R1()))))
+    return keys
+
+
+def measure(func, seconds: float) -> float:
+    """func ni seconds davomida chaqirib, sekundiga necha marta bajarilganini qaytarish"""
+    count = 0
+    deadline = time.perf_counter() + seconds
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            func()
+        count += 100
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=2.0, help="Har bir o'lchov davomiyligi")
+    args = parser.parse_args()
+
+    payload = {
+        "sub": "12345",
+        "fid": "0f1e2d3c4b5a69788796a5b4c3d2e1f0",
+        "jti": "00112233445566778899aabbccddeeff",
+        "type": "access",
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=30),
+    }
+
+    keys = generate_keys()
+    print(f"{'alg':<8}{'encode/s':>14}{'decode/s':>14}")
+    for key in keys:
+        ring = KeyRing(keys, active_kid=key.kid)
+        token = ring.encode(payload)
+        encode_rate = measure(lambda: ring.encode(payload), args.seconds)
+        decode_rate = measure(lambda: ring.decode(token), args.seconds)
+        print(f"{key.alg:<8}{encode_rate:>14,.0f}{decode_rate:>14,.0f}")
+
+    # Taqqoslash uchun python-jose (o'rnatilgan bo'lsa)
+    try:
+        from jose import jwt
+    except ImportError:
+        return
+
+    secret = "benchmark-secret-key-0123456789"
+    token = jwt.encode(payload, secret, algorithm="HS256")
+    encode_rate = measure(lambda: jwt.encode(payload, secret, algorithm="HS256"), args.seconds)
+    decode_rate = measure(lambda: jwt.decode(token, secret, algorithms=["HS256"]), args.seconds)
+    print(f"{'jose':<8}{encode_rate:>14,.0f}{decode_rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Pydantic schemalari tekshiruvi va JSON serializatsiya tezligini o'lchash (ops/sec)
+
+So'rov tanasini tekshirish (JSON -> model) va ro'yxat javoblarini serializatsiya
+qilish: TypeAdapter.dump_json va FastAPI'ning jsonable_encoder + json.dumps yo'li.
+
+Ishga tushirish:
+    SECRET_KEY=... python -m scripts.bench_validation [--seconds 2] [--rows 100]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from app.schemas import AppointmentCreate, AppointmentResponse, appointment_list_adapter, dump_json
+
+
+class LaxAppointmentCreate(AppointmentCreate):
+    """Taqqoslash uchun: id'lar qat'iy emas ("5" -> 5 moslashtiriladi)"""
+
+    service_id: Optional[int] = None
+    service_ids: List[int] = []
+    barber_id: Optional[int] = None
+
+
+def measure(func, seconds: float) -> float:
+    """func ni seconds davomida chaqirib, sekundiga necha marta bajarilganini qaytarish"""
+    count = 0
+    deadline = time.perf_counter() + seconds
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            func()
+        count += 100
+    return count / (time.perf_counter() - started)
+
+
+def appointment_rows(count: int):
+    """ORM obyektlariga o'xshash qatorlar (from_attributes orqali o'qiladi)"""
+    start = datetime(2030, 1, 7, 9, 0)
+    return [
+        SimpleNamespace(
+            id=index + 1,
+            tenant_id=1,
+            user_id=index % 50 + 1,
+            service_id=3,
+            service_ids=[3, 4],
+            barber_id=index % 5 + 1,
+            appointment_time=start + timedelta(minutes=30 * index),
+            duration_minutes=90,
+            total_price=15.0,
+            status="pending",
+            created_at=start,
+        )
+        for index in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=2.0, help="Har bir o'lchov davomiyligi")
+    parser.add_argument("--rows", type=int, default=100, help="Ro'yxat javobidagi buyurtmalar soni")
+    args = parser.parse_args()
+
+    body = b'{"service_ids": [3, 4], "appointment_time": "2030-01-07T09:00:00", "barber_id": 2}'
+    print(f"{'request body':<34}{'ops/s':>14}")
+    strict_rate = measure(lambda: AppointmentCreate.model_validate_json(body), args.seconds)
+    print(f"{'AppointmentCreate (strict)':<34}{strict_rate:>14,.0f}")
+    lax_rate = measure(lambda: LaxAppointmentCreate.model_validate_json(body), args.seconds)
+    print(f"{'AppointmentCreate (lax)':<34}{lax_rate:>14,.0f}")
+    python_rate = measure(lambda: AppointmentCreate.model_validate(json.loads(body)), args.seconds)
+    print(f"{'json.loads + model_validate':<34}{python_rate:>14,.0f}")
+
+    rows = appointment_rows(args.rows)
+
+    def fastapi_path():
+        # response_model bilan qaytarilganda FastAPI shu ishni qiladi
+        models = [AppointmentResponse.model_validate(row) for row in rows]
+        return json.dumps(jsonable_encoder(models)).encode()
+
+    print()
+    print(f"{f'list response ({args.rows} rows)':<34}{'ops/s':>14}")
+    adapter_rate = measure(lambda: dump_json(appointment_list_adapter, rows), args.seconds)
+    print(f"{'TypeAdapter.dump_json':<34}{adapter_rate:>14,.0f}")
+    encoder_rate = measure(fastapi_path, args.seconds)
+    print(f"{'jsonable_encoder + json.dumps':<34}{encoder_rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
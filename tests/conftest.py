@@ -0,0 +1,170 @@
+import os
+
+# Sozlamalar app import qilinishidan oldin o'rnatiladi (Settings import vaqtida o'qiladi).
+# Har bir xdist worker o'z xotiradagi SQLite bazasiga ega
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite://"
+os.environ["DATABASE_ECHO"] = "false"
+os.environ["DATABASE_REPLICA_URLS"] = "[]"
+os.environ["TENANT_DATABASE_URLS"] = "{}"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["PWD_SALT_ROUNDS"] = "4"
+# Testlar DAY (2030 yil) sanasiga bron qiladi: buyurtma oynasi shuni qamrashi kerak
+os.environ["APPOINTMENT_PARTITION_MONTHS_AHEAD"] = "120"
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from datetime import date, datetime
+from types import SimpleNamespace
+from typing import Optional
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.pool import StaticPool
+
+from app.core.idempotency import idempotency_store
+from app.core.permissions import permission_cache
+from app.core.revocation import revocation_store
+from app.db import database
+from app.db.database import Base, create_sessionmaker, get_db, get_read_db
+from app.main import app
+from app.models.models import Appointment, Barber, Category, ClientRole, Salon, Service, User
+from app.utils.security import create_token, get_password_hash, new_token_family
+from app.utils.workhours import working_hours_cache
+
+API = "/api/v1"
+# Dushanba; ish vaqti shabloni kiritilmagan barberlar 09:00-19:00 ishlaydi
+DAY = date(2030, 1, 7)
+PASSWORD = "secret123"
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def engine():
+    """Worker uchun bitta xotiradagi baza, sxema bir marta yaratiladi"""
+    engine = database.configure_database("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db(engine):
+    """Test sessiyasi: ilova commit'lari savepoint'larda, test oxirida hammasi bekor qilinadi"""
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = create_sessionmaker(connection, join_transaction_mode="create_savepoint")()
+
+        async def override_db():
+            yield session
+
+        app.dependency_overrides[get_db] = override_db
+        app.dependency_overrides[get_read_db] = override_db
+        try:
+            yield session
+        finally:
+            app.dependency_overrides.clear()
+            await session.close()
+            await transaction.rollback()
+
+
+@pytest.fixture(autouse=True)
+def reset_process_state():
+    """Worker xotirasidagi keshlar testlar orasida o'tib ketmasligi kerak"""
+    yield
+    revocation_store._reset()
+    revocation_store._synced_at = float("-inf")
+    working_hours_cache._weeks.clear()
+    idempotency_store.backend.clear()
+    permission_cache.invalidate()
+
+
+@pytest.fixture
+async def client(db):
+    # Refresh token cookie'si secure=True - https kerak
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="https://test") as client:
+        yield client
+
+
+def auth_headers(user_id: int, role: Optional[str] = None, role_version: int = 0, salon_id: int = 1) -> dict:
+    """Login qilmasdan access token (claim'lar _issue_tokens bilan bir xil), rol salon_id da"""
+    roles = {str(salon_id): role} if role else {}
+    token = create_token({
+        "sub": str(user_id),
+        "fid": new_token_family(),
+        "roles": roles,
+        "rv": role_version,
+        "perms": permission_cache.for_roles(roles),
+    })
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+async def users(db):
+    client = User(email="client@example.com", password_hash=get_password_hash(PASSWORD), full_name="Client")
+    admin = User(email="admin@example.com", password_hash=get_password_hash(PASSWORD), full_name="Admin")
+    db.add_all([client, admin])
+    await db.flush()
+    # Admin faqat 1-salonda
+    db.add(ClientRole(client_id=admin.id, tenant_id=1, role="admin"))
+    ids = SimpleNamespace(client=client.id, admin=admin.id)
+    await db.commit()
+    return ids
+
+
+@pytest.fixture
+def client_headers(users):
+    return auth_headers(users.client)
+
+
+@pytest.fixture
+def admin_headers(users):
+    return auth_headers(users.admin, "admin")
+
+
+@pytest.fixture
+async def catalog(db):
+    """Salon, kategoriya, ikki xizmat va ikki barber (id'lar qaytariladi)"""
+    db.add_all([Salon(id=1, name="Main", slug="main"), Salon(id=2, name="Second", slug="second")])
+    category = Category(tenant_id=1, name="Hair")
+    db.add(category)
+    await db.flush()
+
+    cut = Service(tenant_id=1, category_id=category.id, name="Cut", price=10, duration=30)
+    beard = Service(tenant_id=1, category_id=category.id, name="Beard", price=5, duration=60)
+    barber = Barber(tenant_id=1, full_name="Barber One", phone="+998900000001", category_id=category.id)
+    other_barber = Barber(tenant_id=1, full_name="Barber Two", phone="+998900000002", category_id=category.id)
+    db.add_all([cut, beard, barber, other_barber])
+    await db.flush()
+
+    ids = SimpleNamespace(
+        salon=1,
+        category=category.id,
+        cut=cut.id,
+        beard=beard.id,
+        barber=barber.id,
+        other_barber=other_barber.id,
+    )
+    await db.commit()
+    return ids
+
+
+@pytest.fixture
+async def appointment(db, users, catalog):
+    """Mijozning DAY kuni 09:00 dagi buyurtmasi"""
+    appointment = Appointment(
+        tenant_id=1,
+        user_id=users.client,
+        service_id=catalog.cut,
+        barber_id=catalog.barber,
+        appointment_time=datetime.combine(DAY, datetime.min.time()).replace(hour=9),
+    )
+    db.add(appointment)
+    await db.flush()
+    appointment_id = appointment.id
+    await db.commit()
+    return appointment_id
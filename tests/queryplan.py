@@ -0,0 +1,104 @@
+"""Endpoint so'rovlarini yozib olish va ularning rejasini (EXPLAIN QUERY PLAN) tekshirish
+
+Reja SQLite'da olinadi: PostgreSQL rejasidan farq qiladi, lekin indeks
+ishlatilmagan shart (to'liq skanerlash) va N+1 so'rovlar ikkala bazada ham
+bir xil ko'rinadi.
+"""
+import re
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterable, List, Optional
+
+from sqlalchemy import event
+
+# "SCAN appointments" - jadvalni, "SCAN appointments USING [COVERING] INDEX ..." -
+# butun indeksni o'qish; ikkalasi ham qatorlar soniga proporsional. "SEARCH ..." -
+# indeks bo'yicha oraliq yoki aniq qiymat qidiruvi
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?(?: USING .+)?$")
+# Savepoint, BEGIN va h.k. rejaga ega emas
+EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|UPDATE|DELETE)\b", re.IGNORECASE)
+
+
+@dataclass
+class Query:
+    statement: str
+    parameters: Any
+    plan: List[str] = field(default_factory=list)
+
+    @property
+    def full_scans(self) -> List[str]:
+        """To'liq skanerlanadigan jadvallar"""
+        return [match.group(1) for match in map(FULL_SCAN.match, self.plan) if match]
+
+
+class QueryRecorder:
+    """Engine orqali bajarilgan SQL so'rovlar ro'yxati"""
+
+    def __init__(self):
+        self.queries: List[Query] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if EXPLAINABLE.match(statement):
+            self.queries.append(Query(statement, parameters))
+
+    def clear(self) -> None:
+        self.queries.clear()
+
+    def repeated(self) -> List[str]:
+        """Bir so'rovda bir necha marta bajarilgan bir xil SQL (N+1 belgisi)"""
+        counts = Counter(query.statement for query in self.queries)
+        return [statement for statement, count in counts.items() if count > 1]
+
+
+@contextmanager
+def record_queries(engine):
+    """Blok ichida engine orqali bajarilgan so'rovlarni yozib olish"""
+    recorder = QueryRecorder()
+    event.listen(engine.sync_engine, "before_cursor_execute", recorder._record)
+    try:
+        yield recorder
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", recorder._record)
+
+
+async def explain(session, queries: Iterable[Query]) -> None:
+    """Har bir so'rov rejasini shu sessiya ulanishida (test ma'lumotlari ko'rinadigan) olish"""
+    connection = await session.connection()
+    for query in queries:
+        result = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {query.statement}", query.parameters)
+        query.plan = [row[-1] for row in result.all()]
+
+
+async def assert_efficient(
+    session,
+    recorder: QueryRecorder,
+    max_queries: int,
+    allow_scans: Optional[Iterable[str]] = (),
+) -> None:
+    """So'rovlar soni chegarada, N+1 yo'q va katta jadvallar to'liq skanerlanmaydi
+
+    allow_scans - o'lchami salon ichida cheklangan (yoki ataylab to'liq o'qiladigan)
+    jadvallar. Xato xabarida reja chiqariladi - qaysi indeks yetishmayotgani ko'rinadi.
+    """
+    queries = list(recorder.queries)
+    assert len(queries) <= max_queries, _describe(
+        f"{len(queries)} ta so'rov (chegara {max_queries})", queries
+    )
+
+    repeated = recorder.repeated()
+    assert not repeated, _describe("Bir xil so'rov qayta-qayta bajarildi (N+1)", queries)
+
+    await explain(session, queries)
+    allowed = set(allow_scans or ())
+    scans = [query for query in queries if set(query.full_scans) - allowed]
+    assert not scans, _describe("To'liq skanerlash (indeks ishlatilmagan)", scans)
+
+
+def _describe(message: str, queries: List[Query]) -> str:
+    lines = [message]
+    for query in queries:
+        lines.append("")
+        lines.append(query.statement)
+        lines.extend(f"    {detail}" for detail in query.plan)
+    return "\n".join(lines)
@@ -0,0 +1,74 @@
+import pytest
+
+from app.workers.rollups import recompute_days
+from tests.conftest import API, DAY, auth_headers
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def rollups(db, appointment):
+    await recompute_days(db, [DAY])
+    await db.commit()
+
+
+async def test_daily_requires_permission(client, client_headers, rollups):
+    params = {"start": DAY.isoformat(), "end": DAY.isoformat()}
+
+    response = await client.get(f"{API}/analytics/daily", params=params, headers=client_headers)
+
+    assert response.status_code == 403
+
+
+async def test_daily_by_barber(client, catalog, admin_headers, rollups):
+    params = {"start": DAY.isoformat(), "end": DAY.isoformat()}
+
+    response = await client.get(f"{API}/analytics/daily", params=params, headers=admin_headers)
+
+    assert response.status_code == 200
+    [row] = response.json()
+    assert row["barber_id"] == catalog.barber
+    assert row["total_count"] == 1
+    assert row["booked_minutes"] == 30
+
+
+async def test_daily_is_scoped_by_salon(client, users, admin_headers, rollups):
+    params = {"start": DAY.isoformat(), "end": DAY.isoformat()}
+
+    # 1-salon admini 2-salon analitikasini ko'ra olmaydi
+    response = await client.get(
+        f"{API}/analytics/daily", params=params, headers={**admin_headers, "X-Salon-ID": "2"}
+    )
+    assert response.status_code == 403
+
+    second_admin = auth_headers(users.admin, "admin", salon_id=2)
+    response = await client.get(
+        f"{API}/analytics/daily", params=params, headers={**second_admin, "X-Salon-ID": "2"}
+    )
+    assert response.json() == []
+
+
+async def test_hourly(client, admin_headers, rollups):
+    response = await client.get(f"{API}/analytics/hourly", params={"date": DAY.isoformat()}, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert [row["hour"] for row in response.json()] == [f"{DAY}T09:00:00Z"]
+
+
+async def test_range_validation(client, admin_headers):
+    params = {"start": DAY.isoformat(), "end": "2029-01-01"}
+
+    response = await client.get(f"{API}/analytics/daily", params=params, headers=admin_headers)
+
+    assert response.status_code == 400
+
+
+async def test_compression_metrics_require_permission(client, users, admin_headers):
+    assert (await client.get("/metrics/compression")).status_code == 401
+    assert (await client.get("/metrics/compression", headers=auth_headers(users.client))).status_code == 403
+    # 2-salon admini tarmoq statistikasini ko'ra olmaydi
+    branch_admin = auth_headers(users.client, "admin", salon_id=2)
+    assert (await client.get("/metrics/compression", headers=branch_admin)).status_code == 403
+
+    response = await client.get("/metrics/compression", headers=admin_headers)
+    assert response.status_code == 200
@@ -0,0 +1,188 @@
+import pytest
+
+from app.core.config import settings
+from tests.conftest import API, DAY, auth_headers
+
+pytestmark = pytest.mark.anyio
+
+
+def booking(catalog, hour="11:00", **overrides):
+    return {"service_id": catalog.cut, "barber_id": catalog.barber, "appointment_time": f"{DAY}T{hour}:00", **overrides}
+
+
+async def test_create_bundle(client, catalog, client_headers):
+    response = await client.post(
+        f"{API}/appointments/",
+        json=booking(catalog, service_id=None, service_ids=[catalog.cut, catalog.beard]),
+        headers=client_headers,
+    )
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body["service_ids"] == [catalog.cut, catalog.beard]
+    assert body["duration_minutes"] == 90
+    assert body["total_price"] == 15
+
+
+async def test_create_rejects_busy_slot(client, catalog, client_headers, appointment):
+    response = await client.post(f"{API}/appointments/", json=booking(catalog, hour="09:15"), headers=client_headers)
+
+    assert response.status_code == 409
+
+
+async def test_create_rejects_outside_working_hours(client, catalog, client_headers):
+    response = await client.post(f"{API}/appointments/", json=booking(catalog, hour="19:00"), headers=client_headers)
+
+    assert response.status_code == 409
+
+
+async def test_create_validates_services(client, catalog, client_headers):
+    duplicate = booking(catalog, service_id=None, service_ids=[catalog.cut, catalog.cut])
+    assert (await client.post(f"{API}/appointments/", json=duplicate, headers=client_headers)).status_code == 422
+
+    unknown = booking(catalog, service_id=999)
+    assert (await client.post(f"{API}/appointments/", json=unknown, headers=client_headers)).status_code == 404
+
+
+async def test_create_rejects_string_ids(client, catalog, client_headers):
+    # Id'lar qat'iy: "5" butun songa moslashtirilmaydi
+    response = await client.post(
+        f"{API}/appointments/", json=booking(catalog, service_id=str(catalog.cut)), headers=client_headers
+    )
+
+    assert response.status_code == 422
+
+
+async def test_create_rejects_time_outside_partitions(client, catalog, client_headers, monkeypatch):
+    # Partitsiyalar joriy oydan 3 oy oldinga va 12 oy orqaga: 2030 yil ham, 2000 yil ham tashqarida
+    monkeypatch.setattr(settings, "APPOINTMENT_PARTITION_MONTHS_AHEAD", 3)
+
+    future = await client.post(f"{API}/appointments/", json=booking(catalog), headers=client_headers)
+    past = await client.post(
+        f"{API}/appointments/", json=booking(catalog, appointment_time="2000-01-03T11:00:00"), headers=client_headers
+    )
+
+    assert future.status_code == 400
+    assert past.status_code == 400
+
+
+async def test_create_requires_auth(client, catalog):
+    response = await client.post(f"{API}/appointments/", json=booking(catalog))
+
+    assert response.status_code == 401
+
+
+async def test_my_appointments(client, client_headers, admin_headers, appointment):
+    response = await client.get(f"{API}/appointments/my", headers=client_headers)
+    assert [item["id"] for item in response.json()] == [appointment]
+
+    response = await client.get(f"{API}/appointments/my", headers=admin_headers)
+    assert response.json() == []
+
+
+async def test_admin_list_requires_permission(client, client_headers, admin_headers, appointment):
+    assert (await client.get(f"{API}/appointments/", headers=client_headers)).status_code == 403
+
+    response = await client.get(f"{API}/appointments/", headers=admin_headers)
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [appointment]
+
+
+async def test_only_owner_or_manager_can_read(client, users, appointment):
+    stranger = auth_headers(users.admin)  # admin foydalanuvchi, lekin tokenda roli yo'q
+    assert (await client.get(f"{API}/appointments/{appointment}", headers=stranger)).status_code == 403
+
+    receptionist = auth_headers(users.admin, "receptionist")
+    assert (await client.get(f"{API}/appointments/{appointment}", headers=receptionist)).status_code == 200
+
+
+async def test_status_update_and_cancel(client, client_headers, appointment):
+    # Mijoz o'z buyurtmasini tasdiqlay olmaydi (daromad/no-show hisobotlariga kiradi)
+    for value in ("confirmed", "completed", "no_show"):
+        response = await client.put(
+            f"{API}/appointments/{appointment}/status", params={"status": value}, headers=client_headers
+        )
+        assert response.status_code == 403
+
+    response = await client.delete(f"{API}/appointments/{appointment}", headers=client_headers)
+    assert response.status_code == 204
+
+    response = await client.get(f"{API}/appointments/{appointment}", headers=client_headers)
+    assert response.json()["status"] == "cancelled"
+
+
+async def test_manager_sets_status(client, users, client_headers, admin_headers, appointment):
+    response = await client.put(
+        f"{API}/appointments/{appointment}/status", params={"status": "completed"}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "completed"
+
+    # Boshqa salondagi menejer o'zgartira olmaydi
+    other = auth_headers(users.admin, "manager", salon_id=2)
+    response = await client.put(
+        f"{API}/appointments/{appointment}/status", params={"status": "confirmed"}, headers=other
+    )
+    assert response.status_code == 403
+
+    # Mijoz status orqali bekor qila oladi
+    response = await client.put(
+        f"{API}/appointments/{appointment}/status", params={"status": "cancelled"}, headers=client_headers
+    )
+    assert response.status_code == 200
+
+
+async def test_reinstate_rejects_taken_slot(client, users, catalog, client_headers, admin_headers, appointment):
+    # A bekor qiladi, B shu vaqtni band qiladi, keyin A ning buyurtmasi tiklanmoqchi
+    assert (await client.delete(f"{API}/appointments/{appointment}", headers=client_headers)).status_code == 204
+    other = await client.post(
+        f"{API}/appointments/", json=booking(catalog, hour="09:00"), headers=auth_headers(users.admin)
+    )
+    assert other.status_code == 201
+
+    reinstate = {"status": "confirmed"}
+    response = await client.put(f"{API}/appointments/{appointment}/status", params=reinstate, headers=admin_headers)
+    assert response.status_code == 409
+
+    # Vaqt yana bo'shasa tiklash mumkin
+    assert (await client.delete(f"{API}/appointments/{other.json()['id']}", headers=admin_headers)).status_code == 204
+    response = await client.put(f"{API}/appointments/{appointment}/status", params=reinstate, headers=admin_headers)
+    assert response.status_code == 200
+
+
+async def test_status_update_unknown_appointment(client, admin_headers, catalog):
+    response = await client.put(f"{API}/appointments/999/status", params={"status": "confirmed"}, headers=admin_headers)
+
+    assert response.status_code == 404
+
+
+async def test_idempotent_retry_returns_same_booking(client, catalog, client_headers):
+    headers = {**client_headers, "Idempotency-Key": "booking-1"}
+    first = await client.post(f"{API}/appointments/", json=booking(catalog), headers=headers)
+    second = await client.post(f"{API}/appointments/", json=booking(catalog), headers=headers)
+
+    assert first.status_code == 201
+    assert second.status_code == 201
+    assert second.json()["id"] == first.json()["id"]
+
+
+async def test_idempotency_does_not_store_conflicts(client, catalog, client_headers, appointment):
+    headers = {**client_headers, "Idempotency-Key": "booking-2"}
+    busy = await client.post(f"{API}/appointments/", json=booking(catalog, hour="09:15"), headers=headers)
+    assert busy.status_code == 409
+
+    # Vaqt bo'shagandan keyin xuddi shu kalit bilan qayta urinish handlerga yetib boradi
+    assert (await client.delete(f"{API}/appointments/{appointment}", headers=client_headers)).status_code == 204
+    retry = await client.post(f"{API}/appointments/", json=booking(catalog, hour="09:15"), headers=headers)
+
+    assert retry.status_code == 201
+    assert "idempotent-replayed" not in retry.headers
+
+
+async def test_manager_of_another_salon_cannot_read(client, users, appointment):
+    # 2-salon menejeri 1-salon buyurtmasini ko'ra olmaydi (sarlavhani almashtirsa ham)
+    manager = auth_headers(users.admin, "manager", salon_id=2)
+
+    assert (await client.get(f"{API}/appointments/{appointment}", headers=manager)).status_code == 403
+    response = await client.get(f"{API}/appointments/{appointment}", headers={**manager, "X-Salon-ID": "2"})
+    assert response.status_code == 404
@@ -0,0 +1,83 @@
+import pytest
+
+from tests.conftest import API, PASSWORD
+
+pytestmark = pytest.mark.anyio
+
+
+async def login(client, email="client@example.com", password=PASSWORD):
+    return await client.post(f"{API}/auth/token", data={"username": email, "password": password})
+
+
+async def test_login_embeds_role_permissions(client, users):
+    response = await login(client, "admin@example.com")
+    assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    # Ruxsat token claim'lari bo'yicha tekshiriladi
+    assert (await client.get(f"{API}/clients/", headers=headers)).status_code == 200
+
+
+async def test_login_rejects_wrong_password(client, users):
+    response = await login(client, password="wrong-password")
+
+    assert response.status_code == 401
+
+
+async def test_me_and_check(client, users, client_headers):
+    response = await client.get(f"{API}/auth/me", headers=client_headers)
+    assert response.status_code == 200
+    assert response.json()["client"]["id"] == users.client
+
+    response = await client.get(f"{API}/auth/check", headers=client_headers)
+    assert response.json()["client_id"] == users.client
+
+
+async def test_invalid_token(client, users):
+    response = await client.get(f"{API}/auth/me", headers={"Authorization": "Bearer not-a-token"})
+
+    assert response.status_code == 401
+
+
+async def test_refresh_rotation_detects_reuse(client, users):
+    await login(client)
+    old_refresh = client.cookies["refresh_token"]
+
+    response = await client.post(f"{API}/auth/refresh")
+    assert response.status_code == 200
+    assert client.cookies["refresh_token"] != old_refresh
+
+    # Eski refresh token qayta ishlatilsa - butun oila bekor qilinadi
+    client.cookies.set("refresh_token", old_refresh)
+    response = await client.post(f"{API}/auth/refresh")
+    assert response.status_code == 401
+
+
+async def test_logout_revokes_family(client, users):
+    response = await login(client)
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    refresh_token = client.cookies["refresh_token"]
+
+    assert (await client.post(f"{API}/auth/logout")).status_code == 200
+
+    assert (await client.get(f"{API}/auth/me", headers=headers)).status_code == 401
+    client.cookies.set("refresh_token", refresh_token)
+    assert (await client.post(f"{API}/auth/refresh")).status_code == 401
+
+
+async def test_jwks(client):
+    response = await client.get(f"{API}/auth/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert "keys" in response.json()
+
+
+async def test_idempotent_replay_omits_cookies(client, users):
+    headers = {"Idempotency-Key": "login-1"}
+    data = {"username": "client@example.com", "password": PASSWORD}
+    first = await client.post(f"{API}/auth/token", data=data, headers=headers)
+    replay = await client.post(f"{API}/auth/token", data=data, headers=headers)
+
+    assert "set-cookie" in first.headers
+    assert replay.headers["idempotent-replayed"] == "true"
+    assert "set-cookie" not in replay.headers
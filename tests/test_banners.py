@@ -0,0 +1,37 @@
+from datetime import datetime
+
+import pytest
+
+from app.models.models import Banner
+from tests.conftest import API
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def banners(db):
+    current = Banner(start_date=datetime(2000, 1, 1), end_date=datetime(2100, 1, 1), image_url="current.png")
+    expired = Banner(start_date=datetime(2000, 1, 1), end_date=datetime(2000, 2, 1), image_url="expired.png")
+    disabled = Banner(is_active=False, image_url="disabled.png")
+    db.add_all([current, expired, disabled])
+    await db.flush()
+    ids = [current.id, expired.id, disabled.id]
+    await db.commit()
+    return ids
+
+
+async def test_list(client, banners):
+    response = await client.get(f"{API}/banners/")
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+
+    response = await client.get(f"{API}/banners/", params={"active_only": True})
+    assert [item["image_url"] for item in response.json()] == ["current.png"]
+
+
+async def test_get(client, banners):
+    response = await client.get(f"{API}/banners/{banners[0]}")
+    assert response.status_code == 200
+    assert response.json()["image_url"] == "current.png"
+
+    assert (await client.get(f"{API}/banners/999")).status_code == 404
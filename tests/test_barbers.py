@@ -0,0 +1,101 @@
+import pytest
+
+from tests.conftest import API, DAY
+
+pytestmark = pytest.mark.anyio
+
+
+def barber_payload(catalog, **overrides):
+    return {"full_name": "Barber Three", "phone": "+998900000003", "category_id": catalog.category, **overrides}
+
+
+async def test_list_and_get(client, catalog):
+    response = await client.get(f"{API}/barbers/")
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+    response = await client.get(f"{API}/barbers/{catalog.barber}")
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Barber One"
+
+
+async def test_create_requires_permission(client, catalog, client_headers):
+    response = await client.post(f"{API}/barbers/", json=barber_payload(catalog), headers=client_headers)
+
+    assert response.status_code == 403
+
+
+async def test_create_rejects_duplicate_phone(client, catalog, admin_headers):
+    response = await client.post(
+        f"{API}/barbers/", json=barber_payload(catalog, phone="+998900000001"), headers=admin_headers
+    )
+
+    assert response.status_code == 400
+
+
+async def test_deleted_barber_frees_phone(client, catalog, admin_headers):
+    response = await client.delete(f"{API}/barbers/{catalog.other_barber}", headers=admin_headers)
+    assert response.status_code == 204
+    assert (await client.get(f"{API}/barbers/{catalog.other_barber}")).status_code == 404
+
+    response = await client.post(
+        f"{API}/barbers/", json=barber_payload(catalog, phone="+998900000002"), headers=admin_headers
+    )
+    assert response.status_code == 201
+
+
+async def test_update(client, catalog, admin_headers):
+    response = await client.put(
+        f"{API}/barbers/{catalog.barber}",
+        json=barber_payload(catalog, full_name="Renamed", phone="+998900000001"),
+        headers=admin_headers,
+    )
+
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Renamed"
+
+
+async def test_available_skips_booked_slot(client, catalog, appointment):
+    response = await client.get(
+        f"{API}/barbers/available",
+        params={"service_id": catalog.cut, "start": f"{DAY}T09:00:00", "end": f"{DAY}T09:30:00"},
+    )
+
+    assert response.status_code == 200
+    assert [slot["barber_id"] for slot in response.json()] == [catalog.other_barber]
+
+
+async def test_schedule(client, catalog, appointment):
+    response = await client.get(f"{API}/barbers/{catalog.barber}/schedule", params={"date": DAY.isoformat()})
+
+    assert response.status_code == 200
+    timeline = response.json()["timeline"]
+    assert [entry["appointment_id"] for entry in timeline if entry["type"] == "appointment"] == [appointment]
+
+
+async def test_working_hours_and_override(client, catalog, admin_headers):
+    days = [{"weekday": DAY.weekday(), "ranges": [{"start": "10:00", "end": "14:00"}]}]
+    response = await client.put(
+        f"{API}/barbers/{catalog.barber}/working-hours", json={"days": days}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["days"] == [{"weekday": DAY.weekday(), "ranges": [{"start": "10:00:00", "end": "14:00:00"}]}]
+
+    response = await client.put(
+        f"{API}/barbers/{catalog.barber}/working-hours/overrides/{DAY}", json={"day_off": True}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["day_off"] is True
+
+    response = await client.delete(
+        f"{API}/barbers/{catalog.barber}/working-hours/overrides/{DAY}", headers=admin_headers
+    )
+    assert response.status_code == 204
+
+
+async def test_working_hours_require_permission(client, catalog, client_headers):
+    response = await client.put(
+        f"{API}/barbers/{catalog.barber}/working-hours", json={"days": []}, headers=client_headers
+    )
+
+    assert response.status_code == 403
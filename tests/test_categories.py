@@ -0,0 +1,37 @@
+import pytest
+
+from tests.conftest import API, DAY
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_list_counts_active_barbers(client, catalog):
+    response = await client.get(f"{API}/categories/")
+
+    assert response.status_code == 200
+    [category] = response.json()
+    assert category["name"] == "Hair"
+    assert category["barber_count"] == 2
+
+
+async def test_list_is_scoped_by_salon(client, catalog):
+    response = await client.get(f"{API}/categories/", headers={"X-Salon-ID": "2"})
+
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+async def test_invalid_salon_header(client, catalog):
+    response = await client.get(f"{API}/categories/", headers={"X-Salon-ID": "0"})
+
+    assert response.status_code == 422
+
+
+async def test_category_schedule(client, catalog, appointment):
+    response = await client.get(f"{API}/categories/{catalog.category}/schedule", params={"date": DAY.isoformat()})
+
+    assert response.status_code == 200
+    schedules = {item["barber_id"]: item for item in response.json()}
+    assert set(schedules) == {catalog.barber, catalog.other_barber}
+    booked = [entry for entry in schedules[catalog.barber]["timeline"] if entry["type"] == "appointment"]
+    assert [entry["appointment_id"] for entry in booked] == [appointment]
@@ -0,0 +1,93 @@
+import pytest
+
+from tests.conftest import API, PASSWORD, auth_headers
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_signup(client, db):
+    response = await client.post(
+        f"{API}/clients/", json={"email": "new@example.com", "password": "secret123", "full_name": "New"}
+    )
+    assert response.status_code == 201
+    assert response.json()["role"] is None
+
+    response = await client.post(
+        f"{API}/clients/", json={"email": "new@example.com", "password": "secret123", "full_name": "New"}
+    )
+    assert response.status_code == 400
+
+
+async def test_signup_rejects_short_password(client, db):
+    response = await client.post(
+        f"{API}/clients/", json={"email": "new@example.com", "password": "123", "full_name": "New"}
+    )
+
+    assert response.status_code == 422
+
+
+async def test_list_requires_permission(client, users, client_headers, admin_headers, appointment):
+    assert (await client.get(f"{API}/clients/", headers=client_headers)).status_code == 403
+
+    response = await client.get(f"{API}/clients/", headers=admin_headers)
+    assert response.status_code == 200
+    assert {(row["id"], row["role"]) for row in response.json()} == {(users.client, None), (users.admin, "admin")}
+
+
+async def test_list_is_scoped_by_salon(client, db, users, appointment):
+    # Mijoz faqat 1-salonda buyurtma qilgan, 2-salonda roli ham, buyurtmasi ham yo'q
+    manager = auth_headers(users.admin, "manager", salon_id=2)
+    response = await client.get(f"{API}/clients/", headers={**manager, "X-Salon-ID": "2"})
+
+    assert response.status_code == 200
+    assert response.json() == []
+    response = await client.get(f"{API}/clients/{users.client}", headers={**manager, "X-Salon-ID": "2"})
+    assert response.status_code == 404
+
+
+async def test_get_own_or_with_permission(client, users, client_headers, admin_headers, appointment):
+    assert (await client.get(f"{API}/clients/{users.client}", headers=client_headers)).status_code == 200
+    assert (await client.get(f"{API}/clients/{users.admin}", headers=client_headers)).status_code == 403
+    assert (await client.get(f"{API}/clients/{users.client}", headers=admin_headers)).status_code == 200
+
+
+async def test_role_change_revokes_old_tokens(client, users, client_headers, admin_headers):
+    response = await client.put(f"{API}/clients/{users.client}/role", json={"role": "manager"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["role"] == "manager"
+
+    response = await client.get(f"{API}/clients/{users.client}", headers=client_headers)
+    assert response.status_code == 401
+
+
+async def test_role_change_validation(client, users, client_headers, admin_headers):
+    response = await client.put(f"{API}/clients/{users.client}/role", json={"role": "owner"}, headers=admin_headers)
+    assert response.status_code == 400
+
+    response = await client.put(f"{API}/clients/{users.client}/role", json={"role": "admin"}, headers=client_headers)
+    assert response.status_code == 403
+
+
+async def test_admin_cannot_act_in_another_salon(client, users, catalog, admin_headers, appointment):
+    other_salon = {**admin_headers, "X-Salon-ID": "2"}
+
+    response = await client.put(f"{API}/clients/{users.client}/role", json={"role": "admin"}, headers=other_salon)
+    assert response.status_code == 403
+    response = await client.post(
+        f"{API}/services/",
+        json={"category_id": catalog.category, "name": "Shave", "price": 5, "duration": 15},
+        headers=other_salon,
+    )
+    assert response.status_code == 403
+    assert (await client.get(f"{API}/appointments/", headers=other_salon)).status_code == 403
+
+
+async def test_role_is_granted_per_salon(client, users, admin_headers):
+    response = await client.put(f"{API}/clients/{users.client}/role", json={"role": "manager"}, headers=admin_headers)
+    assert response.json()["role"] == "manager"
+
+    # Yangi token: manager faqat 1-salonda
+    login = await client.post(f"{API}/auth/token", data={"username": "client@example.com", "password": PASSWORD})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    assert (await client.get(f"{API}/clients/", headers=headers)).status_code == 200
+    assert (await client.get(f"{API}/clients/", headers={**headers, "X-Salon-ID": "2"})).status_code == 403
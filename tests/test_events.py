@@ -0,0 +1,137 @@
+import asyncio
+
+import asyncpg
+import pytest
+
+from app.api.events import _event_stream
+from app.core.events import PG_CHANNEL, EventBroker, client_channel, event_broker
+from tests.conftest import API, DAY
+
+pytestmark = pytest.mark.anyio
+
+
+class DisconnectingRequest:
+    """SSE oqimi uchun so'rov: bir marta tekshirilgandan keyin uziladi"""
+
+    def __init__(self):
+        self.checks = 0
+
+    async def is_disconnected(self):
+        self.checks += 1
+        return self.checks > 1
+
+
+class FakeConnection:
+    """asyncpg ulanishi o'rnida: LISTEN va uzilish tinglovchilarini yozib oladi"""
+
+    def __init__(self):
+        self.listeners = {}
+        self.termination_listeners = []
+        self.closed = False
+
+    def add_termination_listener(self, callback):
+        self.termination_listeners.append(callback)
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    def drop(self):
+        for callback in self.termination_listeners:
+            callback(self)
+
+    def terminate(self):
+        self.closed = True
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pg(monkeypatch):
+    """asyncpg.connect natijalari: ulanish yoki ko'tariladigan xato"""
+    results = []
+    connections = []
+
+    async def connect(dsn):
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        connections.append(result)
+        return result
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+    return results, connections
+
+
+def make_broker():
+    return EventBroker("postgresql+asyncpg://u:p@db/app", reconnect_min_seconds=0.01, reconnect_max_seconds=0.02)
+
+
+async def wait_connected(broker):
+    for _ in range(100):
+        if broker._connection is not None:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Qayta ulanilmadi")
+
+
+async def test_broker_reconnects_after_connection_loss(pg):
+    results, connections = pg
+    results.extend([FakeConnection(), OSError("down"), FakeConnection()])
+    broker = make_broker()
+
+    await broker.start()
+    first = broker._connection
+    first.drop()
+    assert broker._connection is None
+
+    # Birinchi urinish muvaffaqiyatsiz, keyingisida LISTEN qayta qo'shiladi
+    await wait_connected(broker)
+    assert broker._connection is connections[1]
+    assert PG_CHANNEL in connections[1].listeners
+    await broker.stop()
+    assert connections[1].closed
+
+
+async def test_broker_retries_when_database_is_down_at_start(pg):
+    results, _ = pg
+    results.extend([OSError("down"), FakeConnection()])
+    broker = make_broker()
+
+    await broker.start()
+    assert broker._connection is None
+
+    await wait_connected(broker)
+    await broker.stop()
+
+
+async def test_client_stream_requires_auth(client):
+    response = await client.get(f"{API}/events/me")
+
+    assert response.status_code == 401
+
+
+async def test_booking_is_published_to_client_channel(client, users, catalog, client_headers):
+    async with event_broker.subscribe(client_channel(users.client)) as queue:
+        response = await client.post(
+            f"{API}/appointments/",
+            json={"service_id": catalog.cut, "barber_id": catalog.barber, "appointment_time": f"{DAY}T11:00:00"},
+            headers=client_headers,
+        )
+        assert response.status_code == 201
+
+        event = await asyncio.wait_for(queue.get(), timeout=1)
+
+    assert event["type"] == "appointment.created"
+    assert event["appointment_id"] == response.json()["id"]
+
+
+async def test_stream_formats_events():
+    stream = _event_stream(DisconnectingRequest(), "test-channel")
+    assert await stream.__anext__() == "retry: 5000\n\n"
+
+    await event_broker.publish("test-channel", {"type": "slot.taken", "barber_id": 1})
+    chunk = await stream.__anext__()
+    await stream.aclose()
+
+    assert chunk.startswith("event: slot.taken\ndata: ")
@@ -0,0 +1,14 @@
+import os
+
+import pytest
+
+from scripts.import_profile import DEFAULT_BUDGET_MS, measure
+
+
+@pytest.mark.skipif(os.getenv("IMPORT_BUDGET_MS") == "0", reason="IMPORT_BUDGET_MS=0 - tekshiruv o'chirilgan")
+def test_cold_import_within_budget():
+    budget_ms = float(os.getenv("IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS))
+
+    report = measure("app.main", runs=3)
+
+    assert report["median_ms"] <= budget_ms, f"app.main importi {report['median_ms']:.0f} ms (chegara {budget_ms:.0f} ms)"
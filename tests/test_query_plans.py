@@ -0,0 +1,144 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import func, insert, text
+from sqlalchemy.future import select
+
+from app.models.models import Appointment, AppointmentStatus, Barber, Category, Salon, Service, User
+from tests.conftest import API, auth_headers
+from tests.queryplan import assert_efficient, record_queries
+
+pytestmark = pytest.mark.anyio
+
+# Katta jadvallar: rejalar (va N+1) faqat ma'lumot ko'p bo'lganda ko'rinadi
+CATEGORIES = 20
+BARBERS = 100
+CLIENTS = 500
+APPOINTMENTS = 5000
+FIRST_DAY = date(2029, 7, 1)
+PLAN_DAY = date(2029, 8, 1)
+
+
+def _tenant(category_id: int) -> int:
+    # Juft kategoriyalar 1-salonda, toqlari 2-salonda
+    return 1 + category_id % 2
+
+
+def _category(index: int) -> int:
+    return index % CATEGORIES + 1
+
+
+@pytest.fixture
+async def large(db, users):
+    """Ikki salon, 100 barber va 5000 buyurtma (rejalashtiruvchi uchun ANALYZE bilan)"""
+    await db.execute(insert(Salon), [
+        {"id": 1, "name": "Main", "slug": "main"},
+        {"id": 2, "name": "Second", "slug": "second"},
+    ])
+    await db.execute(insert(Category), [
+        {"id": index, "tenant_id": _tenant(index), "name": f"Category {index}"}
+        for index in range(1, CATEGORIES + 1)
+    ])
+    await db.execute(insert(Service), [
+        {
+            "id": index,
+            "tenant_id": _tenant(_category(index)),
+            "category_id": _category(index),
+            "name": f"Service {index}",
+            "price": 10,
+            "duration": 30,
+        }
+        for index in range(1, BARBERS + 1)
+    ])
+    await db.execute(insert(Barber), [
+        {
+            "id": index,
+            "tenant_id": _tenant(_category(index)),
+            "category_id": _category(index),
+            "full_name": f"Barber {index}",
+            "phone": f"+99890{index:07d}",
+        }
+        for index in range(1, BARBERS + 1)
+    ])
+    first_client = max(users.client, users.admin) + 1
+    await db.execute(insert(User), [
+        {"id": first_client + index, "email": f"client{index}@example.com", "password_hash": "-", "full_name": "Client"}
+        for index in range(CLIENTS)
+    ])
+
+    # Har kuni har bir barberga bitta buyurtma; users.client da har 250-buyurtma
+    start = datetime.combine(FIRST_DAY, datetime.min.time()).replace(hour=9)
+    appointments = []
+    for index in range(1, APPOINTMENTS + 1):
+        barber_id = index % BARBERS + 1
+        appointments.append({
+            "id": index,
+            "tenant_id": _tenant(_category(barber_id)),
+            "user_id": users.client if index % 250 == 0 else first_client + index % CLIENTS,
+            "service_id": barber_id,
+            "barber_id": barber_id,
+            "appointment_time": start + timedelta(days=index // BARBERS, hours=index % 8),
+            "status": AppointmentStatus.confirmed,
+            "created_at": start,
+            "updated_at": start,
+        })
+    await db.execute(insert(Appointment), appointments)
+
+    await db.execute(text("ANALYZE"))
+    await db.commit()
+
+
+# (endpoint, so'rov parametrlari, admin/mijoz tokeni, so'rovlar soni chegarasi).
+# Chegara autentifikatsiya so'rovlarini ham o'z ichiga oladi
+ENDPOINTS = [
+    ("/categories/", {}, None, 1),
+    ("/categories/2/schedule", {"date": PLAN_DAY.isoformat()}, None, 1),
+    ("/services/", {}, None, 1),
+    ("/barbers/", {}, None, 1),
+    ("/barbers/1/schedule", {"date": PLAN_DAY.isoformat()}, None, 1),
+    ("/barbers/available", {"service_id": 1, "start": f"{PLAN_DAY}T09:00:00"}, None, 4),
+    ("/appointments/my", {}, "client", 4),
+    ("/appointments/my", {"upcoming": True}, "client", 4),
+    ("/appointments/", {}, "admin", 3),
+    ("/clients/", {}, "admin", 3),
+    ("/appointments/250", {}, "client", 4),
+]
+
+
+@pytest.mark.parametrize(
+    "path, params, caller, max_queries",
+    ENDPOINTS,
+    ids=[f"{path}{'?' + '&'.join(params) if params else ''}" for path, params, _, _ in ENDPOINTS],
+)
+async def test_endpoint_query_plan(client, db, engine, users, large, path, params, caller, max_queries):
+    headers = None
+    if caller == "client":
+        headers = auth_headers(users.client)
+    elif caller == "admin":
+        headers = auth_headers(users.admin, "admin")
+
+    with record_queries(engine) as recorder:
+        response = await client.get(f"{API}{path}", params=params, headers=headers)
+
+    assert response.status_code == 200, response.text
+    await assert_efficient(db, recorder, max_queries)
+
+
+# Himoyaning o'zi ishlashini tekshirish: yomon so'rovlar aniqlanishi kerak
+
+async def test_detects_function_on_indexed_column(db, engine, large):
+    # date(appointment_time) indeksdan foydalanmaydi - har bir qator tekshiriladi
+    with record_queries(engine) as recorder:
+        await db.execute(select(Appointment.id).where(func.date(Appointment.appointment_time) == PLAN_DAY.isoformat()))
+
+    with pytest.raises(AssertionError, match="To'liq skanerlash"):
+        await assert_efficient(db, recorder, max_queries=1)
+
+
+async def test_detects_n_plus_one(db, engine, large):
+    with record_queries(engine) as recorder:
+        for appointment_id in range(1, 6):
+            await db.execute(select(Appointment.barber_id).where(Appointment.id == appointment_id))
+
+    with pytest.raises(AssertionError, match="N\\+1"):
+        await assert_efficient(db, recorder, max_queries=10)
@@ -0,0 +1,32 @@
+import pytest
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.ratelimit import client_ip
+
+
+def make_request(peer: str, forwarded: str = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 12345)})
+
+
+@pytest.fixture(autouse=True)
+def proxies(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", ["10.0.0.0/8"])
+
+
+def test_forwarded_from_trusted_proxy():
+    assert client_ip(make_request("10.0.0.5", "203.0.113.7")) == "203.0.113.7"
+
+
+def test_spoofed_hops_are_ignored():
+    # Mijoz o'zi yozgan "1.1.1.1" dan keyin proxy haqiqiy manzilni qo'shadi
+    assert client_ip(make_request("10.0.0.5", "1.1.1.1, 203.0.113.7, 10.0.0.9")) == "203.0.113.7"
+
+
+def test_forwarded_from_untrusted_peer_is_ignored():
+    assert client_ip(make_request("198.51.100.2", "203.0.113.7")) == "198.51.100.2"
+
+
+def test_trusted_peer_without_header():
+    assert client_ip(make_request("10.0.0.5")) == "10.0.0.5"
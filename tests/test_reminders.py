@@ -0,0 +1,60 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.workers.reminders import ReminderSender, claim_due_reminders, process_due_reminders
+from tests.conftest import DAY
+
+pytestmark = pytest.mark.anyio
+
+# Buyurtmadan (DAY 09:00) yarim soat oldin
+NOW = datetime.combine(DAY, datetime.min.time()).replace(hour=8, minute=30)
+
+
+class RecordingSender(ReminderSender):
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.sent = []
+
+    async def send(self, reminder) -> None:
+        if self.fail:
+            raise RuntimeError("provider down")
+        self.sent.append(reminder.appointment_id)
+
+
+def session_factory(db):
+    @asynccontextmanager
+    async def factory():
+        yield db
+
+    return factory
+
+
+async def test_reminder_sent_once(db, appointment):
+    sender = RecordingSender()
+
+    assert await process_due_reminders(sender, session_factory(db), NOW) == 1
+    assert await process_due_reminders(sender, session_factory(db), NOW + timedelta(minutes=20)) == 0
+    assert sender.sent == [appointment]
+
+
+async def test_failed_reminder_released(db, appointment):
+    assert await process_due_reminders(RecordingSender(fail=True), session_factory(db), NOW) == 0
+
+    sender = RecordingSender()
+    assert await process_due_reminders(sender, session_factory(db), NOW) == 1
+    assert sender.sent == [appointment]
+
+
+async def test_crashed_claim_reclaimed_after_lease(db, appointment):
+    # Worker egalladi-yu, yuborishdan oldin to'xtadi
+    assert len(await claim_due_reminders(db, NOW, 10)) == 1
+
+    sender = RecordingSender()
+    assert await process_due_reminders(sender, session_factory(db), NOW + timedelta(minutes=1)) == 0
+
+    expired = NOW + timedelta(minutes=settings.REMINDER_LEASE_MINUTES + 1)
+    assert await process_due_reminders(sender, session_factory(db), expired) == 1
+    assert sender.sent == [appointment]
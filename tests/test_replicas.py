@@ -0,0 +1,31 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.db.replicas import ReplicaRouter
+
+pytestmark = pytest.mark.anyio
+
+
+class BlackholeEngine:
+    url = "postgresql+asyncpg://replica"
+
+    @asynccontextmanager
+    async def connect(self):
+        await asyncio.sleep(60)
+        yield
+
+
+async def test_health_check_timeout_covers_connect():
+    router = ReplicaRouter([], max_lag=5, check_interval=10, check_timeout=0.05)
+    replica = SimpleNamespace(engine=BlackholeEngine(), healthy=True, checked_at=0.0)
+    router.replicas = [replica]
+    router._order = iter([replica])
+
+    started = time.monotonic()
+    assert await router.pick() is None
+    assert time.monotonic() - started < 1
+    assert replica.healthy is False
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.permissions import role_key
+from app.core.revocation import RevocationStore, family_key, revocation_store
+from app.models.models import RevokedToken
+from app.utils.timerange import utc_now
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_sync_loads_only_family_and_role_keys(db):
+    expires_at = utc_now() + timedelta(days=1)
+    await revocation_store.revoke(db, family_key("f1"), "f1", expires_at, "logout")
+    await revocation_store.revoke(db, role_key(1, 0), "client:1", expires_at, "role")
+    # Almashtirilgan refresh token: faqat unique cheklov uchun
+    await revocation_store.revoke(db, "rotated-jti", "f2", expires_at, "rotated")
+
+    # Boshqa worker: xotira bo'sh, hammasi bazadan yuklanadi
+    store = RevocationStore()
+    await store.sync(db, force=True)
+
+    assert family_key("f1") in store._bloom
+    assert role_key(1, 0) in store._bloom
+    assert "rotated-jti" not in store._bloom
+    assert "rotated-jti" not in revocation_store._bloom
+    assert store._bloom.count == 2
+
+
+async def test_bloom_capacity_follows_revoked_families(db, monkeypatch):
+    monkeypatch.setattr(settings, "REVOCATION_BLOOM_CAPACITY", 2)
+    expires_at = utc_now() + timedelta(days=1)
+    for index in range(5):
+        await revocation_store.revoke(db, family_key(f"f{index}"), f"f{index}", expires_at, "logout")
+
+    store = RevocationStore()
+    await store.sync(db, force=True)
+
+    assert store._bloom.capacity == 10
+    assert all(family_key(f"f{index}") in store._bloom for index in range(5))
+
+
+async def test_purge_removes_expired_rows(db):
+    await revocation_store.revoke(db, family_key("old"), "old", utc_now() - timedelta(minutes=1), "logout")
+    await revocation_store.revoke(db, family_key("new"), "new", utc_now() + timedelta(days=1), "logout")
+
+    assert await RevocationStore.purge(db) == 1
+    remaining = (await db.execute(select(RevokedToken.jti))).scalars().all()
+    assert remaining == [family_key("new")]
@@ -0,0 +1,34 @@
+import pytest
+
+from tests.conftest import API, auth_headers
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_list_and_get(client, catalog):
+    response = await client.get(f"{API}/salons/")
+    assert response.status_code == 200
+    assert [item["slug"] for item in response.json()] == ["main", "second"]
+
+    assert (await client.get(f"{API}/salons/2")).json()["name"] == "Second"
+    assert (await client.get(f"{API}/salons/99")).status_code == 404
+
+
+async def test_create_requires_permission(client, catalog, client_headers, admin_headers):
+    payload = {"name": "Third", "slug": "third"}
+    assert (await client.post(f"{API}/salons/", json=payload, headers=client_headers)).status_code == 403
+
+    response = await client.post(f"{API}/salons/", json=payload, headers=admin_headers)
+    assert response.status_code == 201
+    assert response.json()["is_active"] is True
+
+    # slug takrorlanmaydi
+    assert (await client.post(f"{API}/salons/", json=payload, headers=admin_headers)).status_code == 400
+
+
+async def test_branch_admin_cannot_create_salon(client, users, catalog):
+    # 2-filial admini o'z salon id'sini yuborsa ham tarmoq darajasidagi ruxsatga ega emas
+    branch_admin = {**auth_headers(users.admin, "admin", salon_id=2), "X-Salon-ID": "2"}
+    response = await client.post(f"{API}/salons/", json={"name": "Fourth", "slug": "fourth"}, headers=branch_admin)
+
+    assert response.status_code == 403
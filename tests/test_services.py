@@ -0,0 +1,59 @@
+import pytest
+
+from tests.conftest import API
+
+pytestmark = pytest.mark.anyio
+
+
+def service_payload(catalog, **overrides):
+    return {"category_id": catalog.category, "name": "Wash", "price": 7.5, "duration": 20, **overrides}
+
+
+async def test_list_and_get(client, catalog):
+    response = await client.get(f"{API}/services/")
+    assert response.status_code == 200
+    assert {item["name"] for item in response.json()} == {"Cut", "Beard"}
+
+    response = await client.get(f"{API}/services/{catalog.cut}")
+    assert response.status_code == 200
+    assert response.json()["duration"] == 30
+
+
+async def test_other_salon_does_not_see_service(client, catalog):
+    response = await client.get(f"{API}/services/{catalog.cut}", headers={"X-Salon-ID": "2"})
+
+    assert response.status_code == 404
+
+
+async def test_create_requires_permission(client, catalog, client_headers):
+    response = await client.post(f"{API}/services/", json=service_payload(catalog), headers=client_headers)
+
+    assert response.status_code == 403
+
+
+async def test_create_update_delete(client, catalog, admin_headers):
+    response = await client.post(f"{API}/services/", json=service_payload(catalog), headers=admin_headers)
+    assert response.status_code == 201
+    service_id = response.json()["id"]
+
+    response = await client.put(
+        f"{API}/services/{service_id}", json=service_payload(catalog, price=9), headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["price"] == 9
+
+    response = await client.delete(f"{API}/services/{service_id}", headers=admin_headers)
+    assert response.status_code == 204
+
+    # Soft delete: ro'yxatda va ID bo'yicha ko'rinmaydi
+    assert (await client.get(f"{API}/services/{service_id}")).status_code == 404
+    names = {item["name"] for item in (await client.get(f"{API}/services/")).json()}
+    assert "Wash" not in names
+
+
+async def test_create_with_unknown_category(client, catalog, admin_headers):
+    response = await client.post(
+        f"{API}/services/", json=service_payload(catalog, category_id=999), headers=admin_headers
+    )
+
+    assert response.status_code == 404
@@ -0,0 +1,73 @@
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.core.config import settings
+from app.models.models import Banner
+from app.utils.timerange import UTC, local_day_range, localize, today_range, week_range
+from tests.conftest import API, DAY
+
+pytestmark = pytest.mark.anyio
+
+TASHKENT = ZoneInfo("Asia/Tashkent")
+BERLIN = ZoneInfo("Europe/Berlin")
+
+
+def test_local_day_range_in_utc():
+    start, end = local_day_range(date(2030, 1, 7), TASHKENT)
+
+    assert start.astimezone(UTC) == datetime(2030, 1, 6, 19, tzinfo=UTC)
+    assert end - start == timedelta(days=1)
+
+
+def test_local_day_range_across_dst():
+    # Yozgi vaqtga o'tish kuni 23 soat
+    start, end = local_day_range(date(2030, 3, 31), BERLIN)
+
+    assert end.astimezone(UTC) - start.astimezone(UTC) == timedelta(hours=23)
+
+
+def test_today_and_week_use_salon_date():
+    # UTC bo'yicha hali yakshanba, Toshkentda esa dushanba
+    now = datetime(2030, 1, 6, 20, tzinfo=UTC)
+
+    assert today_range(TASHKENT, now)[0].date() == date(2030, 1, 7)
+    start, end = week_range(TASHKENT, now)
+    assert (start.date(), end.date()) == (date(2030, 1, 7), date(2030, 1, 14))
+
+
+def test_localize():
+    assert localize(datetime(2030, 1, 7, 9), TASHKENT).utcoffset() == timedelta(hours=5)
+    assert localize(datetime(2030, 1, 7, 4, tzinfo=UTC), TASHKENT).hour == 9
+
+
+async def test_stored_as_aware_utc(db):
+    banner = Banner(start_date=datetime(2030, 1, 7, 9, tzinfo=timezone(timedelta(hours=5))), image_url="a.png")
+    db.add(banner)
+    await db.commit()
+    await db.refresh(banner)
+
+    assert banner.start_date == datetime(2030, 1, 7, 4, tzinfo=UTC)
+    assert banner.start_date.tzinfo is UTC
+
+
+@pytest.fixture
+def tashkent(monkeypatch):
+    monkeypatch.setitem(settings.SALON_TIMEZONES, 1, "Asia/Tashkent")
+
+
+async def test_booking_uses_salon_local_time(client, catalog, client_headers, tashkent):
+    booking = {"service_id": catalog.cut, "barber_id": catalog.barber, "appointment_time": f"{DAY}T09:00:00"}
+    response = await client.post(f"{API}/appointments/", json=booking, headers=client_headers)
+
+    assert response.status_code == 201
+    assert response.json()["appointment_time"] == f"{DAY}T04:00:00Z"
+
+    # Ish vaqti (09:00-19:00) ham mahalliy vaqt bo'yicha
+    early = {**booking, "barber_id": catalog.other_barber, "appointment_time": f"{DAY}T08:30:00"}
+    assert (await client.post(f"{API}/appointments/", json=early, headers=client_headers)).status_code == 409
+
+    response = await client.get(f"{API}/barbers/{catalog.barber}/schedule", params={"date": DAY.isoformat()})
+    timeline = response.json()["timeline"]
+    assert [entry["start"] for entry in timeline if entry["type"] == "appointment"] == [f"{DAY}T09:00:00+05:00"]
@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from app.core.tokens import KeyRing, SigningKey, TokenError, b64url_encode
+from tests.conftest import API
+
+SECRET = "test-secret-key-0123456789abcdef"
+
+
+@pytest.fixture
+def ring():
+    return KeyRing([SigningKey("k1", "HS256", secret=SECRET)], active_kid="k1")
+
+
+def token_with_header(header: dict) -> str:
+    segment = b64url_encode(json.dumps(header).encode())
+    return f"{segment}.{b64url_encode(b'{}')}.{b64url_encode(b'signature')}"
+
+
+@pytest.mark.parametrize("kid", [[1], {"a": 1}, 7])
+def test_rejects_non_string_kid(ring, kid):
+    with pytest.raises(TokenError):
+        ring.decode(token_with_header({"alg": "HS256", "kid": kid}))
+
+
+@pytest.mark.parametrize("exp", ["soon", [1], True])
+def test_rejects_non_numeric_exp(ring, exp):
+    token = ring.encode({"sub": "1", "exp": exp})
+
+    with pytest.raises(TokenError):
+        ring.decode(token)
+
+
+@pytest.mark.anyio
+async def test_malformed_header_is_unauthorized(client):
+    headers = {"Authorization": f"Bearer {token_with_header({'alg': 'HS256', 'kid': [1]})}"}
+    response = await client.get(f"{API}/auth/me", headers=headers)
+
+    assert response.status_code == 401